@@ -14,9 +14,11 @@ from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers.config_entry_oauth2_flow import ImplementationUnavailableError
 
 from .const import DOMAIN
+from .coordinator import device_cache_store
 from .coordinator import OnectaDataUpdateCoordinator
 from .coordinator import OnectaRuntimeData
 from .daikin_api import DaikinApi
+from .ratelimit import async_get_governor
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -56,18 +58,32 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     except (OAuth2TokenRequestError, aiohttp.ClientError) as err:
         raise ConfigEntryNotReady from err
 
-    config_entry.runtime_data = OnectaRuntimeData(coordinator=None, daikin_api=daikin_api, devices={})
-    config_entry.runtime_data.coordinator = OnectaDataUpdateCoordinator(hass, config_entry)
+    config_entry.async_on_unload(daikin_api.async_start_token_refresher())
 
-    # Let the coordinator raise ConfigEntryAuthFailed / ConfigEntryNotReady directly.
-    # Do not wrap first_refresh in a broad Exception handler: that would convert
-    # reauth failures into ConfigEntryNotReady and skip the reauth flow.
-    await config_entry.runtime_data.coordinator.async_config_entry_first_refresh()
+    config_entry.runtime_data = OnectaRuntimeData(coordinator=None, daikin_api=daikin_api, devices={})
+    coordinator = OnectaDataUpdateCoordinator(hass, config_entry)
+    config_entry.runtime_data.coordinator = coordinator
+    config_entry.async_on_unload(daikin_api.async_add_write_listener(coordinator.async_write_done))
+    config_entry.async_on_unload(coordinator.async_cancel_confirmation)
+    config_entry.async_on_unload(async_get_governor(hass).async_register(config_entry.entry_id, config_entry.title, coordinator.budget))
+
+    # When we have a recent cached payload we create the entities from that and
+    # retrieve the live data in the background, this doesn't block startup on the
+    # Daikin cloud and doesn't use an API call on each restart
+    use_cache = await coordinator.async_load_cache()
+    if not use_cache:
+        # Let the coordinator raise ConfigEntryAuthFailed / ConfigEntryNotReady directly.
+        # Do not wrap first_refresh in a broad Exception handler: that would convert
+        # reauth failures into ConfigEntryNotReady and skip the reauth flow.
+        await coordinator.async_config_entry_first_refresh()
 
     config_entry.async_on_unload(config_entry.add_update_listener(update_listener))
 
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
+    if use_cache:
+        config_entry.async_create_background_task(hass, coordinator.async_refresh(), "daikin_onecta initial refresh")
+
     return True
 
 
@@ -77,10 +93,18 @@ async def async_unload_entry(hass, config_entry):
     return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the cached device data when the config entry is removed."""
+    await device_cache_store(hass, config_entry.entry_id).async_remove()
+
+
 async def update_listener(hass, config_entry):
     """Handle options update."""
     onecta_data: OnectaRuntimeData = config_entry.runtime_data
     coordinator = onecta_data.coordinator
+    if config_entry.options == coordinator.options:
+        # Only the data changed, like the token stored by a background token refresh
+        return
     coordinator.update_settings(config_entry)
     coordinator.async_update_listeners()
 
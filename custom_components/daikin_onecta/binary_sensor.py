@@ -8,6 +8,7 @@ from homeassistant.components.sensor import CONF_STATE_CLASS
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_CLASS
 from homeassistant.const import CONF_ICON
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
@@ -18,8 +19,9 @@ from .const import ENABLED_DEFAULT
 from .const import ENTITY_CATEGORY
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
-from .coordinator import OnectaRuntimeData
 from .device import DaikinOnectaDevice
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,35 +39,13 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    """Set up Daikin climate based on config_entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    sensors = []
-    for device in onecta_data.devices.values():
-        management_points = device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            embedded_id = management_point["embeddedId"]
-
-            # For all values provide a "value" we provide a sensor
-            for value in management_point:
-                vv = management_point.get(value)
-                if isinstance(vv, dict):
-                    value_value = vv.get("value")
-                    values = vv.get("values")
-                    if values is None and value_value is not None and isinstance(value_value, bool):
-                        # We don't have multiple values and we do have a value which is a boolean
-                        sensors.append(
-                            DaikinBinarySensor(
-                                device,
-                                coordinator,
-                                embedded_id,
-                                management_point_type,
-                                value,
-                            )
-                        )
-
-    async_add_entities(sensors)
+    """Set up Daikin binary sensors based on config_entry."""
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_binary_sensor(device, plan: EntityPlan):
+        return DaikinBinarySensor(device, coordinator, plan.embedded_id, plan.management_point_type, plan.value)
+
+    async_add_planned_entities(hass, config_entry, Platform.BINARY_SENSOR, create_binary_sensor, async_add_entities)
 
 
 class DaikinBinarySensor(CoordinatorEntity, BinarySensorEntity):
@@ -117,18 +97,22 @@ class DaikinBinarySensor(CoordinatorEntity, BinarySensorEntity):
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id, self._value):
+            self.update_state()
+            self.async_write_ha_state()
 
     def sensor_value(self):
         res = None
-        managementPoints = self._device.daikin_data.get("managementPoints", [])
-        for management_point in managementPoints:
-            if self._embedded_id == management_point["embeddedId"]:
-                cd = management_point.get(self._value)
-                if cd is not None:
-                    res = cd.get("value")
+        management_point = self._device.management_point(self._embedded_id)
+        if management_point is not None:
+            cd = management_point.get(self._value)
+            if cd is not None:
+                res = cd.get("value")
         _LOGGER.debug("Device '%s' binary sensor '%s' value '%s'", self._device.name, self._value, res)
         return res
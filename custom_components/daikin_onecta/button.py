@@ -3,13 +3,15 @@ import logging
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .coordinator import OnectaRuntimeData
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,16 +21,12 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    entities = []
+    coordinator = config_entry.runtime_data.coordinator
 
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
+    def create_button(device, plan: EntityPlan):
+        return DaikinRefreshButton(device, config_entry, coordinator)
 
-    for device in onecta_data.devices.values():
-        entities.append(DaikinRefreshButton(device, config_entry, coordinator))
-
-    if entities:
-        async_add_entities(entities)
+    async_add_planned_entities(hass, config_entry, Platform.BUTTON, create_button, async_add_entities)
 
 
 class DaikinRefreshButton(CoordinatorEntity, ButtonEntity):
@@ -54,7 +52,8 @@ class DaikinRefreshButton(CoordinatorEntity, ButtonEntity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id):
+            self.async_write_ha_state()
 
     async def async_press(self) -> None:
         await self.coordinator._async_update_data()
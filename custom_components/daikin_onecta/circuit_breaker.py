@@ -0,0 +1,105 @@
+"""Circuit breaker for the requests to the Daikin cloud."""
+import logging
+import time
+
+from aiohttp import ClientError
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 60
+MAX_RESET_TIMEOUT = 600
+
+
+class CircuitOpenError(ClientError):
+    """Raised instead of sending a request while the Daikin cloud is considered down.
+
+    It is a ClientError so the coordinator and the entities handle it like the
+    network error they would otherwise get after a timeout.
+    """
+
+
+class CircuitBreaker:
+    """Fail fast while the Daikin cloud is down.
+
+    After FAILURE_THRESHOLD consecutive failures (network errors and 5xx responses) the
+    circuit opens and requests fail immediately. When the reset timeout has passed a
+    single probe request is let through, its success closes the circuit, its failure
+    opens it again with a doubled reset timeout.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed circuit."""
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._reset_timeout = RESET_TIMEOUT
+        self._opened_at = 0.0
+        # Token of the request probing the cloud in the half open state
+        self._probe = None
+
+    def _seconds_until_probe(self) -> float:
+        return max(self._opened_at + self._reset_timeout - time.monotonic(), 0)
+
+    def check(self) -> None:
+        """Raise CircuitOpenError when a request would be rejected, without starting a probe."""
+        if self.state == STATE_OPEN and self._seconds_until_probe() > 0:
+            raise CircuitOpenError(f"Daikin cloud unavailable, next attempt in {self._seconds_until_probe():.0f} seconds")
+        if self.state == STATE_HALF_OPEN and self._probe is not None:
+            raise CircuitOpenError("Daikin cloud unavailable, waiting for the result of a probe request")
+
+    def before_request(self) -> object | None:
+        """Raise CircuitOpenError when the request has to fail fast, otherwise let it through.
+
+        Returns the token to pass to release() when the request is the probe, otherwise None.
+        """
+        self.check()
+        if self.state == STATE_OPEN:
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN:
+            _LOGGER.info("Daikin cloud circuit half open, sending a probe request")
+            self._probe = object()
+            return self._probe
+        return None
+
+    def record_success(self) -> None:
+        """Record a request which reached the Daikin cloud."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Daikin cloud circuit closed, the cloud is reachable again")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._reset_timeout = RESET_TIMEOUT
+        self._probe = None
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._open(min(self._reset_timeout * 2, MAX_RESET_TIMEOUT))
+        elif self.state == STATE_CLOSED and self.failures >= FAILURE_THRESHOLD:
+            self._open(RESET_TIMEOUT)
+
+    def release(self, probe: object | None) -> None:
+        """End a request with the token of before_request(), a probe which didn't complete allows a new probe."""
+        if probe is not None and probe is self._probe:
+            self._probe = None
+
+    def _open(self, reset_timeout: float) -> None:
+        _LOGGER.warning("Daikin cloud circuit open after %s failures, retrying in %s seconds", self.failures, reset_timeout)
+        self.state = STATE_OPEN
+        self.trips += 1
+        self._reset_timeout = reset_timeout
+        self._opened_at = time.monotonic()
+        self._probe = None
+
+    def values(self) -> dict:
+        """Return the state to expose as sensor, system health and diagnostics."""
+        return {
+            "circuit_state": self.state,
+            "circuit_failures": self.failures,
+            "circuit_trips": self.trips,
+        }
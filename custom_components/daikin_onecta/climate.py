@@ -1,6 +1,7 @@
 """Support for the Daikin HVAC."""
 import logging
 import re
+from dataclasses import dataclass
 from datetime import date
 from datetime import timedelta
 
@@ -24,6 +25,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_NAME
+from homeassistant.const import Platform
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
@@ -35,7 +37,8 @@ from .const import DOMAIN
 from .const import FANMODE_FIXED
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
-from .coordinator import OnectaRuntimeData
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -81,39 +84,37 @@ HA_PRESET_TO_DAIKIN = {
 }
 
 
+@dataclass(slots=True)
+class ClimateSnapshot:
+    """The parts of the climateControl management point an update of the climate entity reads.
+
+    Resolved once per update so that the getters don't have to look up the management
+    point and walk the operation mode, setpoint and fanControl dicts again.
+    """
+
+    climate_control: dict | None = None
+    # The operationMode characteristic
+    operation_mode: dict | None = None
+    # The setpoint dict of our setpoint for the current operation mode
+    setpoint: dict | None = None
+    # The fanControl branch for the current operation mode
+    fan_operation_mode: dict | None = None
+    # The value of the sensoryData characteristic
+    sensory_data: dict | None = None
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Daikin climate based on config_entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    for device in onecta_data.devices.values():
-        modes = []
-        device_model = device.daikin_data["deviceModel"]
-        supported_management_point_types = {"climateControl"}
-        managementPoints = device.daikin_data.get("managementPoints", [])
-        embedded_id = ""
-        for management_point in managementPoints:
-            management_point_type = management_point["managementPointType"]
-            if management_point_type in supported_management_point_types:
-                embedded_id = management_point.get("embeddedId")
-                # Check if we have a temperatureControl
-                temperatureControl = management_point.get("temperatureControl")
-                if temperatureControl is not None:
-                    for operationmode in temperatureControl["value"]["operationModes"]:
-                        # for modes in operationmode["setpoints"]:
-                        for c in temperatureControl["value"]["operationModes"][operationmode]["setpoints"]:
-                            modes.append(c)
-        # Remove duplicates
-        modes = list(dict.fromkeys(modes))
-        _LOGGER.info("Climate: Device '%s' has modes %s", device_model, modes)
-        for mode in modes:
-            async_add_entities(
-                [DaikinClimate(device, mode, coordinator, embedded_id)],
-                update_before_add=False,
-            )
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_climate(device, plan: EntityPlan):
+        return DaikinClimate(device, plan.value, coordinator, plan.embedded_id)
+
+    async_add_planned_entities(hass, config_entry, Platform.CLIMATE, create_climate, async_add_entities, update_before_add=False)
 
 
 class DaikinClimate(CoordinatorEntity, ClimateEntity):
@@ -141,6 +142,7 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         self._device.fill_device_info(self._attr_device_info, "gateway")
         sensor_settings = VALUE_SENSOR_MAPPING.get(setpoint)
         self._attr_translation_key = sensor_settings[TRANSLATION_KEY]
+        self._snapshot = ClimateSnapshot()
         self.update_state()
 
     def update_state(self) -> None:
@@ -152,6 +154,9 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         # views of the same state that must be kept in sync by hand in every handler;
         # a future handler that mutates one and forgets the other will only surface as
         # a UI/state mismatch until the next coordinator refresh overwrites both.
+        self._snapshot = self._resolve_snapshot()
+        # The supported features depend on the preset modes
+        self._attr_preset_modes = self.get_preset_modes()
         self._attr_supported_features = self.get_supported_features()
         self._attr_current_temperature = self.get_current_temperature()
         self._attr_max_temp = self.get_max_temp()
@@ -161,39 +166,80 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         self._attr_hvac_modes = self.get_hvac_modes()
         self._attr_swing_modes = self.get_swing_modes()
         self._attr_swing_horizontal_modes = self.get_swing_horizontal_modes()
-        self._attr_preset_modes = self.get_preset_modes()
         self._attr_fan_modes = self.get_fan_modes()
         self._attr_hvac_mode = self.get_hvac_mode()
         self._attr_swing_mode = self.get_swing_mode()
         self._attr_swing_horizontal_mode = self.get_swing_horizontal_mode()
         self._attr_preset_mode = self.get_preset_mode()
         self._attr_fan_mode = self.get_fan_mode()
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Device '%s' %s hvac mode '%s' of %s, temperature '%s' target '%s' (%s-%s step %s), fan mode '%s' of %s, "
+                "swing mode '%s' of %s, horizontal swing mode '%s' of %s, preset mode '%s' of %s, features %s",
+                self._device.name,
+                self._setpoint,
+                self._attr_hvac_mode,
+                self._attr_hvac_modes,
+                self._attr_current_temperature,
+                self._attr_target_temperature,
+                self._attr_min_temp,
+                self._attr_max_temp,
+                self._attr_target_temperature_step,
+                self._attr_fan_mode,
+                self._attr_fan_modes,
+                self._attr_swing_mode,
+                self._attr_swing_modes,
+                self._attr_swing_horizontal_mode,
+                self._attr_swing_horizontal_modes,
+                self._attr_preset_mode,
+                self._attr_preset_modes,
+                self._attr_supported_features,
+            )
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id):
+            self.update_state()
+            self.async_write_ha_state()
 
     @property
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
+    def _resolve_snapshot(self) -> ClimateSnapshot:
+        """Resolve the climateControl data for the current operation mode."""
+        snapshot = ClimateSnapshot(self._device.management_point_by_type("climateControl"))
+        cc = snapshot.climate_control
+        if cc is None:
+            return snapshot
+
+        snapshot.operation_mode = cc.get("operationMode")
+        if snapshot.operation_mode is not None:
+            operation_mode = snapshot.operation_mode.get("value")
+            # For not all operationModes there is a temperatureControl setpoint available
+            temperature_control = cc.get("temperatureControl")
+            if temperature_control is not None:
+                oo = temperature_control["value"]["operationModes"].get(operation_mode)
+                if oo is not None:
+                    snapshot.setpoint = oo["setpoints"].get(self._setpoint)
+            fan_control = cc.get("fanControl")
+            if fan_control is not None:
+                snapshot.fan_operation_mode = fan_control["value"]["operationModes"].get(operation_mode)
+
+        sensory_data = cc.get("sensoryData")
+        if sensory_data is not None:
+            snapshot.sensory_data = sensory_data.get("value")
+        return snapshot
+
     def climate_control(self):
-        cc = None
-        supported_management_point_types = {"climateControl"}
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            if management_point_type in supported_management_point_types:
-                cc = management_point
-        return cc
+        return self._snapshot.climate_control
 
     def operation_mode(self):
-        om = None
-        cc = self.climate_control()
-        if cc is not None:
-            om = cc.get("operationMode")
-        return om
+        return self._snapshot.operation_mode
 
     @property
     def _homekit_fan_mode_aliases_enabled(self):
@@ -246,49 +292,13 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         return self._homekit_fan_mode_aliases(fan_speed).get(fan_mode, fan_mode)
 
     def setpoint(self):
-        setpoint = None
-        cc = self.climate_control()
-        if cc is not None:
-            # Check if we have a temperatureControl
-            temperature_control = cc.get("temperatureControl")
-            if temperature_control is not None:
-                operation_mode_data = cc.get("operationMode")
-                if operation_mode_data is not None:
-                    operation_mode = operation_mode_data.get("value")
-                    # For not all operationModes there is a temperatureControl setpoint available
-                    oo = temperature_control["value"]["operationModes"].get(operation_mode)
-                    if oo is not None:
-                        setpoint = oo["setpoints"].get(self._setpoint)
-                    _LOGGER.debug(
-                        "Device '%s' %s operation mode %s has setpoint %s",
-                        self._device.name,
-                        self._setpoint,
-                        operation_mode,
-                        setpoint,
-                    )
-        return setpoint
+        return self._snapshot.setpoint
 
     def sensory_data(self, setpoint):
-        sensoryData = None
-        supported_management_point_types = {"climateControl"}
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            if management_point_type in supported_management_point_types:
-                # Check if we have a sensoryData
-                sensoryData = management_point.get("sensoryData")
-                _LOGGER.debug("Climate: Device sensoryData %s", sensoryData)
-                if sensoryData is not None:
-                    value = sensoryData.get("value")
-                    if value is not None:
-                        sensoryData = value.get(setpoint)
-                        _LOGGER.debug(
-                            "Device '%s' %s sensoryData %s",
-                            self._device.name,
-                            setpoint,
-                            sensoryData,
-                        )
-        return sensoryData
+        sensory_data = None
+        if self._snapshot.sensory_data is not None:
+            sensory_data = self._snapshot.sensory_data.get(setpoint)
+        return sensory_data
 
     def get_supported_features(self):
         supported_features = 0
@@ -297,27 +307,18 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         setpointdict = self.setpoint()
         if setpointdict is not None and setpointdict["settable"] is True:
             supported_features |= ClimateEntityFeature.TARGET_TEMPERATURE
-        if len(self.get_preset_modes()) > 1:
+        if len(self._attr_preset_modes) > 1:
             supported_features |= ClimateEntityFeature.PRESET_MODE
-        cc = self.climate_control()
-        if cc is not None:
-            fanControl = cc.get("fanControl")
-            if fanControl is not None:
-                operation_mode_data = cc.get("operationMode")
-                if operation_mode_data is not None:
-                    operationmode = operation_mode_data.get("value")
-                    operationmodedict = fanControl["value"]["operationModes"].get(operationmode)
-                    if operationmodedict is not None:
-                        if operationmodedict.get("fanSpeed") is not None:
-                            supported_features |= ClimateEntityFeature.FAN_MODE
-                        fan_direction = operationmodedict.get("fanDirection")
-                        if fan_direction is not None:
-                            if fan_direction.get("vertical") is not None:
-                                supported_features |= ClimateEntityFeature.SWING_MODE
-                            if fan_direction.get("horizontal") is not None:
-                                supported_features |= ClimateEntityFeature.SWING_HORIZONTAL_MODE
-
-            _LOGGER.debug("Device '%s' supports features %s", self._device.name, supported_features)
+        operationmodedict = self._snapshot.fan_operation_mode
+        if operationmodedict is not None:
+            if operationmodedict.get("fanSpeed") is not None:
+                supported_features |= ClimateEntityFeature.FAN_MODE
+            fan_direction = operationmodedict.get("fanDirection")
+            if fan_direction is not None:
+                if fan_direction.get("vertical") is not None:
+                    supported_features |= ClimateEntityFeature.SWING_MODE
+                if fan_direction.get("horizontal") is not None:
+                    supported_features |= ClimateEntityFeature.SWING_HORIZONTAL_MODE
 
         return supported_features
 
@@ -340,12 +341,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
             lwsensor = self.sensory_data("leavingWaterTemperature")
             if self._setpoint == "leavingWaterOffset" and lwsensor is not None:
                 current_temp = lwsensor["value"]
-        _LOGGER.debug(
-            "Device '%s' %s current temperature '%s'",
-            self._device.name,
-            self._setpoint,
-            current_temp,
-        )
         return current_temp
 
     def get_max_temp(self):
@@ -355,12 +350,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
             max_temp = setpointdict["maxValue"]
         else:
             max_temp = super().max_temp
-        _LOGGER.debug(
-            "Device '%s' %s max temperature '%s'",
-            self._device.name,
-            self._setpoint,
-            max_temp,
-        )
         return max_temp
 
     def get_min_temp(self):
@@ -370,12 +359,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
             min_temp = setpointdict["minValue"]
         else:
             min_temp = super().min_temp
-        _LOGGER.debug(
-            "Device '%s' %s min temperature '%s'",
-            self._device.name,
-            self._setpoint,
-            min_temp,
-        )
         return min_temp
 
     def get_target_temperature(self):
@@ -383,12 +366,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
         setpointdict = self.setpoint()
         if setpointdict is not None:
             value = setpointdict["value"]
-        _LOGGER.debug(
-            "Device '%s' %s target temperature '%s'",
-            self._device.name,
-            self._setpoint,
-            value,
-        )
         return value
 
     def get_target_temperature_step(self):
@@ -400,12 +377,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
                 step_value = setpointdict["stepValue"]
             else:
                 step_value = super().target_temperature_step
-        _LOGGER.debug(
-            "Device '%s' %s target temperature step '%s'",
-            self._device.name,
-            self._setpoint,
-            step_value,
-        )
         return step_value
 
     async def async_set_temperature(self, **kwargs):
@@ -454,12 +425,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
             if onoff is not None:
                 if onoff["value"] != "off" and operationmode is not None:
                     mode = operationmode["value"]
-            _LOGGER.debug(
-                "Device '%s' %s hvac mode '%s'",
-                self._device.name,
-                self._setpoint,
-                mode,
-            )
         return DAIKIN_HVAC_TO_HA.get(mode, HVACMode.HEAT_COOL)
 
     def get_hvac_modes(self):
@@ -543,66 +508,45 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
 
     def get_fan_mode(self):
         fan_mode = None
-        cc = self.climate_control()
-        # Check if we have a fanControl
-        fanControl = cc.get("fanControl")
-        if fanControl is not None:
-            operation_mode = cc["operationMode"]["value"]
-            operationmodedict = fanControl["value"]["operationModes"].get(operation_mode)
-            if operationmodedict is not None:
-                fan_speed = operationmodedict.get("fanSpeed")
-                if fan_speed is not None:
-                    mode = fan_speed["currentMode"]["value"]
-                    if mode == FANMODE_FIXED:
-                        fsm = fan_speed.get("modes")
-                        if fsm is not None:
-                            fixedModes = fsm[mode]
-                            fan_mode = str(fixedModes["value"])
-                    else:
-                        fan_mode = mode
-                    fan_mode = self._get_homekit_fan_mode(fan_speed, fan_mode)
-
-        _LOGGER.debug(
-            "Device '%s' has fan mode '%s'",
-            self._device.name,
-            fan_mode,
-        )
+        # Check if we have a fanControl for the current operation mode
+        operationmodedict = self._snapshot.fan_operation_mode
+        if operationmodedict is not None:
+            fan_speed = operationmodedict.get("fanSpeed")
+            if fan_speed is not None:
+                mode = fan_speed["currentMode"]["value"]
+                if mode == FANMODE_FIXED:
+                    fsm = fan_speed.get("modes")
+                    if fsm is not None:
+                        fixedModes = fsm[mode]
+                        fan_mode = str(fixedModes["value"])
+                else:
+                    fan_mode = mode
+                fan_mode = self._get_homekit_fan_mode(fan_speed, fan_mode)
 
         return fan_mode
 
     def get_fan_modes(self):
         fan_modes = []
-        cc = self.climate_control()
-        # Check if we have a fanControl
-        fan_control = cc.get("fanControl")
-        if fan_control is not None:
-            operation_mode = cc["operationMode"]["value"]
-            operationmodedict = fan_control["value"]["operationModes"].get(operation_mode)
-            if operationmodedict is not None:
-                fan_speed = operationmodedict.get("fanSpeed")
-                if fan_speed is not None:
-                    _LOGGER.debug("Device '%s' has fanspeed %s", self._device.name, fan_speed)
-                    for c in fan_speed["currentMode"]["values"]:
-                        if c == FANMODE_FIXED:
-                            fsm = fan_speed.get("modes")
-                            if fsm is not None:
-                                fixedModes = fsm[c]
-                                min_val = int(fixedModes["minValue"])
-                                max_val = int(fixedModes["maxValue"])
-                                step_value = int(fixedModes["stepValue"])
-                                for val in range(min_val, max_val + 1, step_value):
-                                    fan_modes.append(str(val))
-                        else:
-                            fan_modes.append(c)
-                    for alias in self._homekit_fan_mode_aliases(fan_speed):
-                        if alias not in fan_modes:
-                            fan_modes.append(alias)
-
-        _LOGGER.debug(
-            "Device '%s' has fan modes '%s'",
-            self._device.name,
-            fan_modes,
-        )
+        # Check if we have a fanControl for the current operation mode
+        operationmodedict = self._snapshot.fan_operation_mode
+        if operationmodedict is not None:
+            fan_speed = operationmodedict.get("fanSpeed")
+            if fan_speed is not None:
+                for c in fan_speed["currentMode"]["values"]:
+                    if c == FANMODE_FIXED:
+                        fsm = fan_speed.get("modes")
+                        if fsm is not None:
+                            fixedModes = fsm[c]
+                            min_val = int(fixedModes["minValue"])
+                            max_val = int(fixedModes["maxValue"])
+                            step_value = int(fixedModes["stepValue"])
+                            for val in range(min_val, max_val + 1, step_value):
+                                fan_modes.append(str(val))
+                    else:
+                        fan_modes.append(c)
+                for alias in self._homekit_fan_mode_aliases(fan_speed):
+                    if alias not in fan_modes:
+                        fan_modes.append(alias)
 
         return fan_modes
 
@@ -703,28 +647,13 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
 
     def __get_swing_mode(self, direction):
         swingMode = ""
-        settable = False
-        cc = self.climate_control()
-        fanControl = cc.get("fanControl")
-        if fanControl is not None:
-            operationmode = cc["operationMode"]["value"]
-            operationmodedict = fanControl["value"]["operationModes"].get(operationmode)
-            if operationmodedict is not None:
-                fan_direction = operationmodedict.get("fanDirection")
-                if fan_direction is not None:
-                    fd = fan_direction.get(direction)
-                    if fd is not None:
-                        settable = fd["currentMode"].get("settable", False)
-                        swingMode = fd["currentMode"]["value"].lower()
-
-        _LOGGER.debug(
-            "Device '%s' has %s swing mode '%s' and is settable %s",
-            self._device.name,
-            direction,
-            swingMode,
-            settable,
-        )
-
+        operationmodedict = self._snapshot.fan_operation_mode
+        if operationmodedict is not None:
+            fan_direction = operationmodedict.get("fanDirection")
+            if fan_direction is not None:
+                fd = fan_direction.get(direction)
+                if fd is not None:
+                    swingMode = fd["currentMode"]["value"].lower()
         return swingMode
 
     def get_swing_mode(self):
@@ -735,20 +664,14 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
 
     def __get_swing_modes(self, direction):
         swingModes = []
-        cc = self.climate_control()
-        fanControl = cc.get("fanControl")
-        if fanControl is not None:
-            swingModes = []
-            operationmode = cc["operationMode"]["value"]
-            operationmodedict = fanControl["value"]["operationModes"].get(operationmode)
-            if operationmodedict is not None:
-                fanDirection = operationmodedict.get("fanDirection")
-                if fanDirection is not None:
-                    vertical = fanDirection.get(direction)
-                    if vertical is not None:
-                        for mode in vertical["currentMode"]["values"]:
-                            swingModes.append(mode.lower())
-        _LOGGER.debug("Device '%s' support %s swing modes %s", self._device.name, direction, swingModes)
+        operationmodedict = self._snapshot.fan_operation_mode
+        if operationmodedict is not None:
+            fanDirection = operationmodedict.get("fanDirection")
+            if fanDirection is not None:
+                vertical = fanDirection.get(direction)
+                if vertical is not None:
+                    for mode in vertical["currentMode"]["values"]:
+                        swingModes.append(mode.lower())
         return swingModes
 
     def get_swing_modes(self):
@@ -912,12 +835,6 @@ class DaikinClimate(CoordinatorEntity, ClimateEntity):
                 if preset is not None and preset.get("value") is not None:
                     supported_preset_modes.append(mode)
 
-            _LOGGER.debug(
-                "Device '%s' supports preset_modes %s",
-                self._device.name,
-                format(supported_preset_modes),
-            )
-
             supported_preset_modes.sort()
 
         return supported_preset_modes
@@ -0,0 +1,34 @@
+"""JSON codec for the Daikin cloud payloads.
+
+Responses are decoded with orjson when it is available, it decodes the body bytes
+directly without creating an intermediate str. Request bodies are always encoded with
+the json module, they are small and the Daikin cloud receives them byte for byte the
+same as before.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def stdlib_decode(data: bytes | str):
+    """Decode a JSON document with the json module."""
+    return json.loads(data)
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+    decode = orjson.loads
+else:  # pragma: no cover
+    BACKEND = "json"
+    decode = stdlib_decode
+
+
+def encode(value) -> str:
+    """Encode a request body."""
+    return json.dumps(value)
@@ -15,11 +15,19 @@ from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers.selector import BooleanSelector
 from homeassistant.helpers.selector import NumberSelector
 from homeassistant.helpers.selector import NumberSelectorConfig
+from homeassistant.helpers.selector import SelectOptionDict
+from homeassistant.helpers.selector import SelectSelector
+from homeassistant.helpers.selector import SelectSelectorConfig
+from homeassistant.helpers.selector import SelectSelectorMode
 from homeassistant.helpers.selector import TimeSelector
 from homeassistant.helpers.service_info.zeroconf import ZeroconfServiceInfo
 
 from .const import CONF_HOMEKIT_FAN_MODE_ALIASES
+from .const import DEFAULT_LOW_PRIORITY_INTERVAL
 from .const import DOMAIN
+from .payload_log import DEFAULT_PAYLOAD_LOG_BYTES
+from .payload_log import DEFAULT_PAYLOAD_LOG_INTERVAL
+from .retry import DEFAULT_RETRY_ATTEMPTS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +38,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         """Initialize Daikin Onecta options flow."""
         self.options = dict(config_entry.options)
+        # The devices can only be offered when the config entry is loaded
+        onecta_data = getattr(config_entry, "runtime_data", None)
+        self._devices = {device_id: device.name for device_id, device in onecta_data.devices.items()} if onecta_data is not None else {}
 
     async def async_step_init(self, user_input: dict[str, str] | None = None) -> FlowResult:
         """Handle a flow initialized by the user."""
@@ -37,6 +48,21 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        priority_schema = {}
+        if self._devices:
+            priority_schema[
+                vol.Optional(
+                    "low_priority_devices",
+                    default=[device_id for device_id in self.options.get("low_priority_devices", []) if device_id in self._devices],
+                )
+            ] = SelectSelector(
+                SelectSelectorConfig(
+                    options=[SelectOptionDict(value=device_id, label=name) for device_id, name in self._devices.items()],
+                    multiple=True,
+                    mode=SelectSelectorMode.DROPDOWN,
+                ),
+            )
+
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
@@ -67,6 +93,53 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     ): NumberSelector(
                         NumberSelectorConfig(min=20, max=300, step=1),
                     ),
+                    vol.Required(
+                        "patch_coalesce_window",
+                        default=self.options.get("patch_coalesce_window", 0),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, max=5000, step=50),
+                    ),
+                    vol.Required(
+                        "command_reserve",
+                        default=self.options.get("command_reserve", 20),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, max=100, step=1),
+                    ),
+                    **priority_schema,
+                    vol.Required(
+                        "low_priority_interval",
+                        default=self.options.get("low_priority_interval", DEFAULT_LOW_PRIORITY_INTERVAL),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=10, max=1440, step=1),
+                    ),
+                    vol.Required(
+                        "cache_max_age",
+                        default=self.options.get("cache_max_age", 24),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, max=168, step=1),
+                    ),
+                    vol.Required(
+                        "energy_statistics",
+                        default=self.options.get("energy_statistics", True),
+                    ): BooleanSelector(),
+                    vol.Required(
+                        "retry_attempts",
+                        default=self.options.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, max=5, step=1),
+                    ),
+                    vol.Required(
+                        "payload_log_bytes",
+                        default=self.options.get("payload_log_bytes", DEFAULT_PAYLOAD_LOG_BYTES),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=0, max=1048576, step=256),
+                    ),
+                    vol.Required(
+                        "payload_log_interval",
+                        default=self.options.get("payload_log_interval", DEFAULT_PAYLOAD_LOG_INTERVAL),
+                    ): NumberSelector(
+                        NumberSelectorConfig(min=1, max=100, step=1),
+                    ),
                     vol.Required(
                         CONF_HOMEKIT_FAN_MODE_ALIASES,
                         default=self.options.get(CONF_HOMEKIT_FAN_MODE_ALIASES, False),
@@ -0,0 +1,210 @@
+"""Confirmation of the writes to the Daikin cloud."""
+import logging
+import re
+import statistics
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from . import codec
+
+_LOGGER = logging.getLogger(__name__)
+
+WRITE_URL = re.compile(r"/v1/gateway-devices/(?P<device>[^/]+)/management-points/(?P<embedded_id>[^/]+)/(?P<target>.+)$")
+CHARACTERISTIC_TARGET = re.compile(r"characteristics/(?P<characteristic>[^/]+)$")
+
+# Seconds after a write the Daikin cloud is expected to return the written value
+DEFAULT_CONFIRM_DELAY = 10.0
+MIN_CONFIRM_DELAY = 2.0
+MAX_CONFIRM_DELAY = 120.0
+# A stale read at the expected moment moves it later, a confirmed write lets it slowly move earlier
+STALE_BACKOFF = 1.5
+FRESH_DECAY = 0.9
+# Number of confirmation polls per device model kept for the diagnostics
+ROLLING_OBSERVATIONS = 20
+UNKNOWN_MODEL = "unknown"
+
+_MISSING = object()
+
+
+@dataclass(slots=True)
+class PendingWrite:
+    """Write accepted by the Daikin cloud which a poll hasn't confirmed yet.
+
+    characteristic, path and value are only known for a PATCH of a characteristic,
+    other writes are only used to schedule the confirmation poll.
+    """
+
+    device_id: str
+    embedded_id: str
+    model: str
+    written_at: float
+    characteristic: str | None = None
+    path: str | None = None
+    value: Any = _MISSING
+
+
+def characteristic_value(device_data: dict, embedded_id: str, characteristic: str, path: str | None) -> Any:
+    """Return the value of a characteristic in a device payload, _MISSING when it isn't there."""
+    for management_point in device_data.get("managementPoints", []):
+        if management_point.get("embeddedId") == embedded_id:
+            node = management_point.get(characteristic, {}).get("value", _MISSING)
+            if path:
+                for segment in path.strip("/").split("/"):
+                    if not isinstance(node, dict):
+                        return _MISSING
+                    node = node.get(segment, _MISSING)
+                node = node.get("value", _MISSING) if isinstance(node, dict) else _MISSING
+            return node
+    return _MISSING
+
+
+class StalenessWindow:
+    """Learned read-after-write staleness of the Daikin cloud for one device model.
+
+    delay is the number of seconds after a write the cloud is expected to return the
+    written value. A stale read at or after that moment pushes it later, a confirmed
+    write lets it slowly move earlier so that the window follows a faster cloud again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with the default window."""
+        self.delay = DEFAULT_CONFIRM_DELAY
+        self.confirmed = 0
+        self.stale = 0
+        # Age of the write at the last confirmation polls as (seconds, fresh)
+        self._observations: deque[tuple[float, bool]] = deque(maxlen=ROLLING_OBSERVATIONS)
+
+    def record_fresh(self, age: float) -> None:
+        """Record a poll returning the written value age seconds after the write."""
+        self.confirmed += 1
+        self._observations.append((age, True))
+        self.delay = max(self.delay * FRESH_DECAY, MIN_CONFIRM_DELAY)
+
+    def record_stale(self, age: float) -> None:
+        """Record a poll returning the settings from before the write age seconds after it."""
+        self.stale += 1
+        self._observations.append((age, False))
+        if age >= self.delay:
+            # We expected fresh data, the cloud needs more time
+            self.delay = min(age * STALE_BACKOFF, MAX_CONFIRM_DELAY)
+
+    def values(self) -> dict:
+        """Return the window to expose in the diagnostics."""
+        fresh_ages = [age for age, fresh in self._observations if fresh]
+        stale_ages = [age for age, fresh in self._observations if not fresh]
+        return {
+            "confirm_delay": round(self.delay, 1),
+            "confirmed": self.confirmed,
+            "stale": self.stale,
+            "median_confirmed_age": round(statistics.median(fresh_ages), 1) if fresh_ages else None,
+            "max_stale_age": round(max(stale_ages), 1) if stale_ages else None,
+        }
+
+
+class WriteConfirmation:
+    """Track the writes which the Daikin cloud hasn't confirmed yet.
+
+    For a while after a write the Daikin cloud returns the settings from before the write.
+    Instead of ignoring all polls for a fixed time, a single poll is done at the moment the
+    cloud is expected to return fresh data. That moment is learned per device model from
+    the confirmation polls, the cloud doesn't return fresh data equally fast for all models.
+    """
+
+    def __init__(self, device_model: Callable[[str], str | None]) -> None:
+        """Initialize with a function returning the model of a device id."""
+        self._device_model = device_model
+        self.windows: dict[str, StalenessWindow] = {}
+        self.pending: list[PendingWrite] = []
+        self.expired = 0
+
+    def window(self, model: str) -> StalenessWindow:
+        """Return the learned staleness window of a device model."""
+        window = self.windows.get(model)
+        if window is None:
+            window = self.windows[model] = StalenessWindow()
+        return window
+
+    def add(self, method: str, resource_url: str, body: str | None) -> PendingWrite | None:
+        """Add a write accepted by the Daikin cloud, replaces a pending write of the same characteristic."""
+        match = WRITE_URL.search(resource_url)
+        if match is None:
+            return None
+        model = self._device_model(match["device"]) or UNKNOWN_MODEL
+        write = PendingWrite(match["device"], match["embedded_id"], model, time.monotonic())
+        characteristic = CHARACTERISTIC_TARGET.match(match["target"])
+        if method == "PATCH" and characteristic is not None and body:
+            data = codec.decode(body)
+            write.characteristic = characteristic["characteristic"]
+            write.path = data.get("path")
+            write.value = data.get("value")
+        self.pending = [
+            pending
+            for pending in self.pending
+            if (pending.device_id, pending.embedded_id, pending.characteristic, pending.path)
+            != (write.device_id, write.embedded_id, write.characteristic, write.path)
+        ]
+        self.pending.append(write)
+        return write
+
+    def confirm_at(self, max_age: float) -> float | None:
+        """Return the monotonic time of the confirmation poll, None when no write is pending."""
+        if not self.pending:
+            return None
+        return max(write.written_at + min(self.window(write.model).delay, max_age) for write in self.pending)
+
+    def reconcile(self, json_data: list, max_age: float) -> tuple[set, set]:
+        """Compare the pending writes with a payload.
+
+        Returns the characteristics of which the payload still has the value from before a
+        write, and the characteristics of the writes which are confirmed or given up on, both
+        as (device_id, embedded_id, characteristic) tuples. A write which isn't confirmed within max_age seconds is given up on, the
+        value of the cloud is used.
+        """
+        now = time.monotonic()
+        devices = {device_data["id"]: device_data for device_data in json_data or []}
+        stale = set()
+        settled = set()
+        pending = []
+        for write in self.pending:
+            age = now - write.written_at
+            window = self.window(write.model)
+            device_data = devices.get(write.device_id)
+            if device_data is None:
+                continue
+            if write.value is _MISSING:
+                # Nothing to compare, the poll at the expected moment completes the write
+                if age < min(window.delay, max_age):
+                    pending.append(write)
+                continue
+            value = characteristic_value(device_data, write.embedded_id, write.characteristic, write.path)
+            if value == write.value:
+                window.record_fresh(age)
+                settled.add((write.device_id, write.embedded_id, write.characteristic))
+            elif value is _MISSING or age >= max_age:
+                self.expired += 1
+                _LOGGER.warning(
+                    "Device '%s' didn't confirm %s%s within %s seconds, using the value of the Daikin cloud",
+                    write.device_id,
+                    write.characteristic,
+                    write.path or "",
+                    max_age,
+                )
+                settled.add((write.device_id, write.embedded_id, write.characteristic))
+            else:
+                window.record_stale(age)
+                _LOGGER.debug("Device '%s' returned a stale %s%s after %.1f seconds", write.device_id, write.characteristic, write.path or "", age)
+                stale.add((write.device_id, write.embedded_id, write.characteristic))
+                pending.append(write)
+        self.pending = pending
+        return stale, settled
+
+    def values(self) -> dict:
+        """Return the state to expose in the diagnostics."""
+        return {
+            "pending_writes": len(self.pending),
+            "expired": self.expired,
+            "staleness_windows": {model: window.values() for model, window in self.windows.items()},
+        }
@@ -14,6 +14,7 @@ from homeassistant.const import UnitOfDensity
 from homeassistant.const import UnitOfEnergy
 from homeassistant.const import UnitOfPower
 from homeassistant.const import UnitOfTemperature
+from homeassistant.const import UnitOfTime
 from homeassistant.helpers.entity import EntityCategory
 
 DOMAIN = "daikin_onecta"
@@ -27,6 +28,9 @@ SCHEDULE_OFF = "off"
 
 CONF_HOMEKIT_FAN_MODE_ALIASES = "homekit_fan_mode_aliases"
 
+# Minutes between the entity updates of low priority devices
+DEFAULT_LOW_PRIORITY_INTERVAL = 60
+
 FANMODE_FIXED = "fixed"
 
 SENSOR_PERIOD_DAILY = "d"
@@ -635,6 +639,60 @@ VALUE_SENSOR_MAPPING = {
         ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
         TRANSLATION_KEY: "ratelimitremainingday",
     },
+    "RatelimitPlannedPolls": {
+        CONF_DEVICE_CLASS: None,
+        CONF_STATE_CLASS: SensorStateClass.MEASUREMENT,
+        CONF_UNIT_OF_MEASUREMENT: None,
+        CONF_ICON: "mdi:calendar-clock",
+        ENABLED_DEFAULT: True,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "ratelimitplannedpolls",
+    },
+    "RatelimitCommandReserve": {
+        CONF_DEVICE_CLASS: None,
+        CONF_STATE_CLASS: SensorStateClass.MEASUREMENT,
+        CONF_UNIT_OF_MEASUREMENT: None,
+        CONF_ICON: "mdi:gesture-tap",
+        ENABLED_DEFAULT: True,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "ratelimitcommandreserve",
+    },
+    "CloudCircuitState": {
+        CONF_DEVICE_CLASS: None,
+        CONF_STATE_CLASS: None,
+        CONF_UNIT_OF_MEASUREMENT: None,
+        CONF_ICON: "mdi:cloud-alert-outline",
+        ENABLED_DEFAULT: True,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "cloudcircuitstate",
+    },
+    "ApiAverageLatency": {
+        CONF_DEVICE_CLASS: SensorDeviceClass.DURATION,
+        CONF_STATE_CLASS: SensorStateClass.MEASUREMENT,
+        CONF_UNIT_OF_MEASUREMENT: UnitOfTime.MILLISECONDS,
+        CONF_ICON: "mdi:timer-outline",
+        ENABLED_DEFAULT: False,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "apiaveragelatency",
+    },
+    "ApiAverageSchedulerWait": {
+        CONF_DEVICE_CLASS: SensorDeviceClass.DURATION,
+        CONF_STATE_CLASS: SensorStateClass.MEASUREMENT,
+        CONF_UNIT_OF_MEASUREMENT: UnitOfTime.MILLISECONDS,
+        CONF_ICON: "mdi:timer-sand",
+        ENABLED_DEFAULT: False,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "apiaverageschedulerwait",
+    },
+    "ApiRequestErrors": {
+        CONF_DEVICE_CLASS: None,
+        CONF_STATE_CLASS: SensorStateClass.TOTAL_INCREASING,
+        CONF_UNIT_OF_MEASUREMENT: None,
+        CONF_ICON: "mdi:alert-circle-outline",
+        ENABLED_DEFAULT: False,
+        ENTITY_CATEGORY: EntityCategory.DIAGNOSTIC,
+        TRANSLATION_KEY: "apirequesterrors",
+    },
     "FirmwareUpdate": {
         CONF_DEVICE_CLASS: UpdateDeviceClass.FIRMWARE,
         CONF_STATE_CLASS: None,
@@ -1,21 +1,55 @@
 """Coordinator for Daikin Onecta integration."""
+import copy
 import logging
 import random
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.core import HassJob
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
+from .circuit_breaker import STATE_CLOSED
+from .confirmation import MIN_CONFIRM_DELAY
+from .confirmation import WriteConfirmation
+from .const import DEFAULT_LOW_PRIORITY_INTERVAL
 from .const import DOMAIN
 from .daikin_api import DaikinApi
+from .daikin_api import PAYLOAD_UNCHANGED
 from .device import DaikinOnectaDevice
+from .discovery import discover_entities
+from .discovery import EntityPlan
+from .discovery import signal_plans_changed
+from .ratelimit import async_get_governor
+from .ratelimit import RateLimitBudget
+from .statistics import EnergyStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+# State attribute of the entities showing their last known state while the Daikin cloud is unreachable
+ATTR_STALE = "stale"
+# Seconds a device or management point has to be missing from the payloads before its
+# entities and devices are removed from the registries, until then they are unavailable
+RETIRE_ABSENT_AFTER = 24 * 3600
+
+
+def device_cache_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding the last good gateway-devices payload of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.devices")
+
 
 @dataclass
 class OnectaRuntimeData:
@@ -33,6 +67,7 @@ class OnectaDataUpdateCoordinator(DataUpdateCoordinator):
         """Initialize."""
         self.options = config_entry.options
         self._config_entry = config_entry
+        self.budget = RateLimitBudget(config_entry.runtime_data.daikin_api, self.command_reserve())
 
         super().__init__(
             hass,
@@ -41,6 +76,32 @@ class OnectaDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=self.determine_update_interval(hass),
         )
 
+        # Changed paths of the last update per device id, None means that all
+        # entities have to update (first refresh, settings changed)
+        self._changes = None
+        self._store = None
+        # Entity plans per device id, classified once when a device or management point appears
+        self.entity_plans: dict[str, list[EntityPlan]] = {}
+        # Entity plans added and removed since the platforms have been notified
+        self._added_plans: list[EntityPlan] = []
+        self._removed_plans: list[EntityPlan] = []
+        # Monotonic time at which the plans of missing devices and management points were removed
+        self._absent_plans: dict[EntityPlan, float] = {}
+        self._energy_statistics = None
+        # Writes waiting for a poll returning the written value, and the changes of the
+        # management points for which the cloud still returned the settings from before a write
+        self.confirmation = WriteConfirmation(self._device_model)
+        self._held_changes: dict[str, set] = {}
+        # Monotonic time of the last poll of all devices, the changes of the low priority
+        # devices not yet passed to their entities and when their entities last updated
+        self._last_full_poll = None
+        self._low_priority_changes: dict[str, set] = {}
+        self._low_priority_updated: dict[str, float] = {}
+        self._confirmation_unsub = None
+        # The circuit breaker rejected the requests, the entities show their last known state
+        self._cloud_stale = False
+        self._confirmation_job = HassJob(self._async_confirmation_due, "daikin_onecta write confirmation", cancel_on_shutdown=True)
+
         _LOGGER.info(
             "Daikin coordinator initialized with %s interval.",
             self.update_interval,
@@ -49,41 +110,377 @@ class OnectaDataUpdateCoordinator(DataUpdateCoordinator):
     def scan_ignore(self):
         return self.options.get("scan_ignore", 30)
 
+    def stale_attributes(self) -> dict:
+        """Return the state attributes marking the entity state as stale while the Daikin cloud is unreachable."""
+        return {ATTR_STALE: True} if self._cloud_stale else {}
+
+    def is_changed(self, device_id, embedded_id=None, characteristic=None) -> bool:
+        """Return if the last update changed data an entity depends on."""
+        if self._changes is None:
+            return True
+        device_changes = self._changes.get(device_id)
+        if not device_changes:
+            return False
+        if embedded_id is None:
+            return True
+        for changed_embedded_id, changed_characteristic in device_changes:
+            # Device level changes like isCloudConnectionUp affect all entities
+            if changed_embedded_id is None:
+                return True
+            if changed_embedded_id == embedded_id and (characteristic is None or changed_characteristic in (None, characteristic)):
+                return True
+        return False
+
+    def _device_model(self, device_id: str) -> str | None:
+        device = self._config_entry.runtime_data.devices.get(device_id)
+        if device is None:
+            return None
+        return device.daikin_data.get("deviceModel")
+
+    @callback
+    def async_write_done(self, method: str, resource_url: str, body: str | None) -> None:
+        """Plan the confirmation poll of a write accepted by the Daikin cloud."""
+        write = self.confirmation.add(method, resource_url, body)
+        if write is not None and write.characteristic is not None:
+            # The entities read the written value until the cloud confirms or rejects it
+            device = self._config_entry.runtime_data.devices.get(write.device_id)
+            if device is not None:
+                device.apply_write(write.embedded_id, write.characteristic, write.path, write.value)
+        self._async_schedule_confirmation()
+
+    @callback
+    def async_cancel_confirmation(self) -> None:
+        """Cancel the planned confirmation poll."""
+        if self._confirmation_unsub is not None:
+            self._confirmation_unsub()
+            self._confirmation_unsub = None
+
+    @callback
+    def _async_schedule_confirmation(self) -> None:
+        self.async_cancel_confirmation()
+        confirm_at = self.confirmation.confirm_at(self.scan_ignore())
+        if confirm_at is not None:
+            delay = max(confirm_at - time.monotonic(), MIN_CONFIRM_DELAY)
+            self._confirmation_unsub = async_call_later(self.hass, delay, self._confirmation_job)
+
+    @callback
+    def _async_confirmation_due(self, _now) -> None:
+        self._confirmation_unsub = None
+        self._config_entry.async_create_background_task(self.hass, self.async_refresh(), "daikin_onecta write confirmation")
+
+    def _reconcile_writes(self, stale: set, settled: set, changes: dict) -> dict:
+        """Hold back the changes of devices with a stale write and release them when the write settles.
+
+        While the cloud returns the settings from before a write, the written characteristics
+        aren't merged. Entities of that management point and device level changes, which
+        update all entities of the device, are held back so that the entities keep their
+        written state until the write is confirmed or given up on.
+        """
+        stale_management_points = {(device_id, embedded_id) for device_id, embedded_id, _ in stale}
+        stale_devices = {device_id for device_id, _, _ in stale}
+        pool = self._held_changes
+        for device_id, device_changes in changes.items():
+            pool.setdefault(device_id, set()).update(device_changes)
+        for device_id, embedded_id, characteristic in settled:
+            # The entities reconcile their optimistic state with the value of the cloud
+            pool.setdefault(device_id, set()).add((embedded_id, characteristic))
+
+        changes = {}
+        self._held_changes = {}
+        for device_id, device_changes in pool.items():
+            for change in device_changes:
+                if (device_id, change[0]) in stale_management_points or (change[0] is None and device_id in stale_devices):
+                    target = self._held_changes
+                else:
+                    target = changes
+                target.setdefault(device_id, set()).add(change)
+        return changes
+
+    def low_priority_devices(self):
+        return self.options.get("low_priority_devices", [])
+
+    def low_priority_interval(self):
+        return self.options.get("low_priority_interval", DEFAULT_LOW_PRIORITY_INTERVAL)
+
+    async def _async_fetch(self, daikin_api):
+        """Retrieve the payload to process, returns the payload and if it only holds a single device.
+
+        Between the polls of all devices a single high priority device is retrieved with the
+        device endpoint, that costs the same single call as the poll of all devices but doesn't
+        transfer and merge the low priority devices.
+        """
+        devices = self._config_entry.runtime_data.devices
+        low_priority = self.low_priority_devices()
+        high_priority = [device_id for device_id in devices if device_id not in low_priority]
+        if (
+            len(high_priority) == 1
+            and len(devices) > 1
+            and daikin_api.json_data
+            and self._last_full_poll is not None
+            and time.monotonic() - self._last_full_poll < self.low_priority_interval() * 60
+            and all(write.device_id == high_priority[0] for write in self.confirmation.pending)
+        ):
+            device_data = await daikin_api.getCloudDevice(high_priority[0])
+            if device_data is PAYLOAD_UNCHANGED:
+                return PAYLOAD_UNCHANGED, True
+            return ([device_data] if device_data else []), True
+        json_data = await daikin_api.getCloudDeviceDetails()
+        self._last_full_poll = time.monotonic()
+        return json_data, False
+
+    def _defer_low_priority(self, changes: dict) -> dict:
+        """Pass the changes of low priority devices to their entities at most once per low priority interval."""
+        now = time.monotonic()
+        low_priority = self.low_priority_devices()
+        for device_id in [device_id for device_id in self._low_priority_changes if device_id not in low_priority]:
+            # No longer low priority
+            changes.setdefault(device_id, set()).update(self._low_priority_changes.pop(device_id))
+        for device_id in low_priority:
+            device_changes = changes.pop(device_id, None)
+            if device_changes:
+                self._low_priority_changes.setdefault(device_id, set()).update(device_changes)
+            updated = self._low_priority_updated.get(device_id)
+            if device_id in self._low_priority_changes and (updated is None or now - updated >= self.low_priority_interval() * 60):
+                changes[device_id] = self._low_priority_changes.pop(device_id)
+                self._low_priority_updated[device_id] = now
+        return changes
+
+    def command_reserve(self):
+        return self.options.get("command_reserve", 20)
+
+    def cache_max_age(self):
+        return self.options.get("cache_max_age", 24)
+
+    def energy_statistics(self):
+        return self.options.get("energy_statistics", True)
+
+    async def async_load_cache(self) -> bool:
+        """Create the devices from the cached payload, returns True when the cache has been used."""
+        max_age = self.cache_max_age()
+        if max_age == 0:
+            return False
+
+        if self._store is None:
+            self._store = device_cache_store(self.hass, self._config_entry.entry_id)
+        cached = await self._store.async_load()
+        if not cached:
+            return False
+
+        timestamp = dt_util.parse_datetime(cached.get("timestamp", ""))
+        if timestamp is None or dt_util.utcnow() - timestamp > timedelta(hours=max_age):
+            _LOGGER.info("Daikin coordinator ignoring cached device data from %s", timestamp)
+            return False
+
+        _LOGGER.info("Daikin coordinator using cached device data from %s", timestamp)
+        daikin_api = self._config_entry.runtime_data.daikin_api
+        daikin_api.json_data = cached["json_data"]
+        self.process_json_data(daikin_api.json_data)
+        return True
+
+    def _save_cache(self, json_data):
+        if self.cache_max_age() == 0:
+            return
+        if self._store is None:
+            self._store = device_cache_store(self.hass, self._config_entry.entry_id)
+        self._store.async_delay_save(
+            lambda: {"timestamp": dt_util.utcnow().isoformat(), "json_data": json_data},
+            STORAGE_SAVE_DELAY,
+        )
+
+    def _set_plans(self, device_id: str, plans: list[EntityPlan]) -> None:
+        """Replace the entity plans of a device and remember which plans have been added and removed."""
+        old_plans = set(self.entity_plans.get(device_id, []))
+        new_plans = set(plans)
+        self._added_plans.extend(plan for plan in plans if plan not in old_plans)
+        self._removed_plans.extend(plan for plan in self.entity_plans.get(device_id, []) if plan not in new_plans)
+        if plans:
+            self.entity_plans[device_id] = plans
+        else:
+            self.entity_plans.pop(device_id, None)
+
+    def process_json_data(self, json_data, partial=False, protected=()):
+        """Update or create our devices from a gateway-devices payload, returns the changed paths per device.
+
+        A partial payload only holds some of the devices, devices missing from it aren't removed.
+        The characteristics in protected, as (device_id, embedded_id, characteristic) tuples,
+        keep their current value.
+        """
+        onecta_data: OnectaRuntimeData = self._config_entry.runtime_data
+        devices = onecta_data.devices
+        daikin_api = onecta_data.daikin_api
+        changes = {}
+        for dev_data in json_data or []:
+            if dev_data["id"] in devices:
+                device = devices[dev_data["id"]]
+                device_protected = {(embedded_id, characteristic) for device_id, embedded_id, characteristic in protected if device_id == device.id}
+                device_changes = device.setJsonData(dev_data, protected=device_protected)
+                if device_changes:
+                    changes[dev_data["id"]] = device_changes
+                    if any(characteristic is None for _, characteristic in device_changes):
+                        # Management points have been added or removed
+                        self._set_plans(device.id, discover_entities(device))
+            else:
+                if self.entity_plans:
+                    _LOGGER.info("Daikin coordinator found new device '%s'", dev_data["id"])
+                # The device data is changed by accepted writes, the payload keeps the values of the cloud
+                device = DaikinOnectaDevice(copy.deepcopy(dev_data), daikin_api)
+                devices[dev_data["id"]] = device
+                changes[dev_data["id"]] = {(None, None)}
+                self._set_plans(device.id, discover_entities(device))
+        if json_data and not partial:
+            # An empty payload is a cloud hiccup, otherwise devices missing from it have been removed from the account
+            present = {dev_data["id"] for dev_data in json_data}
+            for device_id in [device_id for device_id in devices if device_id not in present]:
+                _LOGGER.info("Daikin coordinator device '%s' has been removed", device_id)
+                del devices[device_id]
+                self._set_plans(device_id, [])
+        return changes
+
+    @callback
+    def _async_notify_plans_changed(self) -> None:
+        """Let the platforms add and remove the entities of appeared and disappeared devices and management points.
+
+        The entities of a device or management point missing from the payload become
+        unavailable, a single payload without them can be a hiccup of the Daikin cloud. Only
+        when they stay missing for RETIRE_ABSENT_AFTER seconds the entities and devices are
+        removed from the registries, together with the customizations of the user.
+        """
+        now = time.monotonic()
+        added, removed = self._added_plans, self._removed_plans
+        self._added_plans, self._removed_plans = [], []
+        for plan in added:
+            self._absent_plans.pop(plan, None)
+        for plan in removed:
+            self._absent_plans.setdefault(plan, now)
+        retired = [plan for plan, absent_since in self._absent_plans.items() if now - absent_since >= RETIRE_ABSENT_AFTER]
+        for plan in retired:
+            del self._absent_plans[plan]
+        if not added and not removed and not retired:
+            return
+        async_dispatcher_send(self.hass, signal_plans_changed(self._config_entry.entry_id), added, removed, retired)
+        if not retired:
+            return
+
+        # Remove the devices of which no entities are left from the device registry
+        plans = [plan for device_plans in self.entity_plans.values() for plan in device_plans]
+        plans.extend(self._absent_plans)
+        identifiers = {(DOMAIN, plan.device_id) for plan in plans}
+        identifiers |= {(DOMAIN, plan.device_id + "gateway") for plan in plans}
+        identifiers |= {(DOMAIN, plan.device_id + plan.management_point_type) for plan in plans if plan.management_point_type is not None}
+        device_registry = dr.async_get(self.hass)
+        for device_entry in dr.async_entries_for_config_entry(device_registry, self._config_entry.entry_id):
+            if device_entry.identifiers and not device_entry.identifiers & identifiers:
+                _LOGGER.info("Daikin coordinator removing device '%s'", device_entry.name)
+                device_registry.async_update_device(device_entry.id, remove_config_entry_id=self._config_entry.entry_id)
+
     async def _async_update_data(self):
         _LOGGER.debug("Daikin coordinator start _async_update_data.")
 
         onecta_data: OnectaRuntimeData = self._config_entry.runtime_data
-        devices = onecta_data.devices
         daikin_api = onecta_data.daikin_api
         scan_ignore_value = self.scan_ignore()
+        changes = {}
 
-        if (datetime.now() - daikin_api._last_patch_call).total_seconds() < scan_ignore_value:
-            self.update_interval = timedelta(seconds=scan_ignore_value)
+        confirm_at = self.confirmation.confirm_at(scan_ignore_value)
+        if confirm_at is not None and time.monotonic() < confirm_at:
+            # The cloud would return the settings from before the last write, the planned
+            # confirmation poll retrieves the data when the cloud has the written values
             _LOGGER.debug(
-                "API UPDATE skipped (just updated from UI)",
+                "API UPDATE skipped, write confirmation in %.1f seconds",
+                confirm_at - time.monotonic(),
             )
         else:
-            daikin_api.json_data = await daikin_api.getCloudDeviceDetails()
-            for dev_data in daikin_api.json_data or []:
-                if dev_data["id"] in devices:
-                    devices[dev_data["id"]].setJsonData(dev_data)
-                else:
-                    device = DaikinOnectaDevice(dev_data, daikin_api)
-                    devices[dev_data["id"]] = device
+            try:
+                json_data, partial = await self._async_fetch(daikin_api)
+            except Exception:
+                if not self._cloud_stale and daikin_api.circuit_breaker.state != STATE_CLOSED:
+                    # Let all entities add the stale marker to their state
+                    self._cloud_stale = True
+                    self._changes = None
+                    self.async_update_listeners()
+                raise
+            refresh_all = self._cloud_stale
+            self._cloud_stale = False
+            if json_data is PAYLOAD_UNCHANGED:
+                payload = daikin_api.json_data
+            elif partial:
+                # The devices of a partial payload replace their previous payload
+                updated = {device_data["id"]: device_data for device_data in json_data}
+                payload = [updated.get(device_data["id"], device_data) for device_data in daikin_api.json_data]
+            else:
+                payload = json_data
+            confirming = bool(self.confirmation.pending)
+            stale = settled = set()
+            if confirming:
+                # Compare the writes before merging so that a stale payload doesn't revert the written values
+                stale, settled = self.confirmation.reconcile(payload, scan_ignore_value)
+            if json_data is PAYLOAD_UNCHANGED:
+                # Identical payload, nothing to parse or merge
+                _LOGGER.debug("Daikin coordinator received an unchanged payload")
+                if settled:
+                    # Restore the values of the cloud for the writes which are given up on
+                    settled_devices = {device_id for device_id, _, _ in settled}
+                    changes = self.process_json_data(
+                        [device_data for device_data in payload if device_data["id"] in settled_devices], partial=True, protected=stale
+                    )
+            else:
+                changes = self.process_json_data(json_data, partial=partial, protected=stale)
+                daikin_api.json_data = payload
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    for device_id, device_changes in changes.items():
+                        _LOGGER.debug("Daikin coordinator device '%s' changed %s", device_id, sorted(device_changes, key=str))
+                if daikin_api.json_data:
+                    self._save_cache(daikin_api.json_data)
+            # Also for a partial or unchanged payload, a management point can have appeared or
+            # the entities of a missing device can be due for retirement
+            self._async_notify_plans_changed()
+            if self.low_priority_devices() or self._low_priority_changes:
+                changes = self._defer_low_priority(changes)
+            if confirming or self._held_changes:
+                changes = self._reconcile_writes(stale, settled, changes)
+                self._async_schedule_confirmation()
+            if daikin_api.json_data:
+                await self._async_import_energy_statistics()
+
+            self.update_interval = self._staggered_update_interval()
 
-            self.update_interval = self.determine_update_interval(self.hass)
+            if refresh_all:
+                # The cloud is reachable again, all entities drop the stale marker
+                changes = None
+
+        self._changes = changes
 
         _LOGGER.debug(
             "Daikin coordinator finished _async_update_data, next interval %s.",
             self.update_interval,
         )
 
+    async def _async_import_energy_statistics(self):
+        """Import the energy history of all devices into the long-term statistics."""
+        if not self.energy_statistics() or "recorder" not in self.hass.config.components:
+            return
+        if self._energy_statistics is None:
+            self._energy_statistics = EnergyStatistics(self.hass)
+        for device in self._config_entry.runtime_data.devices.values():
+            try:
+                await self._energy_statistics.async_import_device(device)
+            except HomeAssistantError as err:
+                _LOGGER.warning("Daikin coordinator failed to import the energy statistics of '%s': %s", device.name, err)
+
     def update_settings(self, config_entry: ConfigEntry):
         _LOGGER.debug("Daikin coordinator updating settings.")
         self.options = config_entry.options
-        self.update_interval = self.determine_update_interval(self.hass)
+        self.budget.reserve = self.command_reserve()
+        self.update_interval = self._staggered_update_interval()
+        # Settings like the HomeKit fan mode aliases influence all entities
+        self._changes = None
         _LOGGER.info("Daikin coordinator changed interval to '%s'", self.update_interval)
 
+    def _staggered_update_interval(self) -> timedelta:
+        """Return the update interval, moved so that we don't poll in the same second as the other Daikin accounts of this instance."""
+        update_interval = self.determine_update_interval(self.hass)
+        return timedelta(seconds=async_get_governor(self.hass).stagger(self._config_entry.entry_id, update_interval.total_seconds()))
+
     def determine_update_interval(self, hass: HomeAssistant):
         # Default of low scan minutes interval
         scan_interval = self.options.get("low_scan_interval", 30) * 60
@@ -101,6 +498,18 @@ class OnectaDataUpdateCoordinator(DataUpdateCoordinator):
             if self.in_between(datetime.now().time(), ls, (ls_datetime + timedelta(seconds=high_scan_interval)).time()):
                 scan_interval = random.randint(60, int(scan_interval))
 
+        # Spread the remaining daily calls, minus the reserve for commands, until the
+        # daily limit resets so that we never exhaust the limit by polling
+        budget_interval = self.budget.poll_interval()
+        if budget_interval is not None and budget_interval > scan_interval:
+            _LOGGER.debug(
+                "Daikin coordinator stretching interval to %s seconds, %s polls planned with %s reserved for commands",
+                budget_interval,
+                self.budget.planned_polls,
+                self.budget.command_reserve,
+            )
+            scan_interval = int(budget_interval)
+
         # When we hit our daily rate limit we check the retry_after which is the amount of seconds
         # we have to wait before we can make a call again
         daikin_api = self._config_entry.runtime_data.daikin_api
@@ -1,21 +1,43 @@
 """Platform for the Daikin AC."""
 import asyncio
-import json
+import hashlib
 import logging
-from datetime import datetime
+import random
+import time
+from collections.abc import Callable
 
 from aiohttp import ClientError
 from homeassistant import config_entries
 from homeassistant import core
+from homeassistant.exceptions import OAuth2TokenRequestError
 from homeassistant.helpers import config_entry_oauth2_flow
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
 
+from . import codec
+from .circuit_breaker import CircuitBreaker
 from .const import DAIKIN_API_URL
 from .const import DOMAIN
+from .metrics import ApiMetrics
+from .payload_log import PayloadLogger
+from .retry import RetryPolicy
+from .scheduler import DaikinRequestScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Returned by a GET when the payload is identical to the previous response of that resource
+PAYLOAD_UNCHANGED = object()
+
+GATEWAY_DEVICES_URL = "/v1/gateway-devices"
+
+# The access token is refreshed in the background this number of seconds before it
+# expires, minus a random jitter, so that requests don't have to wait for a refresh
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_REFRESH_JITTER = 60
+TOKEN_REFRESH_MIN_DELAY = 30
+TOKEN_REFRESH_RETRY = 60
+
 
 class DaikinApi:
     """Daikin Onecta API."""
@@ -33,11 +55,10 @@ class DaikinApi:
         self.session = config_entry_oauth2_flow.OAuth2Session(hass, entry, implementation)
         self._daikin_session = async_get_clientsession(hass)
 
-        # The Daikin cloud returns old settings if queried with a GET
-        # immediately after a PATCH request. Se we use this attribute
-        # to check when we had the last patch command, if it is less then
-        # 10 seconds ago we skip the get
-        self._last_patch_call = datetime.min
+        # The Daikin cloud returns old settings if queried with a GET immediately
+        # after a write, the listeners are told about each accepted write so that
+        # the coordinator can confirm it at the moment the cloud has fresh data
+        self._write_listeners: list[Callable[[str, str, str | None], None]] = []
 
         # Store the limits as member so that we can add these to the diagnostics
         self.rate_limits = {
@@ -49,93 +70,278 @@ class DaikinApi:
             "ratelimit_reset": 0,
         }
 
-        # The following lock is used to serialize http requests to Daikin cloud
-        # to prevent receiving old settings while a PATCH is ongoing.
-        self._cloud_lock = asyncio.Lock()
+        # The scheduler orders the http requests to the Daikin cloud, a GET waits for the
+        # in-flight writes to prevent receiving old settings while a PATCH is ongoing, writes
+        # to different devices run concurrently
+        self._scheduler = DaikinRequestScheduler(self.rate_limits)
+
+        # Last parsed gateway-devices payload, set by the coordinator
+        self.json_data = None
+
+        # ETag and digest of the last GET response body per resource, cleared by each write
+        # because a write can change the local state without changing the cloud payload
+        self._payload_digests: dict[str, tuple[str | None, bytes]] = {}
+        # Counters of the GET responses, unchanged and not_modified are short-circuited
+        self.payload_stats = {
+            "responses": 0,
+            "unchanged": 0,
+            "not_modified": 0,
+        }
+
+        # Latency and outcome of the requests, exposed in the diagnostics, system health and sensors
+        self.metrics = ApiMetrics()
+
+        # Debug logging of the responses as summary and sampled, truncated bodies
+        self._payload_log = PayloadLogger(_LOGGER, lambda: self._config_entry.options)
+
+        # Fails requests fast while the Daikin cloud is down
+        self.circuit_breaker = CircuitBreaker()
+
+        # Decides which failed commands are retried
+        self._retry_policy = RetryPolicy(lambda: self._config_entry.options)
+
+        # Serializes token refreshes between concurrent requests
+        self._token_lock = asyncio.Lock()
+        self._token_refresher_active = False
+        self._token_refresh_unsub = None
+        self._token_refresh_job = core.HassJob(self._async_token_refresh_due, "daikin_onecta token refresh", cancel_on_shutdown=True)
 
         _LOGGER.debug("Daikin Onecta API initialized.")
 
+    @property
+    def patch_coalesce_window(self) -> float:
+        """Return the number of seconds a PATCH waits for newer writes to the same characteristic."""
+        return self._config_entry.options.get("patch_coalesce_window", 0) / 1000
+
     async def async_get_access_token(self) -> str:
-        await self.session.async_ensure_token_valid()
+        # The background refresher normally keeps the token valid, refreshing it on the
+        # request path is the fallback
+        if self.session.valid_token:
+            return self.session.token["access_token"]
+        async with self._token_lock:
+            refresh = not self.session.valid_token
+            start = time.monotonic()
+            await self.session.async_ensure_token_valid()
+            if refresh:
+                self.metrics.record_token_refresh(time.monotonic() - start)
         return self.session.token["access_token"]
 
+    @core.callback
+    def async_start_token_refresher(self) -> Callable[[], None]:
+        """Start refreshing the access token ahead of its expiry, returns the function to stop it."""
+        self._token_refresher_active = True
+        self._schedule_token_refresh()
+        return self.async_stop_token_refresher
+
+    @core.callback
+    def async_stop_token_refresher(self) -> None:
+        """Stop refreshing the access token in the background."""
+        self._token_refresher_active = False
+        if self._token_refresh_unsub is not None:
+            self._token_refresh_unsub()
+            self._token_refresh_unsub = None
+
+    def _seconds_until_refresh(self) -> float | None:
+        expires_at = self.session.token.get("expires_at")
+        if expires_at is None:
+            return None
+        return expires_at - time.time() - TOKEN_REFRESH_MARGIN - random.uniform(0, TOKEN_REFRESH_JITTER)
+
+    @core.callback
+    def _schedule_token_refresh(self, delay: float | None = None) -> None:
+        if not self._token_refresher_active:
+            return
+        if delay is None:
+            delay = self._seconds_until_refresh()
+            if delay is None:
+                return
+        self._token_refresh_unsub = async_call_later(self.hass, max(delay, TOKEN_REFRESH_MIN_DELAY), self._token_refresh_job)
+
+    @core.callback
+    def _async_token_refresh_due(self, _now) -> None:
+        self._token_refresh_unsub = None
+        self._config_entry.async_create_background_task(self.hass, self._async_refresh_token(), "daikin_onecta token refresh")
+
+    async def _async_refresh_token(self) -> None:
+        retry = None
+        async with self._token_lock:
+            # A request could have refreshed the token in the meantime
+            expires_at = self.session.token.get("expires_at", 0)
+            if expires_at - time.time() <= TOKEN_REFRESH_MARGIN + TOKEN_REFRESH_JITTER:
+                start = time.monotonic()
+                try:
+                    token = await self.session.implementation.async_refresh_token(self.session.token)
+                except (OAuth2TokenRequestError, ClientError, TimeoutError) as err:
+                    self.metrics.token_refresh_failures += 1
+                    retry = TOKEN_REFRESH_RETRY
+                    _LOGGER.warning("Background refresh of the access token failed, retrying in %s seconds: %s", retry, err)
+                else:
+                    self.hass.config_entries.async_update_entry(self._config_entry, data={**self._config_entry.data, "token": token})
+                    self.metrics.record_token_refresh(time.monotonic() - start)
+        self._schedule_token_refresh(retry)
+
+    @core.callback
+    def async_add_write_listener(self, listener: Callable[[str, str, str | None], None]) -> Callable[[], None]:
+        """Call listener with the method, resource url and body of each write accepted by the cloud, returns the function to remove it."""
+        self._write_listeners.append(listener)
+        return lambda: self._write_listeners.remove(listener)
+
     async def doBearerRequest(self, method, resource_url, options=None):
-        async with self._cloud_lock:
+        # Don't queue behind the scheduler when the request would fail fast anyway
+        self.circuit_breaker.check()
+        _LOGGER.debug("Request %s %s options: %s", method, resource_url, options)
+        # The body is sent utf-8 encoded, non ascii characters take more than one byte
+        sent_bytes = len(options.encode()) if options else 0
+
+        attempt = 0
+        while True:
+            delay, result = await self._async_attempt(method, resource_url, options, attempt, sent_bytes)
+            if delay is None:
+                return result
+            attempt += 1
+            self.metrics.retries += 1
+            _LOGGER.info("Retrying %s %s in %.1f seconds, attempt %s", method, resource_url, delay, attempt + 1)
+            # The scheduler slot is released during the back-off so that other requests can run
+            await asyncio.sleep(delay)
+
+    async def _async_attempt(self, method, resource_url, options, attempt, sent_bytes):
+        """Send a request once, returns (delay, None) when it has to be retried after delay seconds, otherwise (None, result)."""
+        if method == "GET":
+            slot = self._scheduler.read()
+        else:
+            slot = self._scheduler.write(resource_url)
+
+        queued = time.monotonic()
+        async with slot:
+            self.metrics.scheduler_wait.record(time.monotonic() - queued)
             token = await self.async_get_access_token()
 
             headers = {"Accept-Encoding": "gzip", "Authorization": "Bearer " + token, "Content-Type": "application/json"}
+            if method == "GET":
+                etag = self._payload_digests.get(resource_url, (None, None))[0]
+                if etag is not None:
+                    headers["If-None-Match"] = etag
+            else:
+                self._payload_digests.clear()
 
-            _LOGGER.debug("Request URL: %s", resource_url)
-            _LOGGER.debug("Request %s Options: %s", method, options)
-
+            probe = None
             try:
-                async with self._daikin_session.request(method=method, url=DAIKIN_API_URL + resource_url, headers=headers, data=options) as resp:
-                    response_data = await resp.text()
-                    _LOGGER.debug("Response status: %s Text: %s Limit: %s", resp.status, response_data, self.rate_limits)
-
-                    self.rate_limits["minute"] = int(resp.headers.get("X-RateLimit-Limit-minute", 0))
-                    self.rate_limits["day"] = int(resp.headers.get("X-RateLimit-Limit-day", 0))
-                    self.rate_limits["remaining_minutes"] = int(resp.headers.get("X-RateLimit-Remaining-minute", 0))
-                    self.rate_limits["remaining_day"] = int(resp.headers.get("X-RateLimit-Remaining-day", 0))
-                    self.rate_limits["retry_after"] = int(resp.headers.get("retry-after", 0))
-                    self.rate_limits["ratelimit_reset"] = int(resp.headers.get("ratelimit-reset", 0))
-
-                    if self.rate_limits["remaining_minutes"] > 0:
-                        ir.async_delete_issue(self.hass, DOMAIN, "minute_rate_limit")
-
-                    if self.rate_limits["remaining_day"] > 0:
-                        ir.async_delete_issue(self.hass, DOMAIN, "day_rate_limit")
-
-                    if method == "GET" and resp.status == 200:
-                        try:
-                            return json.loads(response_data)
-                        except json.JSONDecodeError:
-                            _LOGGER.exception("Retrieve JSON failed: %s", response_data)
-                            return []
-
-                    elif resp.status == 429:
-                        if self.rate_limits["remaining_minutes"] == 0:
-                            ir.async_create_issue(
-                                self.hass,
-                                DOMAIN,
-                                "minute_rate_limit",
-                                is_fixable=False,
-                                is_persistent=True,
-                                severity=ir.IssueSeverity.ERROR,
-                                learn_more_url="https://developer.cloud.daikineurope.com/docs/b0dffcaa-7b51-428a-bdff-a7c8a64195c0/general_api_guidelines#doc-heading-rate-limitation",
-                                translation_key="minute_rate_limit",
-                            )
-
-                        if self.rate_limits["remaining_day"] == 0:
-                            ir.async_create_issue(
-                                self.hass,
-                                DOMAIN,
-                                "day_rate_limit",
-                                is_fixable=False,
-                                is_persistent=True,
-                                severity=ir.IssueSeverity.ERROR,
-                                learn_more_url="https://developer.cloud.daikineurope.com/docs/b0dffcaa-7b51-428a-bdff-a7c8a64195c0/general_api_guidelines#doc-heading-rate-limitation",
-                                translation_key="day_rate_limit",
-                            )
-                        if method == "GET":
-                            return []
+                probe = self.circuit_breaker.before_request()
+                start = time.monotonic()
+                try:
+                    async with self._daikin_session.request(method=method, url=DAIKIN_API_URL + resource_url, headers=headers, data=options) as resp:
+                        response_data = await resp.read()
+                        self.metrics.record_request(method, resource_url, time.monotonic() - start, resp.status, sent_bytes, len(response_data))
+                        if resp.status >= 500:
+                            self.circuit_breaker.record_failure()
                         else:
-                            return False
-                    elif resp.status == 204:
-                        self._last_patch_call = datetime.now()
-                        return True
+                            self.circuit_breaker.record_success()
+                        if self._payload_log.enabled:
+                            self._payload_log.response(method, resource_url, resp.status, response_data, self.rate_limits)
+
+                        self.rate_limits["minute"] = int(resp.headers.get("X-RateLimit-Limit-minute", 0))
+                        self.rate_limits["day"] = int(resp.headers.get("X-RateLimit-Limit-day", 0))
+                        self.rate_limits["remaining_minutes"] = int(resp.headers.get("X-RateLimit-Remaining-minute", 0))
+                        self.rate_limits["remaining_day"] = int(resp.headers.get("X-RateLimit-Remaining-day", 0))
+                        self.rate_limits["retry_after"] = int(resp.headers.get("retry-after", 0))
+                        self.rate_limits["ratelimit_reset"] = int(resp.headers.get("ratelimit-reset", 0))
+
+                        if self.rate_limits["remaining_minutes"] > 0:
+                            ir.async_delete_issue(self.hass, DOMAIN, "minute_rate_limit")
 
-            except (ClientError, asyncio.TimeoutError):
+                        if self.rate_limits["remaining_day"] > 0:
+                            ir.async_delete_issue(self.hass, DOMAIN, "day_rate_limit")
+
+                        delay = self._retry_policy.delay(method, attempt, status=resp.status, retry_after=self.rate_limits["retry_after"])
+                        if delay is not None:
+                            return delay, None
+                        result = self._process_response(method, resource_url, resp, response_data)
+                        if result is True:
+                            for listener in self._write_listeners:
+                                listener(method, resource_url, options)
+                        if result is not None:
+                            return None, result
+                except (ClientError, TimeoutError) as err:
+                    self.metrics.record_request(method, resource_url, time.monotonic() - start, "error", sent_bytes)
+                    self.circuit_breaker.record_failure()
+                    delay = self._retry_policy.delay(method, attempt, error=err)
+                    if delay is None:
+                        raise
+                    return delay, None
+
+            except (ClientError, TimeoutError):
                 # Propagate transient network errors so Home Assistant marks the
                 # coordinator update as failed and retries it.
                 raise
             except Exception as e:
                 _LOGGER.error("REQUEST TYPE %s FAILED: %s", method, e)
+            finally:
+                self.circuit_breaker.release(probe)
 
         if method == "GET":
-            return []
-        return False
+            return None, []
+        return None, False
+
+    def _process_response(self, method, resource_url, resp, response_data):
+        """Return the result of a response, None when the status isn't handled."""
+        if method == "GET" and resp.status == 304:
+            self.payload_stats["not_modified"] += 1
+            return PAYLOAD_UNCHANGED
+
+        if method == "GET" and resp.status == 200:
+            self.payload_stats["responses"] += 1
+            digest = hashlib.blake2b(response_data, digest_size=16).digest()
+            if self._payload_digests.get(resource_url, (None, None))[1] == digest:
+                self.payload_stats["unchanged"] += 1
+                return PAYLOAD_UNCHANGED
+            try:
+                data = codec.decode(response_data)
+            except codec.JSONDecodeError:
+                _LOGGER.exception("Retrieve JSON failed: %s", response_data)
+                return []
+            self._payload_digests[resource_url] = (resp.headers.get("ETag"), digest)
+            if resource_url != GATEWAY_DEVICES_URL:
+                # The device changed since the last poll of all devices, the next poll of all
+                # devices has to be merged even when the cloud returns that same response again
+                self._payload_digests.pop(GATEWAY_DEVICES_URL, None)
+            return data
+
+        elif resp.status == 429:
+            if self.rate_limits["remaining_minutes"] == 0:
+                ir.async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    "minute_rate_limit",
+                    is_fixable=False,
+                    is_persistent=True,
+                    severity=ir.IssueSeverity.ERROR,
+                    learn_more_url="https://developer.cloud.daikineurope.com/docs/b0dffcaa-7b51-428a-bdff-a7c8a64195c0/general_api_guidelines#doc-heading-rate-limitation",
+                    translation_key="minute_rate_limit",
+                )
+
+            if self.rate_limits["remaining_day"] == 0:
+                ir.async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    "day_rate_limit",
+                    is_fixable=False,
+                    is_persistent=True,
+                    severity=ir.IssueSeverity.ERROR,
+                    learn_more_url="https://developer.cloud.daikineurope.com/docs/b0dffcaa-7b51-428a-bdff-a7c8a64195c0/general_api_guidelines#doc-heading-rate-limitation",
+                    translation_key="day_rate_limit",
+                )
+            if method == "GET":
+                return []
+            else:
+                return False
+        elif resp.status == 204:
+            return True
+        return None
 
     async def getCloudDeviceDetails(self):
-        """Get pure Device Data from the Daikin cloud devices."""
-        return await self.doBearerRequest("GET", "/v1/gateway-devices")
+        """Get pure Device Data from the Daikin cloud devices, PAYLOAD_UNCHANGED when identical to the previous response."""
+        return await self.doBearerRequest("GET", GATEWAY_DEVICES_URL)
+
+    async def getCloudDevice(self, device_id):
+        """Get the data of a single device, PAYLOAD_UNCHANGED when identical to the previous response."""
+        return await self.doBearerRequest("GET", f"/v1/gateway-devices/{device_id}")
@@ -1,13 +1,47 @@
-import json
+import asyncio
+import copy
 import logging
 
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
 from homeassistant.helpers.device_registry import DeviceInfo
 
+from .codec import encode
 from .const import DOMAIN
+from .energy import EnergyHistory
 
 _LOGGER = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Device level keys the entities depend on, others like timestamp change on each poll
+ENTITY_DEVICE_KEYS = ("isCloudConnectionUp",)
+
+
+def _merge_into(target: dict, source: dict, skip=()) -> set:
+    """Update target in place to be equal to source and return the keys that changed.
+
+    Unchanged values keep their identity, changed dicts are merged recursively so that
+    only the changed leaves are replaced. Keys in skip are left untouched.
+    """
+    changed = set()
+    for key in target.keys() - source.keys():
+        if key not in skip:
+            del target[key]
+            changed.add(key)
+    for key, value in source.items():
+        if key in skip:
+            continue
+        current = target.get(key, _MISSING)
+        if current is value or current == value:
+            continue
+        changed.add(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            _merge_into(current, value)
+        else:
+            # Don't share containers with the payload, accepted writes change the device data
+            target[key] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+    return changed
+
 
 class DaikinOnectaDevice:
     """Class to represent and control one Daikin Onecta Device."""
@@ -19,16 +53,53 @@ class DaikinOnectaDevice:
         self.daikin_data = jsonData
         self.id = self.daikin_data["id"]
         self.name = self.daikin_data["deviceModel"]
+        self._build_index()
+        # PATCH requests waiting for the coalesce window, keyed on (embeddedId, dataPoint, dataPointPath)
+        self._pending_patches = {}
+        # Parsed energy history keyed on (embeddedId, characteristic), dropped when the characteristic changes
+        self._energy_history = {}
 
-        management_points = self.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if management_point["managementPointType"] == "climateControl":
-                name = management_point["name"]["value"]
-                if name:
-                    self.name = name
+        management_point = self.management_point_by_type("climateControl")
+        if management_point is not None:
+            name = management_point["name"]["value"]
+            if name:
+                self.name = name
 
         _LOGGER.info("Initialized Daikin Onecta Device '%s' (id %s)", self.name, self.id)
 
+    def _build_index(self):
+        """Index the management points by embeddedId and by managementPointType."""
+        self._management_points_by_id = {}
+        self._management_points_by_type = {}
+        for management_point in self.daikin_data.get("managementPoints", []):
+            self._management_points_by_id[management_point["embeddedId"]] = management_point
+            # When a type occurs multiple times the last one wins, which matches the
+            # behaviour of the linear scans this index replaces
+            self._management_points_by_type[management_point["managementPointType"]] = management_point
+
+    @property
+    def management_points(self) -> list:
+        """Return all management points of this device."""
+        return self.daikin_data.get("managementPoints", [])
+
+    def management_point(self, embedded_id):
+        """Return the management point with the given embeddedId or None."""
+        return self._management_points_by_id.get(embedded_id)
+
+    def management_point_by_type(self, management_point_type):
+        """Return the management point with the given managementPointType or None."""
+        return self._management_points_by_type.get(management_point_type)
+
+    def energy_history(self, embedded_id, datatype) -> EnergyHistory:
+        """Return the parsed consumptionData or outputData of a management point."""
+        key = (embedded_id, f"{datatype}Data")
+        history = self._energy_history.get(key)
+        if history is None:
+            management_point = self.management_point(embedded_id) or {}
+            characteristic = management_point.get(key[1]) or {}
+            history = self._energy_history[key] = EnergyHistory(characteristic.get("value"))
+        return history
+
     @property
     def available(self) -> bool:
         result = False
@@ -40,42 +111,38 @@ class DaikinOnectaDevice:
     def fill_device_info(self, device_info, management_point_type):
         manufacturer = {"manufacturer": "Daikin"}
         device_info.update(**manufacturer)
-        management_points = self.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if management_point_type == management_point["managementPointType"]:
-                mp = management_point.get("eepromVersion")
-                if mp is not None:
-                    v = {"sw_version": mp["value"]}
-                    device_info.update(**v)
-                mp = management_point.get("modelInfo")
-                if mp is not None:
-                    v = {"model": mp["value"]}
-                    device_info.update(**v)
-                mp = management_point.get("firmwareVersion")
-                if mp is not None:
-                    v = {"sw_version": mp["value"]}
-                    device_info.update(**v)
-                mp = management_point.get("serialNumber")
-                if mp is not None:
-                    v = {"serial_number": mp["value"]}
-                    device_info.update(**v)
-                mp = management_point.get("softwareVersion")
-                if mp is not None:
-                    v = {"sw_version": mp["value"]}
-                    device_info.update(**v)
+        management_point = self.management_point_by_type(management_point_type)
+        if management_point is not None:
+            mp = management_point.get("eepromVersion")
+            if mp is not None:
+                v = {"sw_version": mp["value"]}
+                device_info.update(**v)
+            mp = management_point.get("modelInfo")
+            if mp is not None:
+                v = {"model": mp["value"]}
+                device_info.update(**v)
+            mp = management_point.get("firmwareVersion")
+            if mp is not None:
+                v = {"sw_version": mp["value"]}
+                device_info.update(**v)
+            mp = management_point.get("serialNumber")
+            if mp is not None:
+                v = {"serial_number": mp["value"]}
+                device_info.update(**v)
+            mp = management_point.get("softwareVersion")
+            if mp is not None:
+                v = {"sw_version": mp["value"]}
+                device_info.update(**v)
 
     def device_info(self) -> DeviceInfo:
         """Return a device description for device registry."""
         mac_add = ""
         devicemodel = self.daikin_data.get("deviceModel")
-        supported_management_point_types = {"gateway"}
-        management_points = self.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            if management_point_type in supported_management_point_types:
-                mp = management_point.get("macAddress")
-                if mp is not None:
-                    mac_add = mp["value"]
+        management_point = self.management_point_by_type("gateway")
+        if management_point is not None:
+            mp = management_point.get("macAddress")
+            if mp is not None:
+                mac_add = mp["value"]
 
         info = DeviceInfo(
             identifiers={
@@ -91,35 +158,125 @@ class DaikinOnectaDevice:
 
         return info
 
-    def setJsonData(self, desc):
-        """Overwrite the json data for this device."""
-        self.daikin_data = desc
-        _LOGGER.debug("Device '%s' received new data from the Daikin cloud, isCloudConnectionUp '%s'", self.name, self.available)
+    def apply_write(self, embedded_id, characteristic, path, value) -> None:
+        """Set the value of a characteristic accepted by the Daikin cloud before a poll confirms it."""
+        management_point = self._management_points_by_id.get(embedded_id)
+        if management_point is None or characteristic not in management_point:
+            return
+        # The characteristic can be shared with the last payload, which must keep the value of the cloud
+        node = management_point[characteristic] = copy.deepcopy(management_point[characteristic])
+        if path:
+            node = node.get("value")
+            for segment in path.strip("/").split("/"):
+                if not isinstance(node, dict) or segment not in node:
+                    return
+                node = node[segment]
+            if not isinstance(node, dict):
+                return
+        node["value"] = value
+
+    def setJsonData(self, desc, protected=()):
+        """Merge new json data into the data of this device and return the changed paths.
+
+        Only the characteristics that changed are updated in place, unchanged management
+        points and characteristics keep their identity. The changed paths are
+        (embeddedId, characteristic) tuples. Device level characteristics use None as
+        embeddedId, only the ones in ENTITY_DEVICE_KEYS are reported. A management point
+        that appeared or disappeared is reported with None as characteristic. Characteristics
+        in protected, as (embeddedId, characteristic) tuples, keep their current value.
+        """
+        changes = {(None, key) for key in _merge_into(self.daikin_data, desc, skip=("managementPoints",)) if key in ENTITY_DEVICE_KEYS}
+
+        merged = []
+        new_ids = set()
+        for management_point in desc.get("managementPoints", []):
+            embedded_id = management_point["embeddedId"]
+            new_ids.add(embedded_id)
+            old_management_point = self._management_points_by_id.get(embedded_id)
+            if old_management_point is None:
+                changes.add((embedded_id, None))
+                merged.append(copy.deepcopy(management_point))
+            else:
+                skip = {key for protected_id, key in protected if protected_id == embedded_id}
+                changes.update((embedded_id, key) for key in _merge_into(old_management_point, management_point, skip=skip))
+                merged.append(old_management_point)
+        for embedded_id in self._management_points_by_id.keys() - new_ids:
+            changes.add((embedded_id, None))
+
+        management_points = self.daikin_data.get("managementPoints")
+        if management_points is None or len(management_points) != len(merged) or any(a is not b for a, b in zip(management_points, merged)):
+            self.daikin_data["managementPoints"] = merged
+        self._build_index()
+
+        for key in [key for key in self._energy_history if key in changes or (key[0], None) in changes]:
+            del self._energy_history[key]
+
+        _LOGGER.debug(
+            "Device '%s' received new data from the Daikin cloud, isCloudConnectionUp '%s', %s changed paths",
+            self.name,
+            self.available,
+            len(changes),
+        )
+        return changes
 
     async def patch(self, id, embeddedId, dataPoint, dataPointPath, value):
+        """Set a characteristic, writes to the same characteristic within the coalesce window are merged.
+
+        When for example a slider generates multiple writes only the last written value is send to
+        the Daikin cloud, all callers receive the result of that single PATCH request.
+        """
+        key = (embeddedId, dataPoint, dataPointPath)
+        pending = self._pending_patches.get(key)
+        if pending is not None:
+            _LOGGER.debug("Device '%s' coalescing PATCH of %s %s to %s", self.name, dataPoint, dataPointPath, value)
+            pending["value"] = value
+            return await asyncio.shield(pending["result"])
+
+        result = asyncio.get_running_loop().create_future()
+        pending = {"value": value, "result": result}
+        self._pending_patches[key] = pending
+        try:
+            await asyncio.sleep(self.api.patch_coalesce_window)
+            del self._pending_patches[key]
+            res = await self._patch(id, embeddedId, dataPoint, dataPointPath, pending["value"])
+        except asyncio.CancelledError:
+            self._pending_patches.pop(key, None)
+            result.cancel()
+            raise
+        except Exception as err:
+            self._pending_patches.pop(key, None)
+            result.set_exception(err)
+            # Mark the exception as retrieved, we raise it ourselves
+            result.exception()
+            raise
+
+        result.set_result(res)
+        return res
+
+    async def _patch(self, id, embeddedId, dataPoint, dataPointPath, value):
         setPath = "/v1/gateway-devices/" + id + "/management-points/" + embeddedId + "/characteristics/" + dataPoint
         setBody = {"value": value}
         if dataPointPath:
             setBody["path"] = dataPointPath
-        setOptions = json.dumps(setBody)
+        setOptions = encode(setBody)
 
         _LOGGER.debug("Path: %s , options: %s", setPath, setOptions)
 
         res = await self.api.doBearerRequest("PATCH", setPath, setOptions)
 
-        _LOGGER.debug(f"Result: {res}")
+        _LOGGER.debug("Result: %s", res)
 
         return res
 
     async def post(self, id, embeddedId, dataPoint, value):
         setPath = "/v1/gateway-devices/" + id + "/management-points/" + embeddedId + "/" + dataPoint
-        setOptions = json.dumps(value)
+        setOptions = encode(value)
 
         _LOGGER.debug("Path: %s , options: %s", setPath, setOptions)
 
         res = await self.api.doBearerRequest("POST", setPath, setOptions)
 
-        _LOGGER.debug(f"Result: {res}")
+        _LOGGER.debug("Result: %s", res)
 
         return res
 
@@ -127,12 +284,12 @@ class DaikinOnectaDevice:
         setPath = "/v1/gateway-devices/" + id + "/management-points/" + embeddedId + "/" + dataPoint
         setOptions = None
         if value is not None:
-            setOptions = json.dumps(value)
+            setOptions = encode(value)
 
         _LOGGER.debug("Path: %s , options: %s", setPath, setOptions)
 
         res = await self.api.doBearerRequest("PUT", setPath, setOptions)
 
-        _LOGGER.debug(f"Result: {res}")
+        _LOGGER.debug("Result: %s", res)
 
         return res
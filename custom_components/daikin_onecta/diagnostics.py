@@ -45,6 +45,11 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry:
     return {
         "json_data": async_redact_data(daikin_api.json_data, REDACT_KEYS),
         "rate_limits": daikin_api.rate_limits,
+        "rate_limit_budget": onecta_data.coordinator.budget.values(),
+        "payload_stats": daikin_api.payload_stats,
+        "request_metrics": daikin_api.metrics.as_dict(),
+        "circuit_breaker": daikin_api.circuit_breaker.values(),
+        "write_confirmation": onecta_data.coordinator.confirmation.values(),
         "options": config_entry.options,
         "oauth2_token_valid": daikin_api.session.valid_token,
         "entities": get_entities(hass, config_entry),
@@ -0,0 +1,272 @@
+"""Discovery of the entities provided by the Daikin devices."""
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+from .const import DOMAIN
+from .const import SENSOR_PERIOD_MONTHLY
+from .const import SENSOR_PERIOD_YEARLY
+from .const import SENSOR_PERIODS
+from .const import VALUE_SENSOR_MAPPING
+from .device import DaikinOnectaDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Management points for which the climate and water heater entities handle the
+# operationMode, onOffMode and powerfulMode themselves
+CONTROLLED_MANAGEMENT_POINT_TYPES = {
+    "domesticHotWaterTank",
+    "domesticHotWaterFlowThrough",
+    "climateControl",
+    "climateControlMainZone",
+}
+CLIMATE_MANAGEMENT_POINT_TYPES = {"climateControl"}
+TANK_MANAGEMENT_POINT_TYPES = {
+    "domesticHotWaterTank",
+    "domesticHotWaterFlowThrough",
+}
+VERSION_CHARACTERISTICS = ("firmwareVersion", "softwareVersion")
+ENERGY_DATATYPES = ("consumption", "output")
+ENERGY_TYPES = ("electrical", "gas", "thermal")
+
+# The kinds of entities, each platform creates its entity class for a kind
+KIND_LIMIT = "limit"
+KIND_VALUE = "value"
+KIND_ENERGY = "energy"
+KIND_BINARY = "binary"
+KIND_SWITCH = "switch"
+KIND_SCHEDULE = "schedule"
+KIND_CLIMATE = "climate"
+KIND_TANK = "tank"
+KIND_FIRMWARE = "firmware"
+KIND_REFRESH = "refresh"
+
+
+@dataclass(frozen=True, slots=True)
+class EntityPlan:
+    """Plan of one entity to create for a device.
+
+    value is the characteristic, sensor, setpoint or rate limit key the entity is for,
+    sub_type the characteristic holding the sensor (sensoryData) or the sensor mapping
+    of a rate limit sensor. The energy fields are only used by energy sensors.
+    """
+
+    kind: str
+    platform: Platform
+    device_id: str
+    embedded_id: str | None = None
+    management_point_type: str | None = None
+    value: str | None = None
+    sub_type: str | None = None
+    datatype: str | None = None
+    energy_type: str | None = None
+    operation_mode: str | None = None
+    period: str | None = None
+
+
+def is_switch(management_point_type: str, characteristic: str) -> bool:
+    """Return if a settable on/off characteristic is a separate switch."""
+    # On/off and powerful are handled by the HWT and ClimateControl directly
+    return not (characteristic in ("onOffMode", "powerfulMode") and management_point_type in CONTROLLED_MANAGEMENT_POINT_TYPES)
+
+
+def _plan(device: DaikinOnectaDevice, embedded_id, management_point_type, kind, platform, value=None, sub_type=None) -> EntityPlan:
+    return EntityPlan(kind, platform, device.id, embedded_id, management_point_type, value, sub_type)
+
+
+def _energy_plans(device: DaikinOnectaDevice, embedded_id, management_point_type, datatype, energy_type, cdve) -> list[EntityPlan]:
+    plans = []
+    for mode in cdve:
+        for period in cdve[mode]:
+            # When we have the yearly sensor we also add a monthly
+            if period == SENSOR_PERIOD_YEARLY:
+                plans.append(
+                    EntityPlan(
+                        KIND_ENERGY,
+                        Platform.SENSOR,
+                        device.id,
+                        embedded_id,
+                        management_point_type,
+                        datatype=datatype,
+                        energy_type=energy_type,
+                        operation_mode=mode,
+                        period=SENSOR_PERIOD_MONTHLY,
+                    )
+                )
+            if SENSOR_PERIODS.get(period) is not None:
+                plans.append(
+                    EntityPlan(
+                        KIND_ENERGY,
+                        Platform.SENSOR,
+                        device.id,
+                        embedded_id,
+                        management_point_type,
+                        datatype=datatype,
+                        energy_type=energy_type,
+                        operation_mode=mode,
+                        period=period,
+                    )
+                )
+    return plans
+
+
+def discover_entities(device: DaikinOnectaDevice) -> list[EntityPlan]:
+    """Classify the characteristics of a device once and return the plans of its entities."""
+    plans = [
+        # For each device we provide a refresh button and the rate limit sensors
+        EntityPlan(KIND_REFRESH, Platform.BUTTON, device.id),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="remaining_day", sub_type="RatelimitRemainingDay"),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="planned_polls", sub_type="RatelimitPlannedPolls"),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="command_reserve", sub_type="RatelimitCommandReserve"),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="circuit_state", sub_type="CloudCircuitState"),
+        # Request metrics of the API, disabled by default
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="average_latency", sub_type="ApiAverageLatency"),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="average_scheduler_wait", sub_type="ApiAverageSchedulerWait"),
+        EntityPlan(KIND_LIMIT, Platform.SENSOR, device.id, value="request_errors", sub_type="ApiRequestErrors"),
+    ]
+    setpoints = []
+    climate_embedded_id = ""
+
+    for management_point in device.management_points:
+        management_point_type = management_point["managementPointType"]
+        embedded_id = management_point["embeddedId"]
+
+        firmware = False
+        for value in management_point:
+            vv = management_point.get(value)
+            if not isinstance(vv, dict):
+                continue
+            value_value = vv.get("value")
+            values = vv.get("values")
+            settable = vv.get("settable", False)
+            on_off = value_value is not None and settable is True and values is not None and "on" in values and "off" in values
+
+            if values is None and isinstance(value_value, bool):
+                # We don't have multiple values and we do have a value which is a boolean
+                plans.append(_plan(device, embedded_id, management_point_type, KIND_BINARY, Platform.BINARY_SENSOR, value))
+
+            if on_off:
+                if is_switch(management_point_type, value):
+                    _LOGGER.info("Device '%s' provides switch on/off '%s'", device.name, value)
+                    plans.append(_plan(device, embedded_id, management_point_type, KIND_SWITCH, Platform.SWITCH, value))
+            elif not values and isinstance(value_value, bool):
+                # A bool without multiple values is a binary sensor
+                pass
+            elif value == "operationMode" and management_point_type in CONTROLLED_MANAGEMENT_POINT_TYPES:
+                # operationMode is handled by the HWT and ClimateControl directly
+                pass
+            elif value_value is not None and not isinstance(value_value, dict) and value in VALUE_SENSOR_MAPPING:
+                plans.append(_plan(device, embedded_id, management_point_type, KIND_VALUE, Platform.SENSOR, value))
+
+            if value in VERSION_CHARACTERISTICS and value_value is not None and not firmware:
+                firmware = True
+                plans.append(_plan(device, embedded_id, management_point_type, KIND_FIRMWARE, Platform.UPDATE))
+
+        sensory_data = (management_point.get("sensoryData") or {}).get("value")
+        if sensory_data is not None:
+            _LOGGER.info("Device '%s' provides sensoryData '%s'", device.name, sensory_data)
+            for sensor in sensory_data:
+                if sensor in VALUE_SENSOR_MAPPING:
+                    plans.append(_plan(device, embedded_id, management_point_type, KIND_VALUE, Platform.SENSOR, sensor, "sensoryData"))
+
+        for datatype in ENERGY_DATATYPES:
+            cdv = (management_point.get(f"{datatype}Data") or {}).get("value")
+            if cdv is not None:
+                for energy_type in ENERGY_TYPES:
+                    cdve = cdv.get(energy_type)
+                    if cdve is not None:
+                        _LOGGER.info("Device '%s' provides '%s'", device.name, energy_type)
+                        plans.extend(_energy_plans(device, embedded_id, management_point_type, datatype, energy_type, cdve))
+
+        # When we have a schedule we provide a select
+        if management_point.get("schedule") is not None:
+            plans.append(_plan(device, embedded_id, management_point_type, KIND_SCHEDULE, Platform.SELECT, "schedule"))
+
+        if management_point_type in TANK_MANAGEMENT_POINT_TYPES:
+            plans.append(_plan(device, embedded_id, management_point_type, KIND_TANK, Platform.WATER_HEATER))
+
+        if management_point_type in CLIMATE_MANAGEMENT_POINT_TYPES:
+            climate_embedded_id = embedded_id
+            temperature_control = management_point.get("temperatureControl")
+            if temperature_control is not None:
+                for operation_mode in temperature_control["value"]["operationModes"].values():
+                    setpoints.extend(operation_mode["setpoints"])
+
+    # One climate entity per setpoint, all controlling the last climateControl management point
+    setpoints = list(dict.fromkeys(setpoints))
+    _LOGGER.info("Climate: Device '%s' has modes %s", device.daikin_data["deviceModel"], setpoints)
+    for setpoint in setpoints:
+        plans.append(EntityPlan(KIND_CLIMATE, Platform.CLIMATE, device.id, climate_embedded_id, "climateControl", setpoint))
+
+    return plans
+
+
+def signal_plans_changed(entry_id: str) -> str:
+    """Return the dispatcher signal sent with the added, removed and retired entity plans of a config entry."""
+    return f"{DOMAIN}_{entry_id}_plans_changed"
+
+
+@callback
+def async_add_planned_entities(
+    hass: HomeAssistant,
+    config_entry,
+    platform: Platform,
+    factory: Callable,
+    async_add_entities: Callable,
+    **kwargs,
+) -> None:
+    """Create the entities of a platform from the entity plans of the coordinator.
+
+    The factory is called with the device and the plan and returns the entity, or None
+    when the platform doesn't create an entity for that plan. Entities are added and
+    removed when the coordinator adds or removes plans because a device or management
+    point appeared or disappeared, without reloading the integration. A removed entity
+    keeps its registry entry and becomes unavailable, the registry entry is only removed
+    when the coordinator retires the plan.
+    """
+    onecta_data = config_entry.runtime_data
+    entities: dict[EntityPlan, Entity] = {}
+    # Entity ids of the removed entities, kept until the plan reappears or is retired
+    absent: dict[EntityPlan, str] = {}
+
+    def add(plans) -> None:
+        new_entities = []
+        for plan in plans:
+            if plan.platform != platform or plan in entities:
+                continue
+            absent.pop(plan, None)
+            entity = factory(onecta_data.devices[plan.device_id], plan)
+            if entity is not None:
+                entities[plan] = entity
+                new_entities.append(entity)
+        if new_entities:
+            async_add_entities(new_entities, **kwargs)
+
+    @callback
+    def plans_changed(added: list[EntityPlan], removed: list[EntityPlan], retired: list[EntityPlan]) -> None:
+        for plan in removed:
+            entity = entities.pop(plan, None)
+            if entity is None:
+                continue
+            _LOGGER.info("Entity '%s' of device '%s' is missing from the Daikin cloud", entity.entity_id, plan.device_id)
+            if entity.entity_id is not None:
+                absent[plan] = entity.entity_id
+            # The state of an entity with a registry entry becomes unavailable
+            config_entry.async_create_task(hass, entity.async_remove())
+        entity_registry = er.async_get(hass)
+        for plan in retired:
+            entity_id = absent.pop(plan, None)
+            if entity_id is not None and entity_registry.async_get(entity_id) is not None:
+                _LOGGER.info("Removing entity '%s' of device '%s'", entity_id, plan.device_id)
+                entity_registry.async_remove(entity_id)
+        add(added)
+
+    add(plan for plans in onecta_data.coordinator.entity_plans.values() for plan in plans)
+    config_entry.async_on_unload(async_dispatcher_connect(hass, signal_plans_changed(config_entry.entry_id), plans_changed))
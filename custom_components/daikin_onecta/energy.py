@@ -0,0 +1,82 @@
+"""Energy history of the Daikin devices."""
+from dataclasses import dataclass
+from datetime import date
+
+from .const import SENSOR_PERIOD_DAILY
+from .const import SENSOR_PERIOD_MONTHLY
+from .const import SENSOR_PERIOD_WEEKLY
+from .const import SENSOR_PERIOD_YEARLY
+
+
+def _total(values, start, end=None):
+    return round(sum(values[start:end]), 3)
+
+
+@dataclass(frozen=True, slots=True)
+class EnergyTotals:
+    """Totals of one energy type and operation mode, None when the cloud doesn't provide the period.
+
+    The d array holds 2 times 12 two-hourly values (yesterday, today), w holds 2 times 7 daily
+    values (last week, this week) and m holds 2 times 12 monthly values (last year, this year).
+    """
+
+    daily: float | None
+    weekly: float | None
+    yearly: float | None
+    # The monthly values of the m array
+    months: tuple | None
+
+    def value(self, period: str, today: date | None = None) -> float | None:
+        """Return the total of the current period."""
+        if period == SENSOR_PERIOD_DAILY:
+            return self.daily
+        if period == SENSOR_PERIOD_WEEKLY:
+            return self.weekly
+        if period == SENSOR_PERIOD_YEARLY:
+            return self.yearly
+        if period == SENSOR_PERIOD_MONTHLY and self.months is not None:
+            month = (today or date.today()).month
+            return _total(self.months, 11 + month, 12 + month)
+        return None
+
+
+def _normalize(values) -> tuple | None:
+    if values is None:
+        return None
+    return tuple(0 if v is None else v for v in values)
+
+
+class EnergyHistory:
+    """Energy history of one consumptionData or outputData characteristic.
+
+    The value of the characteristic is parsed once into totals per energy type and
+    operation mode, all energy sensors of the characteristic read those totals.
+    """
+
+    __slots__ = ("_totals",)
+
+    def __init__(self, value: dict | None) -> None:
+        """Parse the value of a consumptionData/outputData characteristic."""
+        self._totals: dict[tuple[str, str], EnergyTotals] = {}
+        for energy_type, modes in (value or {}).items():
+            if not isinstance(modes, dict):
+                continue
+            for mode, periods in modes.items():
+                if not isinstance(periods, dict):
+                    continue
+                d = _normalize(periods.get("d"))
+                w = _normalize(periods.get("w"))
+                m = _normalize(periods.get("m"))
+                self._totals[energy_type, mode] = EnergyTotals(
+                    daily=None if d is None else _total(d, 12),
+                    weekly=None if w is None else _total(w, 7),
+                    yearly=None if m is None else _total(m, 12),
+                    months=m,
+                )
+
+    def value(self, energy_type: str, mode: str, period: str, today: date | None = None) -> float | None:
+        """Return the total for the energy type, operation mode and period or None."""
+        totals = self._totals.get((energy_type, mode))
+        if totals is None:
+            return None
+        return totals.value(period, today)
@@ -0,0 +1,142 @@
+"""Request metrics of the Daikin Onecta API."""
+import re
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket is unbounded
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GATEWAY_DEVICE_PATTERN = re.compile(r"^/v1/gateway-devices/[^/]+")
+MANAGEMENT_POINT_PATTERN = re.compile(r"/management-points/[^/]+")
+
+
+def endpoint(resource_url: str) -> str:
+    """Return the endpoint of a resource url without the device and management point ids."""
+    endpoint = GATEWAY_DEVICE_PATTERN.sub("/v1/gateway-devices/{device}", resource_url)
+    return MANAGEMENT_POINT_PATTERN.sub("/management-points/{management_point}", endpoint)
+
+
+class Histogram:
+    """Histogram of durations in seconds with fixed buckets."""
+
+    __slots__ = ("buckets", "count", "max", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a duration to the histogram."""
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def average(self) -> float | None:
+        """Return the average duration in seconds, None when nothing has been recorded."""
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def as_dict(self) -> dict:
+        """Return the histogram for the diagnostics."""
+        buckets = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)}
+        buckets["le_inf"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "average": self.average,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class EndpointMetrics:
+    """Metrics of the requests with one method to one endpoint."""
+
+    __slots__ = ("bytes_received", "bytes_sent", "latency", "statuses")
+
+    def __init__(self) -> None:
+        """Initialize the metrics of an endpoint."""
+        self.latency = Histogram()
+        # Number of responses per http status, "error" counts the network errors
+        self.statuses: dict[str, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def as_dict(self) -> dict:
+        """Return the metrics for the diagnostics."""
+        return {
+            "latency": self.latency.as_dict(),
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+class ApiMetrics:
+    """Latency and outcome of the requests of a DaikinApi.
+
+    Besides the request latency the time spent waiting for a slot of the request
+    scheduler and the time spent refreshing the access token are recorded, so a slow
+    command can be attributed to the cloud, to queueing or to the token refresh.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.scheduler_wait = Histogram()
+        self.token_refresh = Histogram()
+        self.token_refresh_failures = 0
+        self.retries = 0
+
+    def record_request(self, method: str, resource_url: str, seconds: float, status, bytes_sent: int = 0, bytes_received: int = 0) -> None:
+        """Record the outcome of a request, status is the http status or "error"."""
+        key = f"{method} {endpoint(resource_url)}"
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        metrics.latency.record(seconds)
+        status = str(status)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+
+    def record_token_refresh(self, seconds: float) -> None:
+        """Record the duration of a successful access token refresh."""
+        self.token_refresh.record(seconds)
+
+    def _requests(self) -> int:
+        return sum(metrics.latency.count for metrics in self.endpoints.values())
+
+    def _average_ms(self, histograms) -> float | None:
+        count = sum(histogram.count for histogram in histograms)
+        if count == 0:
+            return None
+        return round(sum(histogram.total for histogram in histograms) / count * 1000, 1)
+
+    def values(self) -> dict:
+        """Return the summary values to expose as sensors and in the system health."""
+        return {
+            "requests": self._requests(),
+            "request_errors": sum(metrics.statuses.get("error", 0) for metrics in self.endpoints.values()),
+            "retries": self.retries,
+            "average_latency": self._average_ms([metrics.latency for metrics in self.endpoints.values()]),
+            "average_scheduler_wait": self._average_ms([self.scheduler_wait]),
+            "average_token_refresh": self._average_ms([self.token_refresh]),
+            "token_refreshes": self.token_refresh.count,
+            "token_refresh_failures": self.token_refresh_failures,
+        }
+
+    def as_dict(self) -> dict:
+        """Return all metrics for the diagnostics."""
+        return {
+            "summary": self.values(),
+            "endpoints": {key: metrics.as_dict() for key, metrics in self.endpoints.items()},
+            "scheduler_wait": self.scheduler_wait.as_dict(),
+            "token_refresh": self.token_refresh.as_dict(),
+        }
@@ -0,0 +1,58 @@
+"""Debug logging of the payloads exchanged with the Daikin cloud.
+
+Every response is logged as a summary with its size and hash. The body itself is only
+logged for one in every payload_log_interval responses and truncated to
+payload_log_bytes, so debug logging can stay enabled without flooding the log with
+the complete gateway-devices payload on every poll.
+"""
+import hashlib
+import logging
+
+DEFAULT_PAYLOAD_LOG_BYTES = 2048
+DEFAULT_PAYLOAD_LOG_INTERVAL = 1
+
+
+def payload_hash(body: bytes) -> str:
+    """Return a short hash to recognize identical payloads in the log."""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def truncate(body: bytes, max_bytes: int) -> str:
+    """Return the body as text, truncated to max_bytes."""
+    if len(body) <= max_bytes:
+        return body.decode(errors="replace")
+    return f"{body[:max_bytes].decode(errors='replace')}... ({len(body) - max_bytes} bytes truncated)"
+
+
+class PayloadLogger:
+    """Log summaries and sampled, truncated bodies of the responses."""
+
+    def __init__(self, logger: logging.Logger, options) -> None:
+        """Initialize with the logger and the options of the config entry."""
+        self._logger = logger
+        self._options = options
+        self._responses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return if payloads are logged, callers check this before building log arguments."""
+        return self._logger.isEnabledFor(logging.DEBUG)
+
+    def response(self, method: str, resource_url: str, status: int, body: bytes, rate_limits: dict) -> None:
+        """Log a response, only call this when enabled."""
+        self._responses += 1
+        self._logger.debug(
+            "Response %s %s status %s size %s hash %s limits %s",
+            method,
+            resource_url,
+            status,
+            len(body),
+            payload_hash(body),
+            rate_limits,
+        )
+        # The options flow stores numbers as float
+        options = self._options()
+        max_bytes = int(options.get("payload_log_bytes", DEFAULT_PAYLOAD_LOG_BYTES))
+        interval = max(int(options.get("payload_log_interval", DEFAULT_PAYLOAD_LOG_INTERVAL)), 1)
+        if max_bytes > 0 and body and self._responses % interval == 0:
+            self._logger.debug("Response %s %s body: %s", method, resource_url, truncate(body, max_bytes))
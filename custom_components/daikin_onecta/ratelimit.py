@@ -0,0 +1,151 @@
+"""Rate limit budget planning for the Daikin Onecta cloud."""
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+from datetime import UTC
+
+from homeassistant.core import callback
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_GOVERNOR = f"{DOMAIN}_governor"
+# Minimal number of seconds between the polls of different accounts
+POLL_SPACING = 10
+
+
+class RateLimitBudget:
+    """Spread the remaining daily API calls evenly until the daily limit resets.
+
+    A part of the remaining calls is kept as reserve for user commands (PATCH/POST/PUT),
+    the other calls are available for polling.
+    """
+
+    def __init__(self, daikin_api, reserve: int = 20) -> None:
+        """Initialize the budget for the rate limits of the given DaikinApi."""
+        self._daikin_api = daikin_api
+        self.reserve = reserve
+
+    @property
+    def rate_limits(self) -> dict:
+        return self._daikin_api.rate_limits
+
+    @staticmethod
+    def seconds_until_reset(now: datetime | None = None) -> float:
+        """Return the number of seconds until the daily limit resets.
+
+        The ratelimit-reset header only reports the reset of the minute window, the
+        daily window of the Daikin cloud resets at midnight UTC.
+        """
+        if now is None:
+            now = datetime.now(UTC)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (midnight - now).total_seconds()
+
+    @property
+    def known(self) -> bool:
+        """Return if we have received the rate limits from the Daikin cloud."""
+        return self.rate_limits.get("day", 0) > 0
+
+    @property
+    def command_reserve(self) -> int:
+        """Return the number of calls reserved for user commands."""
+        return min(self.reserve, self.rate_limits.get("remaining_day", 0))
+
+    @property
+    def planned_polls(self) -> int:
+        """Return the number of polls we plan to do until the daily limit resets."""
+        return max(self.rate_limits.get("remaining_day", 0) - self.reserve, 0)
+
+    def poll_interval(self, now: datetime | None = None) -> float | None:
+        """Return the minimal poll interval in seconds to not exhaust the budget, None when unknown."""
+        if not self.known:
+            return None
+        seconds = self.seconds_until_reset(now)
+        planned_polls = self.planned_polls
+        if planned_polls == 0:
+            # Only the reserve for commands is left, poll again just after the reset
+            return seconds + 60
+        return seconds / planned_polls
+
+    def values(self) -> dict:
+        """Return the budget values to expose as sensors and diagnostics."""
+        return {
+            "planned_polls": self.planned_polls,
+            "command_reserve": self.command_reserve,
+        }
+
+
+class RateLimitGovernor:
+    """Coordinate the polls of all Daikin accounts of this Home Assistant instance.
+
+    Each account has its own rate limits and its own poll schedule. The governor knows
+    the budget of every account, staggers the polls so that accounts don't poll in the
+    same second and reports the budget per account and for all accounts together.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without accounts."""
+        # Title and budget per config entry id
+        self._accounts: dict[str, tuple[str, RateLimitBudget]] = {}
+        # Monotonic time of the next planned poll per config entry id
+        self._next_poll: dict[str, float] = {}
+
+    @callback
+    def async_register(self, entry_id: str, title: str, budget: RateLimitBudget) -> Callable[[], None]:
+        """Add the budget of an account, returns the function to remove it."""
+        self._accounts[entry_id] = (title, budget)
+
+        @callback
+        def unregister() -> None:
+            self._accounts.pop(entry_id, None)
+            self._next_poll.pop(entry_id, None)
+
+        return unregister
+
+    def stagger(self, entry_id: str, interval: float, now: float | None = None) -> float:
+        """Return the poll interval of an account, moved later when it would poll close to another account."""
+        if now is None:
+            now = time.monotonic()
+        planned = now + interval
+        for other_poll in sorted(poll for other, poll in self._next_poll.items() if other != entry_id):
+            if abs(planned - other_poll) < POLL_SPACING:
+                planned = other_poll + POLL_SPACING
+        if planned != now + interval:
+            _LOGGER.debug("Daikin governor moved the poll of %s %.0f seconds later", entry_id, planned - now - interval)
+        self._next_poll[entry_id] = planned
+        return planned - now
+
+    def account_values(self) -> dict[str, dict]:
+        """Return the budget per account title."""
+        return {
+            title: {
+                "remaining_day": budget.rate_limits.get("remaining_day", 0),
+                "max_day": budget.rate_limits.get("day", 0),
+                **budget.values(),
+            }
+            for title, budget in self._accounts.values()
+        }
+
+    def values(self) -> dict:
+        """Return the budget of all accounts together."""
+        budgets = [budget for _, budget in self._accounts.values()]
+        return {
+            "accounts": len(budgets),
+            "total_remaining_day": sum(budget.rate_limits.get("remaining_day", 0) for budget in budgets),
+            "total_planned_polls": sum(budget.planned_polls for budget in budgets),
+            "total_command_reserve": sum(budget.command_reserve for budget in budgets),
+        }
+
+
+@callback
+def async_get_governor(hass: HomeAssistant) -> RateLimitGovernor:
+    """Return the governor shared by all config entries."""
+    governor = hass.data.get(DATA_GOVERNOR)
+    if governor is None:
+        governor = hass.data[DATA_GOVERNOR] = RateLimitGovernor()
+    return governor
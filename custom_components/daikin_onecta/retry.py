@@ -0,0 +1,55 @@
+"""Retry policy for the commands sent to the Daikin cloud."""
+import random
+
+from aiohttp import ClientConnectorError
+
+DEFAULT_RETRY_ATTEMPTS = 2
+
+# PATCH and PUT set a value, sending them again has the same result
+IDEMPOTENT_METHODS = ("PATCH", "PUT")
+# Statuses of a gateway or an overloaded cloud, the request hasn't been processed
+RETRY_STATUSES = (502, 503, 504)
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 8.0
+# A longer retry-after means the minute or day limit is exhausted, retrying only adds load
+RETRY_MAX_RETRY_AFTER = 10
+
+
+class RetryPolicy:
+    """Decide if and when a failed command is retried.
+
+    Commands are retried with an exponential backoff with full jitter, a 429 is only
+    retried when the cloud tells us with retry-after that it will accept it soon. A POST
+    isn't idempotent, it is only retried when it can't have reached the cloud. Polls
+    aren't retried here, the coordinator polls again at the next interval.
+    """
+
+    def __init__(self, options) -> None:
+        """Initialize with a function returning the options of the config entry."""
+        self._options = options
+
+    @property
+    def attempts(self) -> int:
+        """Return the number of retries of a command."""
+        return self._options().get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before retry number attempt + 1."""
+        return random.uniform(0, min(RETRY_MAX_BACKOFF, RETRY_BACKOFF * 2**attempt))
+
+    def delay(self, method: str, attempt: int, status: int | None = None, retry_after: int = 0, error: Exception | None = None) -> float | None:
+        """Return the number of seconds to wait before retrying, None when the request isn't retried."""
+        if method == "GET" or attempt >= self.attempts:
+            return None
+        if error is not None:
+            if method in IDEMPOTENT_METHODS or isinstance(error, ClientConnectorError):
+                return self.backoff(attempt)
+            return None
+        if status == 429:
+            # Rejected by the rate limiter, so also a POST can be sent again
+            if 0 < retry_after <= RETRY_MAX_RETRY_AFTER:
+                return float(retry_after)
+            return None
+        if status in RETRY_STATUSES and method in IDEMPOTENT_METHODS:
+            return self.backoff(attempt)
+        return None
@@ -0,0 +1,94 @@
+"""Scheduling of the http requests to the Daikin cloud."""
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICE_ID_PATTERN = re.compile(r"^/v1/gateway-devices/([^/]+)")
+
+MAX_CONCURRENT_WRITES = 4
+# Seconds a GET waits for the writes in flight before new writes wait for the GET
+MAX_READ_WAIT = 10
+
+
+class DaikinRequestScheduler:
+    """Reader/writer scheduler for the requests to the Daikin cloud.
+
+    Writes (PATCH/POST/PUT) to different devices run concurrently, writes to the same
+    device are serialized. A GET only starts when there are no writes in flight because
+    the Daikin cloud returns old settings when it is queried while a write is ongoing.
+    A write doesn't wait for a GET, unless the GET has been waiting for MAX_READ_WAIT
+    seconds, then new writes wait until the writes in flight have completed so that a
+    stream of writes can't hold back the polls.
+    """
+
+    def __init__(self, rate_limits: dict) -> None:
+        """Initialize the scheduler, rate_limits is the dict maintained by the DaikinApi."""
+        self._rate_limits = rate_limits
+        self._condition = asyncio.Condition()
+        self._read_lock = asyncio.Lock()
+        # Lock per device id and the number of writes holding or waiting for it, a lock is
+        # dropped when no write uses it anymore
+        self._device_locks: dict[str, asyncio.Lock] = {}
+        self._device_writers: dict[str, int] = {}
+        self._writes_in_flight = 0
+        # A GET waited MAX_READ_WAIT seconds, new writes wait for it
+        self._read_priority = False
+
+    def _write_slots(self) -> int:
+        slots = MAX_CONCURRENT_WRITES
+        if self._rate_limits["minute"] > 0:
+            # Don't start more writes than we have left in this minute, the cloud
+            # rejects them anyway, but always allow one so that we get a new limit
+            slots = min(slots, max(self._rate_limits["remaining_minutes"], 1))
+        return slots
+
+    @asynccontextmanager
+    async def _device_lock(self, resource_url: str):
+        match = DEVICE_ID_PATTERN.match(resource_url)
+        device_id = match.group(1) if match else ""
+        lock = self._device_locks.get(device_id)
+        if lock is None:
+            lock = self._device_locks[device_id] = asyncio.Lock()
+        self._device_writers[device_id] = self._device_writers.get(device_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._device_writers[device_id] -= 1
+            if not self._device_writers[device_id]:
+                del self._device_writers[device_id]
+                del self._device_locks[device_id]
+
+    @asynccontextmanager
+    async def read(self):
+        """Wait until all in-flight writes have completed and run the read."""
+        async with self._read_lock:
+            async with self._condition:
+                try:
+                    await asyncio.wait_for(self._condition.wait_for(lambda: self._writes_in_flight == 0), MAX_READ_WAIT)
+                except TimeoutError:
+                    _LOGGER.debug("Read waited %s seconds for the writes, new writes wait for the read", MAX_READ_WAIT)
+                    self._read_priority = True
+                    try:
+                        await self._condition.wait_for(lambda: self._writes_in_flight == 0)
+                    finally:
+                        self._read_priority = False
+                        self._condition.notify_all()
+            yield
+
+    @asynccontextmanager
+    async def write(self, resource_url: str):
+        """Wait until we can write to the device of the resource url and run the write."""
+        async with self._device_lock(resource_url):
+            async with self._condition:
+                await self._condition.wait_for(lambda: not self._read_priority and self._writes_in_flight < self._write_slots())
+                self._writes_in_flight += 1
+            try:
+                yield
+            finally:
+                async with self._condition:
+                    self._writes_in_flight -= 1
+                    self._condition.notify_all()
@@ -3,6 +3,7 @@ import logging
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ICON
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
@@ -13,8 +14,9 @@ from .const import ENABLED_DEFAULT
 from .const import SCHEDULE_OFF
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
-from .coordinator import OnectaRuntimeData
 from .device import DaikinOnectaDevice
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,22 +26,14 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    """Set up Daikin climate based on config_entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    sensors = []
-    for device in onecta_data.devices.values():
-        managementPoints = device.daikin_data.get("managementPoints", [])
-        for management_point in managementPoints:
-            # When we have a schedule we provide a select sensor
-            schedule = management_point.get("schedule")
-            if schedule is not None:
-                management_point_type = management_point["managementPointType"]
-                embedded_id = management_point["embeddedId"]
-                _LOGGER.info("Device '%s' provides schedule", device.name)
-                sensors.append(DaikinScheduleSelect(device, coordinator, embedded_id, management_point_type, "schedule"))
-
-    async_add_entities(sensors)
+    """Set up Daikin schedule selects based on config_entry."""
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_select(device, plan: EntityPlan):
+        _LOGGER.info("Device '%s' provides schedule", device.name)
+        return DaikinScheduleSelect(device, coordinator, plan.embedded_id, plan.management_point_type, plan.value)
+
+    async_add_planned_entities(hass, config_entry, Platform.SELECT, create_select, async_add_entities)
 
 
 class DaikinScheduleSelect(CoordinatorEntity, SelectEntity):
@@ -82,58 +76,61 @@ class DaikinScheduleSelect(CoordinatorEntity, SelectEntity):
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id, self._value):
+            self.update_state()
+            self.async_write_ha_state()
+
+    def schedule(self):
+        """Return the schedule dict of our management point."""
+        scheduledict = None
+        management_point = self._device.management_point(self._embedded_id)
+        if management_point is not None and self._management_point_type == management_point["managementPointType"]:
+            scheduledict = management_point.get(self._value)
+        return scheduledict
 
     def get_current_option(self):
         """Return the state of the sensor."""
         res = None
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if self._embedded_id == management_point["embeddedId"]:
-                management_point_type = management_point["managementPointType"]
-                if self._management_point_type == management_point_type:
-                    scheduledict = management_point.get(self._value)
-                    if scheduledict is not None:
-                        currentMode = scheduledict["value"]["currentMode"]["value"]
-                        # When there is no schedule enabled we return none
-                        if not scheduledict["value"]["modes"][currentMode]["enabled"]["value"]:
-                            res = SCHEDULE_OFF
-                        else:
-                            currentSchedule = scheduledict["value"]["modes"][currentMode]["currentSchedule"]["value"]
-                            res = scheduledict["value"]["modes"][currentMode]["schedules"][currentSchedule]["name"]["value"]
-                            if not res:
-                                res = currentSchedule
+        scheduledict = self.schedule()
+        if scheduledict is not None:
+            currentMode = scheduledict["value"]["currentMode"]["value"]
+            # When there is no schedule enabled we return none
+            if not scheduledict["value"]["modes"][currentMode]["enabled"]["value"]:
+                res = SCHEDULE_OFF
+            else:
+                currentSchedule = scheduledict["value"]["modes"][currentMode]["currentSchedule"]["value"]
+                res = scheduledict["value"]["modes"][currentMode]["schedules"][currentSchedule]["name"]["value"]
+                if not res:
+                    res = currentSchedule
         return res
 
     async def async_select_option(self, option: str) -> None:
         _LOGGER.debug("Device '%s' selecting schedule %s", self._device.name, option)
         currentMode = ""
         scheduleid = option
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if self._embedded_id == management_point["embeddedId"]:
-                management_point_type = management_point["managementPointType"]
-                if self._management_point_type == management_point_type:
-                    scheduledict = management_point.get(self._value)
-                    if scheduledict is not None:
-                        currentMode = scheduledict["value"]["currentMode"]["value"]
-                        # Look for a schedule with the user selected readable name, when we find it, we use the schedule id
-                        # related to that name
-                        for scheduleName in scheduledict["value"]["modes"][currentMode]["currentSchedule"]["values"]:
-                            readableName = scheduledict["value"]["modes"][currentMode]["schedules"][scheduleName]["name"]["value"]
-                            if not readableName:
-                                readableName = scheduleName
-                            if option == SCHEDULE_OFF:
-                                if readableName == self._attr_current_option:
-                                    scheduleid = scheduleName
-                                    break
-                            else:
-                                if readableName == option:
-                                    scheduleid = scheduleName
-                                    break
+        scheduledict = self.schedule()
+        if scheduledict is not None:
+            currentMode = scheduledict["value"]["currentMode"]["value"]
+            # Look for a schedule with the user selected readable name, when we find it, we use the schedule id
+            # related to that name
+            for scheduleName in scheduledict["value"]["modes"][currentMode]["currentSchedule"]["values"]:
+                readableName = scheduledict["value"]["modes"][currentMode]["schedules"][scheduleName]["name"]["value"]
+                if not readableName:
+                    readableName = scheduleName
+                if option == SCHEDULE_OFF:
+                    if readableName == self._attr_current_option:
+                        scheduleid = scheduleName
+                        break
+                else:
+                    if readableName == option:
+                        scheduleid = scheduleName
+                        break
 
         value = {"scheduleId": scheduleid, "enabled": option != SCHEDULE_OFF}
         result = await self._device.put(self._device.id, self._embedded_id, f"schedule/{currentMode}/current", value)
@@ -151,25 +148,20 @@ class DaikinScheduleSelect(CoordinatorEntity, SelectEntity):
 
     def get_options(self):
         opt = []
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if self._embedded_id == management_point["embeddedId"]:
-                management_point_type = management_point["managementPointType"]
-                if self._management_point_type == management_point_type:
-                    scheduledict = management_point.get(self._value)
-                    if scheduledict is not None:
-                        currentMode = scheduledict["value"]["currentMode"]["value"]
-                        for scheduleName in scheduledict["value"]["modes"][currentMode]["currentSchedule"]["values"]:
-                            readableName = scheduledict["value"]["modes"][currentMode]["schedules"][scheduleName]["name"].get("value")
-                            # The schedule can maybe have an empty name set, use at that moment the internal ID
-                            if not readableName:
-                                readableName = scheduleName
-                            opt.append(readableName)
-
-                        # Only add off when the schedule current mode enabled settable is true
-                        if scheduledict["value"]["modes"][currentMode]["enabled"]["settable"]:
-                            _LOGGER.info("Device '%s:%s' enabled can be set, so providing %s", self._device.name, self._embedded_id, SCHEDULE_OFF)
-
-                            opt.append(SCHEDULE_OFF)
+        scheduledict = self.schedule()
+        if scheduledict is not None:
+            currentMode = scheduledict["value"]["currentMode"]["value"]
+            for scheduleName in scheduledict["value"]["modes"][currentMode]["currentSchedule"]["values"]:
+                readableName = scheduledict["value"]["modes"][currentMode]["schedules"][scheduleName]["name"].get("value")
+                # The schedule can maybe have an empty name set, use at that moment the internal ID
+                if not readableName:
+                    readableName = scheduleName
+                opt.append(readableName)
+
+            # Only add off when the schedule current mode enabled settable is true
+            if scheduledict["value"]["modes"][currentMode]["enabled"]["settable"]:
+                _LOGGER.info("Device '%s:%s' enabled can be set, so providing %s", self._device.name, self._embedded_id, SCHEDULE_OFF)
+
+                opt.append(SCHEDULE_OFF)
 
         return opt
@@ -1,6 +1,5 @@
 """Support for Daikin AC sensors."""
 import logging
-from datetime import date
 
 from homeassistant.components.sensor import CONF_STATE_CLASS
 from homeassistant.components.sensor import SensorEntity
@@ -8,6 +7,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_CLASS
 from homeassistant.const import CONF_ICON
 from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
@@ -16,15 +16,16 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
 from .const import ENABLED_DEFAULT
 from .const import ENTITY_CATEGORY
-from .const import SENSOR_PERIOD_MONTHLY
-from .const import SENSOR_PERIOD_WEEKLY
-from .const import SENSOR_PERIOD_YEARLY
 from .const import SENSOR_PERIODS
-from .const import SENSOR_PERIODS_ARRAY
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
 from .coordinator import OnectaRuntimeData
 from .device import DaikinOnectaDevice
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
+from .discovery import KIND_ENERGY
+from .discovery import KIND_LIMIT
+from .discovery import KIND_VALUE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,132 +38,41 @@ async def async_setup(hass, async_add_entities):
     """
 
 
-def handle_energy_sensors(coordinator, device, embedded_id, management_point_type, sensor_type, cdve, sensors, datatype):
-    _LOGGER.info("Device '%s' provides '%s'", device.name, sensor_type)
-    for mode in cdve:
-        _LOGGER.info(
-            "Device '%s' provides mode %s %s",
-            device.name,
-            management_point_type,
-            mode,
-        )
-        for period in cdve[mode]:
-            periodName = SENSOR_PERIODS.get(period)
-            # When we have the yearly sensor we also add a monthly
-            if period == SENSOR_PERIOD_YEARLY:
-                period_monthly = SENSOR_PERIOD_MONTHLY
-                _LOGGER.info(
-                    "Device '%s:%s' provides mode %s %s supports period %s",
-                    device.name,
-                    embedded_id,
-                    management_point_type,
-                    mode,
-                    period_monthly,
-                )
-                sensor = f"{device.name} {sensor_type} {management_point_type} {mode} {SENSOR_PERIOD_MONTHLY}"
-                _LOGGER.info("Proposing sensor '%s'", sensor)
-                sensors.append(
-                    DaikinEnergySensor(device, coordinator, embedded_id, management_point_type, sensor_type, mode, period_monthly, datatype)
-                )
-            if periodName is not None:
-                _LOGGER.info(
-                    "Device '%s:%s' provides mode %s %s supports period %s",
-                    device.name,
-                    embedded_id,
-                    management_point_type,
-                    mode,
-                    period,
-                )
-                sensor = f"{device.name} {sensor_type} {management_point_type} {mode} {periodName}"
-                _LOGGER.info("Proposing sensor '%s'", sensor)
-                sensors.append(DaikinEnergySensor(device, coordinator, embedded_id, management_point_type, sensor_type, mode, period, datatype))
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
-    """Set up Daikin climate based on config_entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    sensors = []
-    supported_management_point_types = {
-        "domesticHotWaterTank",
-        "domesticHotWaterFlowThrough",
-        "climateControl",
-        "climateControlMainZone",
-    }
-    for device in onecta_data.devices.values():
-        # For each device we provide a remaining day sensor
-        sensors.append(DaikinLimitSensor(hass, config_entry, device, coordinator, "remaining_day"))
-        management_points = device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            embedded_id = management_point["embeddedId"]
-
-            for value in management_point:
-                vv = management_point.get(value)
-                # Only when we have a value sensor mapping we create a sensor
-                sensor_settings = VALUE_SENSOR_MAPPING.get(value)
-                if sensor_settings is not None:
-                    # When there is a value dict
-                    if isinstance(vv, dict):
-                        value_value = vv.get("value")
-                        settable = vv.get("settable", False)
-                        values = vv.get("values", [])
-                        if value_value is not None and settable is True and "on" in values and "off" in values:
-                            # Don't create when it is settable and values on/off, that is a switch
-                            pass
-                        elif len(values) == 0 and value_value is not None and isinstance(value_value, bool):
-                            # We don't have mutiple values and the value is a bool, this is a binary sensor
-                            pass
-                        elif value == "operationMode" and management_point_type in supported_management_point_types:
-                            # operationMode is handled by the HWT and ClimateControl directly, so don't create a separate sensor for that
-                            pass
-                        elif value_value is not None and not isinstance(value_value, dict):
-                            sensors.append(
-                                DaikinValueSensor(
-                                    device,
-                                    coordinator,
-                                    embedded_id,
-                                    management_point_type,
-                                    None,
-                                    value,
-                                )
-                            )
-
-            sd = management_point.get("sensoryData")
-            if sd is not None:
-                sensory_data = sd.get("value")
-                _LOGGER.info("Device '%s' provides sensoryData '%s'", device.name, sensory_data)
-                if sensory_data is not None:
-                    for sensor in sensory_data:
-                        sensor_settings = VALUE_SENSOR_MAPPING.get(sensor)
-                        if sensor_settings is not None:
-                            _LOGGER.info("Device '%s' provides sensor '%s'", device.name, sensor)
-                            sensors.append(
-                                DaikinValueSensor(
-                                    device,
-                                    coordinator,
-                                    embedded_id,
-                                    management_point_type,
-                                    "sensoryData",
-                                    sensor,
-                                )
-                            )
-
-            for datatype in ["consumption", "output"]:
-                cd = management_point.get(f"{datatype}Data")
-                if cd is not None:
-                    cdv = cd.get("value")
-                    if cdv is not None:
-                        for energy_type in ["electrical", "gas", "thermal"]:
-                            cdve = cdv.get(energy_type)
-                            if cdve is not None:
-                                handle_energy_sensors(coordinator, device, embedded_id, management_point_type, energy_type, cdve, sensors, datatype)
-
-    async_add_entities(sensors)
+    """Set up Daikin sensors based on config_entry."""
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_sensor(device, plan: EntityPlan):
+        if plan.kind == KIND_LIMIT:
+            return DaikinLimitSensor(hass, config_entry, device, coordinator, plan.value, plan.sub_type)
+        if plan.kind == KIND_VALUE:
+            return DaikinValueSensor(device, coordinator, plan.embedded_id, plan.management_point_type, plan.sub_type, plan.value)
+        if plan.kind == KIND_ENERGY:
+            _LOGGER.info(
+                "Device '%s:%s' provides mode %s %s supports period %s",
+                device.name,
+                plan.embedded_id,
+                plan.management_point_type,
+                plan.operation_mode,
+                plan.period,
+            )
+            return DaikinEnergySensor(
+                device,
+                coordinator,
+                plan.embedded_id,
+                plan.management_point_type,
+                plan.energy_type,
+                plan.operation_mode,
+                plan.period,
+                plan.datatype,
+            )
+        return None
+
+    async_add_planned_entities(hass, config_entry, Platform.SENSOR, create_sensor, async_add_entities)
 
 
 class DaikinEnergySensor(CoordinatorEntity, SensorEntity):
@@ -213,50 +123,28 @@ class DaikinEnergySensor(CoordinatorEntity, SensorEntity):
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id, f"{self._datatype}Data"):
+            self.update_state()
+            self.async_write_ha_state()
 
     def sensor_value(self):
-        energy_value = None
-        for management_point in self._device.daikin_data["managementPoints"]:
-            if self._embedded_id == management_point["embeddedId"]:
-                management_point_type = management_point["managementPointType"]
-                cd = management_point.get(f"{self._datatype}Data")
-                if cd is not None:
-                    # Retrieve the available operationModes, we can only provide energy data for
-                    # supported operation modes
-                    cdv = cd.get("value")
-                    if cdv is not None:
-                        cdve = cdv.get(self._sensor_type)
-                        if cdve is not None:
-                            for mode in cdve:
-                                # Only handle data for the operation mode supported by this sensor
-                                if mode == self._operation_mode:
-                                    period_data = cdve[mode].get(SENSOR_PERIODS_ARRAY[self._period])
-                                    if period_data is not None:
-                                        energy_values = [0 if v is None else v for v in period_data]
-                                        if self._period == SENSOR_PERIOD_WEEKLY:
-                                            start_index = 7
-                                            end_index = len(energy_values)
-                                        elif self._period == SENSOR_PERIOD_MONTHLY:
-                                            start_index = 11 + date.today().month
-                                            end_index = start_index + 1
-                                        else:
-                                            start_index = 12
-                                            end_index = len(energy_values)
-                                        energy_value = round(sum(energy_values[start_index:end_index]), 3)
-                                        _LOGGER.debug(
-                                            "Device '%s' has energy value '%s' for '%s' mode %s %s period %s",
-                                            self._device.name,
-                                            energy_value,
-                                            self._sensor_type,
-                                            management_point_type,
-                                            mode,
-                                            self._period,
-                                        )
-
+        energy_history = self._device.energy_history(self._embedded_id, self._datatype)
+        energy_value = energy_history.value(self._sensor_type, self._operation_mode, self._period)
+        _LOGGER.debug(
+            "Device '%s' has energy value '%s' for '%s' mode %s %s period %s",
+            self._device.name,
+            energy_value,
+            self._sensor_type,
+            self._management_point_type,
+            self._operation_mode,
+            self._period,
+        )
         return energy_value
 
 
@@ -311,25 +199,29 @@ class DaikinValueSensor(CoordinatorEntity, SensorEntity):
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id, self._sub_type or self._value):
+            self.update_state()
+            self.async_write_ha_state()
 
     def sensor_value(self):
         res = None
-        managementPoints = self._device.daikin_data.get("managementPoints", [])
-        for management_point in managementPoints:
-            if self._embedded_id == management_point["embeddedId"]:
-                if self._sub_type is not None:
-                    sub_type_data = management_point.get(self._sub_type)
-                    if sub_type_data is not None:
-                        management_point_v = sub_type_data.get("value")
-                        if management_point_v is not None:
-                            management_point = management_point_v
-                cd = management_point.get(self._value)
-                if cd is not None:
-                    res = cd.get("value")
+        management_point = self._device.management_point(self._embedded_id)
+        if management_point is not None:
+            if self._sub_type is not None:
+                sub_type_data = management_point.get(self._sub_type)
+                if sub_type_data is not None:
+                    management_point_v = sub_type_data.get("value")
+                    if management_point_v is not None:
+                        management_point = management_point_v
+            cd = management_point.get(self._value)
+            if cd is not None:
+                res = cd.get("value")
         _LOGGER.debug("Device '%s' sensor '%s' value '%s'", self._device.name, self._value, res)
         return res
 
@@ -342,6 +234,7 @@ class DaikinLimitSensor(CoordinatorEntity, SensorEntity):
         device: DaikinOnectaDevice,
         coordinator,
         limit_key,
+        sensor_key="RatelimitRemainingDay",
     ) -> None:
         _LOGGER.info("Device '%s' LimitSensor '%s'", device.name, limit_key)
         super().__init__(coordinator)
@@ -351,7 +244,7 @@ class DaikinLimitSensor(CoordinatorEntity, SensorEntity):
         self._limit_key = limit_key
         self._attr_has_entity_name = True
         self._attr_unique_id = f"{self._device.id}_limitsensor_{self._limit_key}"
-        sensor_settings = VALUE_SENSOR_MAPPING.get("RatelimitRemainingDay")
+        sensor_settings = VALUE_SENSOR_MAPPING.get(sensor_key)
         self._attr_icon = sensor_settings[CONF_ICON]
         self._attr_device_class = sensor_settings[CONF_DEVICE_CLASS]
         self._attr_entity_registry_enabled_default = sensor_settings[ENABLED_DEFAULT]
@@ -375,11 +268,25 @@ class DaikinLimitSensor(CoordinatorEntity, SensorEntity):
     def update_state(self) -> None:
         self._attr_native_value = self.sensor_value()
 
+    @property
+    def available(self) -> bool:
+        # The limits and metrics are kept by the integration, a failed poll doesn't make them unknown
+        return True
+
     @callback
     def _handle_coordinator_update(self) -> None:
         self.update_state()
         self.async_write_ha_state()
 
     def sensor_value(self):
-        daikin_api = self._config_entry.runtime_data.daikin_api
-        return daikin_api.rate_limits[self._limit_key]
+        onecta_data: OnectaRuntimeData = self._config_entry.runtime_data
+        daikin_api = onecta_data.daikin_api
+        for values in (
+            daikin_api.rate_limits,
+            onecta_data.coordinator.budget.values(),
+            daikin_api.metrics.values(),
+            daikin_api.circuit_breaker.values(),
+        ):
+            if self._limit_key in values:
+                return values[self._limit_key]
+        return None
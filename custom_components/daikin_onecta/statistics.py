@@ -0,0 +1,122 @@
+"""Import of the energy history of the Daikin devices into the long-term statistics."""
+import logging
+from datetime import datetime
+from datetime import timedelta
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData
+from homeassistant.components.recorder.models import StatisticMeanType
+from homeassistant.components.recorder.models import StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.components.recorder.statistics import get_last_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.util.unit_conversion import EnergyConverter
+
+from .const import DOMAIN
+from .device import DaikinOnectaDevice
+from .discovery import ENERGY_DATATYPES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def energy_buckets(periods: dict, now: datetime) -> list[tuple[datetime, float]]:
+    """Return the completed buckets of an energy history as (start, value), oldest first.
+
+    The d array holds the two-hourly values of yesterday and today, the w array the daily
+    values of last week and this week. The daily values are used for the days before
+    yesterday, the two-hourly values for yesterday and today. Buckets in the future or
+    still in progress are skipped.
+    """
+    today = dt_util.start_of_local_day(now)
+    yesterday = today - timedelta(days=1)
+    buckets = []
+
+    week = periods.get("w") or []
+    first_day = today - timedelta(days=7 + today.weekday())
+    for index, value in enumerate(week):
+        start = first_day + timedelta(days=index)
+        if value is not None and start < yesterday:
+            buckets.append((start, value))
+
+    for index, value in enumerate(periods.get("d") or []):
+        start = yesterday + timedelta(hours=2 * index)
+        if value is not None and start + timedelta(hours=2) <= now:
+            buckets.append((start, value))
+
+    return buckets
+
+
+class EnergyStatistics:
+    """Import the energy history of the devices as external statistics.
+
+    Only the buckets after the last imported bucket are written, so each refresh does at
+    most one bulk write per statistic.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        # Start timestamp and sum of the last imported bucket per statistic id
+        self._last: dict[str, tuple[float, float]] = {}
+
+    async def async_import_device(self, device: DaikinOnectaDevice) -> None:
+        """Import the energy history of all management points of a device."""
+        now = dt_util.now()
+        for management_point in device.management_points:
+            for datatype in ENERGY_DATATYPES:
+                value = (management_point.get(f"{datatype}Data") or {}).get("value")
+                if not isinstance(value, dict):
+                    continue
+                unit = value.get("unit", UnitOfEnergy.KILO_WATT_HOUR)
+                for energy_type, modes in value.items():
+                    if not isinstance(modes, dict):
+                        continue
+                    for mode, periods in modes.items():
+                        if isinstance(periods, dict):
+                            await self._async_import(
+                                self._metadata(device, management_point["embeddedId"], datatype, energy_type, mode, unit),
+                                energy_buckets(periods, now),
+                            )
+
+    def _metadata(self, device, embedded_id, datatype, energy_type, mode, unit) -> StatisticMetaData:
+        return StatisticMetaData(
+            has_sum=True,
+            mean_type=StatisticMeanType.NONE,
+            name=f"{device.name} {embedded_id} {mode} {energy_type} {datatype}",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:{slugify(f'{device.id}_{embedded_id}_{mode}_{energy_type}_{datatype}')}",
+            unit_class=EnergyConverter.UNIT_CLASS,
+            unit_of_measurement=unit,
+        )
+
+    async def _async_last(self, statistic_id: str) -> tuple[float, float]:
+        last = self._last.get(statistic_id)
+        if last is None:
+            result = await get_instance(self._hass).async_add_executor_job(get_last_statistics, self._hass, 1, statistic_id, True, {"sum"})
+            rows = result.get(statistic_id)
+            last = (rows[0]["start"], rows[0]["sum"] or 0) if rows else (0.0, 0)
+            self._last[statistic_id] = last
+        return last
+
+    async def _async_import(self, metadata: StatisticMetaData, buckets: list[tuple[datetime, float]]) -> None:
+        if not buckets:
+            return
+        statistic_id = metadata["statistic_id"]
+        last_start, total = await self._async_last(statistic_id)
+        statistics = []
+        for start, value in buckets:
+            # Statistics have to start at a whole hour, also for time zones with a half hour offset
+            start = dt_util.as_utc(start).replace(minute=0, second=0, microsecond=0)
+            if start.timestamp() <= last_start:
+                continue
+            total = round(total + value, 3)
+            last_start = start.timestamp()
+            statistics.append(StatisticData(start=start, state=value, sum=total))
+
+        if statistics:
+            _LOGGER.debug("Importing %s energy statistics for %s", len(statistics), statistic_id)
+            async_add_external_statistics(self._hass, metadata, statistics)
+            self._last[statistic_id] = (last_start, total)
@@ -8,6 +8,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_CLASS
 from homeassistant.const import CONF_ICON
 from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import ToggleEntity
@@ -19,8 +20,9 @@ from .const import ENABLED_DEFAULT
 from .const import ENTITY_CATEGORY
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
-from .coordinator import OnectaRuntimeData
 from .device import DaikinOnectaDevice
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,54 +33,12 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Daikin switches based on config_entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    sensors = []
-    supported_management_point_types = {
-        "domesticHotWaterTank",
-        "domesticHotWaterFlowThrough",
-        "climateControl",
-        "climateControlMainZone",
-    }
-
-    for device in onecta_data.devices.values():
-        management_points = device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            embedded_id = management_point["embeddedId"]
-
-            # For all values provide a "value" we provide a sensor
-            for value in management_point:
-                vv = management_point.get(value)
-                if isinstance(vv, dict):
-                    value_value = vv.get("value")
-                    settable = vv.get("settable", False)
-                    values = vv.get("values", [])
-                    # When the following check changes also update this in sensor.py
-                    if value_value is not None and settable is True and "on" in values and "off" in values:
-                        if value == "onOffMode" and management_point_type in supported_management_point_types:
-                            # On/off is handled by the HWT and ClimateControl directly, so don't create a separate switch
-                            pass
-                        elif value == "powerfulMode" and management_point_type in supported_management_point_types:
-                            # Powerful is handled by the HWT and ClimateControl directly, so don't create a separate switch
-                            pass
-                        else:
-                            _LOGGER.info(
-                                "Device '%s' provides switch on/off '%s'",
-                                device.name,
-                                value,
-                            )
-                            sensors.append(
-                                DaikinSwitch(
-                                    device,
-                                    coordinator,
-                                    embedded_id,
-                                    management_point_type,
-                                    value,
-                                )
-                            )
-
-    async_add_entities(sensors)
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_switch(device, plan: EntityPlan):
+        return DaikinSwitch(device, coordinator, plan.embedded_id, plan.management_point_type, plan.value)
+
+    async_add_planned_entities(hass, config_entry, Platform.SWITCH, create_switch, async_add_entities)
 
 
 class DaikinSwitch(CoordinatorEntity, ToggleEntity):
@@ -125,10 +85,15 @@ class DaikinSwitch(CoordinatorEntity, ToggleEntity):
     def available(self) -> bool:
         return self._device.available
 
+    @property
+    def extra_state_attributes(self):
+        return self.coordinator.stale_attributes()
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id, self._value):
+            self.update_state()
+            self.async_write_ha_state()
 
     @property
     def is_on(self):
@@ -137,14 +102,11 @@ class DaikinSwitch(CoordinatorEntity, ToggleEntity):
     def sensor_value(self):
         """Return the state of the switch."""
         result = ""
-        managementPoints = self._device.daikin_data.get("managementPoints", [])
-        for management_point in managementPoints:
-            if self._embedded_id == management_point["embeddedId"]:
-                management_point_type = management_point["managementPointType"]
-                if self._management_point_type == management_point_type:
-                    cd = management_point.get(self._value)
-                    if cd is not None:
-                        result = cd.get("value")
+        management_point = self._device.management_point(self._embedded_id)
+        if management_point is not None and self._management_point_type == management_point["managementPointType"]:
+            cd = management_point.get(self._value)
+            if cd is not None:
+                result = cd.get("value")
         _LOGGER.debug("Device '%s' switch '%s' value '%s'", self._device.name, self._value, result)
         return result
 
@@ -5,10 +5,17 @@ from homeassistant.components import system_health
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 
+from .circuit_breaker import STATE_CLOSED
+from .circuit_breaker import STATE_HALF_OPEN
+from .circuit_breaker import STATE_OPEN
 from .const import DAIKIN_API_URL
 from .const import DOMAIN
 from .const import OAUTH2_AUTHORIZE
 from .coordinator import OnectaRuntimeData
+from .ratelimit import async_get_governor
+
+# Worst state first, the combined circuit state of the accounts is the worst one
+CIRCUIT_STATES = (STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED)
 
 
 @callback
@@ -17,21 +24,58 @@ def async_register(hass: HomeAssistant, register: system_health.SystemHealthRegi
     register.async_register_info(system_health_info)
 
 
+def _account_info(daikin_api) -> dict[str, Any]:
+    return {
+        "max_minute": daikin_api.rate_limits["minute"],
+        "max_day": daikin_api.rate_limits["day"],
+        "remaining_minute": daikin_api.rate_limits["remaining_minutes"],
+        "remaining_day": daikin_api.rate_limits["remaining_day"],
+        "retry_after": daikin_api.rate_limits["retry_after"],
+        "ratelimit_reset": daikin_api.rate_limits["ratelimit_reset"],
+        "oauth2_token_valid": daikin_api.session.valid_token,
+        **daikin_api.metrics.values(),
+        **daikin_api.circuit_breaker.values(),
+    }
+
+
+def _combine(infos: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine the info of the accounts, limits and counts are summed, waits and averages aren't."""
+    if len(infos) == 1:
+        return infos[0]
+    combined = {}
+    for key in infos[0]:
+        values = [info[key] for info in infos if info[key] is not None]
+        if key == "oauth2_token_valid":
+            combined[key] = all(values)
+        elif key == "circuit_state":
+            combined[key] = min(values, key=CIRCUIT_STATES.index)
+        elif key in ("retry_after", "ratelimit_reset"):
+            combined[key] = max(values)
+        elif key.startswith("average_"):
+            combined[key] = round(sum(values) / len(values), 1) if values else None
+        else:
+            combined[key] = sum(values)
+    return combined
+
+
 async def system_health_info(hass: HomeAssistant) -> dict[str, Any]:
     """Get info for the info page."""
-    entries = hass.config_entries.async_entries(DOMAIN)
+    entries = hass.config_entries.async_loaded_entries(DOMAIN)
     if entries:
-        config_entry = entries[0]
-        onecta_data: OnectaRuntimeData = config_entry.runtime_data
-        daikin_api = onecta_data.daikin_api
-        return {
+        infos = []
+        for config_entry in entries:
+            onecta_data: OnectaRuntimeData = config_entry.runtime_data
+            infos.append(_account_info(onecta_data.daikin_api))
+        governor = async_get_governor(hass)
+        info = {
             "api_status": system_health.async_check_can_reach_url(hass, DAIKIN_API_URL + "/v1/gateway-devices"),
             "oauth2_status": system_health.async_check_can_reach_url(hass, OAUTH2_AUTHORIZE),
-            "max_minute": daikin_api.rate_limits["minute"],
-            "max_day": daikin_api.rate_limits["day"],
-            "remaining_minute": daikin_api.rate_limits["remaining_minutes"],
-            "remaining_day": daikin_api.rate_limits["remaining_day"],
-            "retry_after": daikin_api.rate_limits["retry_after"],
-            "ratelimit_reset": daikin_api.rate_limits["ratelimit_reset"],
-            "oauth2_token_valid": daikin_api.session.valid_token,
+            **_combine(infos),
         }
+        if len(entries) > 1:
+            info.update(governor.values())
+            info["account_budgets"] = ", ".join(
+                f"{title}: {values['remaining_day']}/{values['max_day']} remaining, {values['planned_polls']} polls planned"
+                for title, values in governor.account_values().items()
+            )
+        return info
@@ -9,6 +9,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_DEVICE_CLASS
 from homeassistant.const import CONF_ICON
 from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
+from homeassistant.const import Platform
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
@@ -20,8 +21,9 @@ from .const import ENTITY_CATEGORY
 from .const import TRANSLATION_KEY
 from .const import VALUE_SENSOR_MAPPING
 from .coordinator import OnectaDataUpdateCoordinator
-from .coordinator import OnectaRuntimeData
 from .device import DaikinOnectaDevice
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,33 +44,17 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Daikin update entities from a config entry."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
+    coordinator = config_entry.runtime_data.coordinator
 
-    entities: list[DaikinFirmwareUpdateEntity] = []
-    required_version_fields = {
-        "firmwareVersion",
-        "softwareVersion",
-    }
+    def create_update(device, plan: EntityPlan):
+        return DaikinFirmwareUpdateEntity(coordinator, device, device.management_point(plan.embedded_id), plan.management_point_type)
 
-    for device in onecta_data.devices.values():
-        management_points = device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            for field in required_version_fields:
-                if _get_value(management_point, field) is not None:
-                    entities.append(DaikinFirmwareUpdateEntity(coordinator, device, management_point, management_point_type))
-                    break
-
-    async_add_entities(entities)
+    async_add_planned_entities(hass, config_entry, Platform.UPDATE, create_update, async_add_entities)
 
 
 def _get_management_point(device: DaikinOnectaDevice, mp_type: str) -> dict | None:
     """Return the gateway management point dict, or None if absent."""
-    for mp in device.daikin_data.get("managementPoints", []):
-        if mp.get("managementPointType") == mp_type:
-            return mp
-    return None
+    return device.management_point_by_type(mp_type)
 
 
 class DaikinFirmwareUpdateEntity(CoordinatorEntity, UpdateEntity):
@@ -173,5 +159,7 @@ class DaikinFirmwareUpdateEntity(CoordinatorEntity, UpdateEntity):
         """Handle updated data from the coordinator."""
         mp = _get_management_point(self._device, self._management_point_type)
         if mp is not None:
+            if not self.coordinator.is_changed(self._device.id, mp["embeddedId"]):
+                return
             self._update_from_management_point(mp)
         self.async_write_ha_state()
@@ -8,6 +8,7 @@ from homeassistant.components.water_heater import WaterHeaterEntity
 from homeassistant.components.water_heater import WaterHeaterEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
+from homeassistant.const import Platform
 from homeassistant.const import UnitOfTemperature
 from homeassistant.core import callback
 from homeassistant.core import HomeAssistant
@@ -15,7 +16,8 @@ from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import OnectaRuntimeData
+from .discovery import async_add_planned_entities
+from .discovery import EntityPlan
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,25 +28,12 @@ async def async_setup_entry(
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up Daikin water tank entities."""
-    onecta_data: OnectaRuntimeData = config_entry.runtime_data
-    coordinator = onecta_data.coordinator
-    for device in onecta_data.devices.values():
-        supported_management_point_types = {
-            "domesticHotWaterTank",
-            "domesticHotWaterFlowThrough",
-        }
-        """ When the device has a domesticHotWaterTank we add a water heater """
-        management_points = device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            management_point_type = management_point["managementPointType"]
-            if management_point_type in supported_management_point_types:
-                async_add_entities([DaikinWaterTank(device, coordinator, management_point_type, management_point["embeddedId"])])
-            else:
-                _LOGGER.info(
-                    "Device '%s' '%s' is not a tank management point, ignoring as water heater",
-                    device.name,
-                    management_point_type,
-                )
+    coordinator = config_entry.runtime_data.coordinator
+
+    def create_water_heater(device, plan: EntityPlan):
+        return DaikinWaterTank(device, coordinator, plan.management_point_type, plan.embedded_id)
+
+    async_add_planned_entities(hass, config_entry, Platform.WATER_HEATER, create_water_heater, async_add_entities)
 
 
 class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
@@ -78,6 +67,18 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         self._attr_max_temp = self.get_max_temp()
         self._attr_operation_list = self.get_operation_list()
         self._attr_current_operation = self.get_current_operation()
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Device '%s' hot water tank mode '%s' of %s, temperature '%s' target '%s' (%s-%s), features %s",
+                self._device.name,
+                self._attr_current_operation,
+                self._attr_operation_list,
+                self._attr_current_temperature,
+                self._attr_target_temperature,
+                self._attr_min_temp,
+                self._attr_max_temp,
+                self._attr_supported_features,
+            )
 
     @property
     def available(self) -> bool:
@@ -85,18 +86,14 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        self.update_state()
-        self.async_write_ha_state()
+        if self.coordinator.is_changed(self._device.id, self._embedded_id):
+            self.update_state()
+            self.async_write_ha_state()
 
     @property
     def hotwatertank_data(self):
         # Find the management point for the hot water tank
-        hwd = None
-        management_points = self._device.daikin_data.get("managementPoints", [])
-        for management_point in management_points:
-            if management_point["managementPointType"] == self._management_point_type:
-                hwd = management_point
-        return hwd
+        return self._device.management_point_by_type(self._management_point_type)
 
     @property
     def domestic_hotwater_temperature(self):
@@ -130,14 +127,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         sensoryData = hwtd.get("sensoryData")
         if sensoryData is not None:
             ret = float(sensoryData["value"]["tankTemperature"]["value"])
-            _LOGGER.debug(
-                "Device '%s' hot water tank current_temperature '%s'",
-                self._device.name,
-                ret,
-            )
-        else:
-            _LOGGER.debug("Device '%s' doesn't provide a current temperature", self._device.name)
-
         return ret
 
     def get_target_temperature(self):
@@ -146,7 +135,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         dht = self.domestic_hotwater_temperature
         if dht is not None:
             ret = float(dht["value"])
-        _LOGGER.debug("Device '%s' hot water tank target_temperature '%s'", self._device.name, ret)
         return ret
 
     @property
@@ -156,6 +144,7 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         if dht is not None:
             """Return the optional device state attributes."""
             data = {"target_temp_step": float(dht["stepValue"])}
+        data.update(self.coordinator.stale_attributes())
         return data
 
     def get_min_temp(self):
@@ -164,11 +153,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         dht = self.domestic_hotwater_temperature
         if dht is not None:
             ret = float(dht["minValue"])
-        _LOGGER.debug(
-            "Device '%s' hot water tank minimum_temperature '%s'",
-            self._device.name,
-            ret,
-        )
         return ret
 
     def get_max_temp(self):
@@ -177,11 +161,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         dht = self.domestic_hotwater_temperature
         if dht is not None:
             ret = float(dht["maxValue"])
-        _LOGGER.debug(
-            "Device '%s' hot water tank maximum temperature '%s'",
-            self._device.name,
-            ret,
-        )
         return ret
 
     async def async_set_tank_temperature(self, value):
@@ -233,7 +212,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
             pwf = hwtd.get("powerfulMode")
             if pwf is not None and pwf["value"] == "on":
                 state = STATE_PERFORMANCE
-        _LOGGER.debug("Device '%s' hot water tank current mode '%s'", self._device.name, state)
         return state
 
     def get_operation_list(self):
@@ -244,7 +222,6 @@ class DaikinWaterTank(CoordinatorEntity, WaterHeaterEntity):
         if pwf is not None:
             if pwf["settable"] is True:
                 states += [STATE_PERFORMANCE]
-        _LOGGER.debug("Device '%s' hot water tank supports modes %s", self._device.name, states)
         return states
 
     async def async_set_operation_mode(self, operation_mode):
@@ -0,0 +1,46 @@
+"""Fixtures for the Daikin Onecta benchmarks.
+
+The benchmarks only run when DAIKIN_ONECTA_BENCHMARK is set, for example:
+
+    DAIKIN_ONECTA_BENCHMARK=1 pytest -p no:cacheprovider tests/benchmarks
+
+Every benchmark appends its results as one JSON object per line to the file given by
+DAIKIN_ONECTA_BENCHMARK_RESULTS (default benchmark_results.jsonl).
+"""
+import json
+import os
+import platform
+import time
+
+import pytest
+
+BENCHMARK_ENABLED = bool(os.environ.get("DAIKIN_ONECTA_BENCHMARK"))
+BENCHMARK_RESULTS = os.environ.get("DAIKIN_ONECTA_BENCHMARK_RESULTS", "benchmark_results.jsonl")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless they are enabled, they don't fit in the timeout of the unit tests."""
+    skip = pytest.mark.skip(reason="set DAIKIN_ONECTA_BENCHMARK to run the benchmarks")
+    for item in items:
+        if "benchmarks" in item.nodeid.split("/"):
+            if BENCHMARK_ENABLED:
+                item.add_marker(pytest.mark.timeout(0))
+            else:
+                item.add_marker(skip)
+
+
+@pytest.fixture(name="benchmark_record")
+def benchmark_record():
+    """Return a function which records the results of a benchmark."""
+
+    def record(benchmark: str, **results) -> None:
+        entry = {
+            "benchmark": benchmark,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            **results,
+        }
+        with open(BENCHMARK_RESULTS, "a") as results_file:
+            results_file.write(json.dumps(entry) + "\n")
+
+    return record
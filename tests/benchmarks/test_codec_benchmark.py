@@ -0,0 +1,35 @@
+"""Benchmark of the JSON decoding of the gateway-devices payloads."""
+import json
+import pathlib
+import time
+
+import pytest
+
+from custom_components.daikin_onecta import codec
+
+FIXTURES = sorted(pathlib.Path("tests/fixtures").glob("*.json"))
+ROUNDS = 50
+
+
+def _timed_decode(decode, payload: bytes) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        decode(payload)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.stem)
+def test_codec_benchmark(benchmark_record, fixture: pathlib.Path) -> None:
+    """Compare the decode time of the json module with the codec of the integration."""
+    payload = fixture.read_bytes()
+    assert codec.decode(payload) == json.loads(payload)
+
+    benchmark_record(
+        "codec",
+        fixture=fixture.stem,
+        payload_bytes=len(payload),
+        backend=codec.BACKEND,
+        stdlib_text_seconds=_timed_decode(lambda body: json.loads(body.decode()), payload),
+        stdlib_seconds=_timed_decode(codec.stdlib_decode, payload),
+        codec_seconds=_timed_decode(codec.decode, payload),
+    )
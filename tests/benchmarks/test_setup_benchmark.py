@@ -0,0 +1,75 @@
+"""Benchmark of the setup and refresh of the integration for fleets of devices."""
+import time
+import tracemalloc
+
+import homeassistant.helpers.entity_registry as er
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from ..emulator import async_setup_with_emulator
+from ..emulator import DaikinCloudEmulator
+from ..fleet import generate_fleet
+from ..fleet import mutate_fleet
+
+
+async def _timed_refresh(hass: HomeAssistant, coordinator) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+@pytest.mark.parametrize("device_count", [1, 10, 100, 1000])
+async def test_setup_benchmark(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+    entity_registry: er.EntityRegistry,
+    benchmark_record,
+    device_count: int,
+) -> None:
+    """Measure the entity discovery, memory and refresh cost for a fleet of devices."""
+    fleet = generate_fleet(device_count)
+    emulator = DaikinCloudEmulator(devices=fleet, minute_limit=1000, day_limit=100000)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    setup_seconds = time.perf_counter() - start
+    setup_memory, setup_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    entities = len(er.async_entries_for_config_entry(entity_registry, config_entry.entry_id))
+    assert len(config_entry.runtime_data.devices) == device_count
+    coordinator = config_entry.runtime_data.coordinator
+
+    # Refresh without any change in the data of the devices
+    unchanged_seconds, unchanged_peak = await _timed_refresh(hass, coordinator)
+
+    # Refresh with changed sensor values for 10% and for all devices
+    changed = mutate_fleet(emulator.devices, 0.1, seed=1)
+    partial_seconds, partial_peak = await _timed_refresh(hass, coordinator)
+    mutate_fleet(emulator.devices, 1.0, seed=2)
+    full_seconds, full_peak = await _timed_refresh(hass, coordinator)
+
+    benchmark_record(
+        "setup",
+        devices=device_count,
+        entities=entities,
+        setup_seconds=setup_seconds,
+        setup_memory_bytes=setup_memory,
+        setup_peak_bytes=setup_peak,
+        refresh_unchanged_seconds=unchanged_seconds,
+        refresh_unchanged_peak_bytes=unchanged_peak,
+        refresh_partial_devices=changed,
+        refresh_partial_seconds=partial_seconds,
+        refresh_partial_peak_bytes=partial_peak,
+        refresh_full_seconds=full_seconds,
+        refresh_full_peak_bytes=full_peak,
+    )
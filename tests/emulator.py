@@ -0,0 +1,213 @@
+"""In-process emulator of the Daikin Onecta cloud.
+
+The emulator is registered as side effect on the AiohttpClientMocker and serves
+/v1/gateway-devices, /v1/gateway-devices/{id} and the management point
+PATCH/POST/PUT endpoints from a state seeded from the fixtures. Writes are applied
+to that state, responses carry the X-RateLimit headers of the Daikin cloud and
+latency, errors and the stale reads right after a write can be injected.
+"""
+import asyncio
+import copy
+import json
+import re
+import time
+from http import HTTPStatus
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMockResponse
+
+from .conftest import FAKE_ACCESS_TOKEN
+from .conftest import load_fixture_json
+
+DEVICE_PATH = r"/v1/gateway-devices/(?P<device>[^/]+)/management-points/(?P<mp>[^/]+)"
+GATEWAY_DEVICES = re.compile(r"/v1/gateway-devices$")
+GATEWAY_DEVICE = re.compile(r"/v1/gateway-devices/(?P<device>[^/]+)$")
+CHARACTERISTIC = re.compile(DEVICE_PATH + r"/characteristics/(?P<characteristic>[^/]+)$")
+HOLIDAY_MODE = re.compile(DEVICE_PATH + r"/holiday-mode$")
+SCHEDULE = re.compile(DEVICE_PATH + r"/schedule/(?P<mode>[^/]+)/current$")
+FIRMWARE = re.compile(DEVICE_PATH + r"/firmware/(?P<firmware>[^/]+)$")
+
+
+class DaikinCloudEmulator:
+    """Emulate the Daikin Onecta cloud for one account."""
+
+    def __init__(
+        self,
+        *fixtures: str,
+        devices: list | None = None,
+        minute_limit: int = 20,
+        day_limit: int = 200,
+        latency: float = 0.0,
+        stale_window: float = 0.0,
+    ) -> None:
+        """Initialize the emulator with the devices of the given fixtures or device payloads."""
+        self.devices = copy.deepcopy(devices) if devices is not None else []
+        for fixture in fixtures:
+            self.devices.extend(load_fixture_json(fixture))
+        self.minute_limit = minute_limit
+        self.day_limit = day_limit
+        self.remaining_day = day_limit
+        self.latency = latency
+        self.stale_window = stale_window
+        # Queue of injected failures, each an http status or an exception
+        self.errors = []
+        # Log of the handled requests as (method, path, status)
+        self.requests = []
+        self._minute_start = time.monotonic()
+        self._remaining_minute = minute_limit
+        self._stale_devices = None
+        self._stale_until = 0.0
+
+    def register(self, aioclient_mock: AiohttpClientMocker) -> None:
+        """Route the Daikin cloud requests of the mocker to this emulator."""
+        aioclient_mock.get(GATEWAY_DEVICES, side_effect=self.handle)
+        aioclient_mock.get(GATEWAY_DEVICE, side_effect=self.handle)
+        aioclient_mock.patch(CHARACTERISTIC, side_effect=self.handle)
+        aioclient_mock.post(HOLIDAY_MODE, side_effect=self.handle)
+        aioclient_mock.put(SCHEDULE, side_effect=self.handle)
+        aioclient_mock.put(FIRMWARE, side_effect=self.handle)
+
+    def inject_error(self, status: int | None = None, exc: Exception | None = None) -> None:
+        """Let the next request fail with the given http status or exception."""
+        self.errors.append(exc if exc is not None else status)
+
+    def management_point(self, device_id: str, embedded_id: str) -> dict | None:
+        """Return the current state of a management point."""
+        for device in self.devices:
+            if device["id"] == device_id:
+                for management_point in device["managementPoints"]:
+                    if management_point["embeddedId"] == embedded_id:
+                        return management_point
+        return None
+
+    def _headers(self, now: float) -> dict:
+        return {
+            "X-RateLimit-Limit-minute": str(self.minute_limit),
+            "X-RateLimit-Limit-day": str(self.day_limit),
+            "X-RateLimit-Remaining-minute": str(self._remaining_minute),
+            "X-RateLimit-Remaining-day": str(self.remaining_day),
+            "ratelimit-reset": str(max(int(60 - (now - self._minute_start)), 0)),
+        }
+
+    def _response(self, method, url, status, now, json_data=None, headers=None) -> AiohttpClientMockResponse:
+        self.requests.append((method.upper(), url.path, status))
+        return AiohttpClientMockResponse(method, url, status=status, json=json_data, headers={**self._headers(now), **(headers or {})})
+
+    async def handle(self, method, url, data) -> AiohttpClientMockResponse:
+        """Handle one request of the AiohttpClientMocker."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        now = time.monotonic()
+        if now - self._minute_start >= 60:
+            self._minute_start = now
+            self._remaining_minute = self.minute_limit
+
+        if self.errors:
+            error = self.errors.pop(0)
+            if isinstance(error, Exception):
+                self.requests.append((method.upper(), url.path, None))
+                return AiohttpClientMockResponse(method, url, exc=error)
+            return self._response(method, url, error, now)
+
+        if self._remaining_minute == 0 or self.remaining_day == 0:
+            retry_after = int(60 - (now - self._minute_start)) if self.remaining_day else 3600
+            return self._response(method, url, HTTPStatus.TOO_MANY_REQUESTS, now, headers={"retry-after": str(retry_after)})
+
+        self._remaining_minute -= 1
+        self.remaining_day -= 1
+
+        if method.upper() == "GET":
+            devices = self.devices
+            if self._stale_devices is not None:
+                if now < self._stale_until:
+                    devices = self._stale_devices
+                else:
+                    self._stale_devices = None
+            match = GATEWAY_DEVICE.search(url.path)
+            if match is not None:
+                device = next((device for device in devices if device["id"] == match["device"]), None)
+                if device is None:
+                    return self._response(method, url, HTTPStatus.NOT_FOUND, now)
+                return self._response(method, url, HTTPStatus.OK, now, json_data=device)
+            return self._response(method, url, HTTPStatus.OK, now, json_data=devices)
+
+        status = self._apply_write(method.upper(), url.path, json.loads(data) if data else None, now)
+        return self._response(method, url, status, now)
+
+    def _apply_write(self, method: str, path: str, body: dict | None, now: float) -> int:
+        for pattern in (CHARACTERISTIC, HOLIDAY_MODE, SCHEDULE, FIRMWARE):
+            match = pattern.search(path)
+            if match is not None:
+                break
+        else:
+            return HTTPStatus.NOT_FOUND
+
+        management_point = self.management_point(match["device"], match["mp"])
+        if management_point is None:
+            return HTTPStatus.NOT_FOUND
+
+        if self.stale_window:
+            # Reads right after a write return the settings from before the write
+            if self._stale_devices is None:
+                self._stale_devices = copy.deepcopy(self.devices)
+            self._stale_until = now + self.stale_window
+
+        if pattern is CHARACTERISTIC:
+            characteristic = management_point.get(match["characteristic"])
+            if characteristic is None or not characteristic.get("settable", False):
+                return HTTPStatus.BAD_REQUEST
+            if "path" in body:
+                node = characteristic["value"]
+                for segment in body["path"].strip("/").split("/"):
+                    node = node[segment]
+                node["value"] = body["value"]
+            else:
+                characteristic["value"] = body["value"]
+        elif pattern is HOLIDAY_MODE:
+            management_point["holidayMode"]["value"] = body
+        elif pattern is SCHEDULE:
+            mode = management_point["schedule"]["value"]["modes"][match["mode"]]
+            mode["currentSchedule"]["value"] = body["scheduleId"]
+            mode["enabled"]["value"] = body["enabled"]
+        elif pattern is FIRMWARE:
+            management_point["firmwareUpdateStatus"] = {"settable": False, "value": "in-progress"}
+
+        return HTTPStatus.NO_CONTENT
+
+
+async def async_setup_with_emulator(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    config_entry: MockConfigEntry,
+    emulator: DaikinCloudEmulator,
+) -> None:
+    """Set up the integration against the emulator.
+
+    The patches only cover the setup, the entry gets a token which doesn't expire during
+    the test so that the later requests don't refresh it.
+    """
+    emulator.register(aioclient_mock)
+    token = {**config_entry.data["token"], "access_token": FAKE_ACCESS_TOKEN, "expires_at": time.time() + 86400}
+    hass.config_entries.async_update_entry(config_entry, data={**config_entry.data, "token": token})
+    with (
+        patch(
+            "homeassistant.helpers.config_entry_oauth2_flow.async_get_config_entry_implementation",
+        ),
+        patch(
+            "homeassistant.helpers.config_entry_oauth2_flow.OAuth2Session.valid_token",
+            False,
+        ),
+        patch(
+            "homeassistant.helpers.config_entry_oauth2_flow.OAuth2Session.async_ensure_token_valid",
+        ),
+        patch(
+            "homeassistant.helpers.config_entry_oauth2_flow.OAuth2Session.token",
+            {"access_token": FAKE_ACCESS_TOKEN},
+        ),
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
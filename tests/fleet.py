@@ -0,0 +1,47 @@
+"""Generator of synthetic fleets of Daikin devices.
+
+A fleet is a list of gateway device payloads as returned by /v1/gateway-devices,
+created by cloning the devices of the fixtures with a unique id and name.
+"""
+import copy
+import random
+import uuid
+
+from .conftest import load_fixture_json
+
+FLEET_NAMESPACE = uuid.UUID("5d1c7a52-8f0e-4c7b-9a77-2b5bb1d0a6c4")
+FLEET_FIXTURES = ("altherma", "climate_floorheatingairflow")
+
+
+def generate_fleet(count: int, fixtures: tuple[str, ...] = FLEET_FIXTURES, seed: int = 0) -> list:
+    """Return the payload of a fleet of count devices cloned from the devices of the fixtures."""
+    templates = [device for fixture in fixtures for device in load_fixture_json(fixture)]
+    fleet = []
+    for index in range(count):
+        device = copy.deepcopy(templates[index % len(templates)])
+        device["id"] = str(uuid.uuid5(FLEET_NAMESPACE, f"{device['id']}-{index}"))
+        for management_point in device["managementPoints"]:
+            name = management_point.get("name")
+            if name is not None and name.get("value"):
+                name["value"] = f"{name['value']} {index}"
+        fleet.append(device)
+    mutate_fleet(fleet, 1.0, seed)
+    return fleet
+
+
+def mutate_fleet(fleet: list, fraction: float, seed: int = 0) -> int:
+    """Change the sensor values of a fraction of the devices in place, return the number of changed devices."""
+    rng = random.Random(seed)
+    changed = 0
+    for device in fleet:
+        if rng.random() >= fraction:
+            continue
+        changed += 1
+        for management_point in device["managementPoints"]:
+            sensory_data = management_point.get("sensoryData")
+            if sensory_data is None:
+                continue
+            for sensor in sensory_data["value"].values():
+                if isinstance(sensor.get("value"), (int, float)) and not isinstance(sensor["value"], bool):
+                    sensor["value"] = round(sensor["value"] + rng.uniform(-1, 1), 1)
+    return changed
@@ -0,0 +1,93 @@
+"""Tests for the circuit breaker of the Daikin cloud requests."""
+import time
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from .emulator import async_setup_with_emulator
+from .emulator import DaikinCloudEmulator
+from custom_components.daikin_onecta.circuit_breaker import CircuitBreaker
+from custom_components.daikin_onecta.circuit_breaker import CircuitOpenError
+from custom_components.daikin_onecta.circuit_breaker import FAILURE_THRESHOLD
+from custom_components.daikin_onecta.circuit_breaker import MAX_RESET_TIMEOUT
+from custom_components.daikin_onecta.circuit_breaker import RESET_TIMEOUT
+from custom_components.daikin_onecta.circuit_breaker import STATE_CLOSED
+from custom_components.daikin_onecta.circuit_breaker import STATE_HALF_OPEN
+from custom_components.daikin_onecta.circuit_breaker import STATE_OPEN
+from custom_components.daikin_onecta.coordinator import ATTR_STALE
+
+
+def test_circuit_breaker() -> None:
+    """The circuit opens after consecutive failures and is closed again by a successful probe."""
+    breaker = CircuitBreaker()
+    with patch("custom_components.daikin_onecta.circuit_breaker.time.monotonic", return_value=1000):
+        for _ in range(FAILURE_THRESHOLD):
+            breaker.before_request()
+            breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+
+    with patch("custom_components.daikin_onecta.circuit_breaker.time.monotonic", return_value=1000 + RESET_TIMEOUT):
+        # A single probe is let through, a failed probe doubles the reset timeout
+        probe = breaker.before_request()
+        assert probe is not None
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+        # A rejected request doesn't end the probe
+        breaker.release(None)
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        breaker.record_failure()
+        breaker.release(probe)
+        assert breaker.state == STATE_OPEN
+
+    with (
+        patch("custom_components.daikin_onecta.circuit_breaker.time.monotonic", return_value=1000 + 2 * RESET_TIMEOUT),
+        pytest.raises(CircuitOpenError),
+    ):
+        breaker.check()
+
+    with patch("custom_components.daikin_onecta.circuit_breaker.time.monotonic", return_value=1000 + 3 * RESET_TIMEOUT):
+        probe = breaker.before_request()
+        breaker.record_success()
+        breaker.release(probe)
+        assert breaker.before_request() is None
+
+    assert breaker.values() == {"circuit_state": STATE_CLOSED, "circuit_failures": 0, "circuit_trips": 2}
+
+
+async def test_requests_fail_fast_while_cloud_is_down(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """No requests are sent to the cloud while the circuit is open, entities keep their state marked as stale."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    coordinator = config_entry.runtime_data.coordinator
+    state = hass.states.get("water_heater.altherma").state
+
+    for _ in range(FAILURE_THRESHOLD):
+        emulator.inject_error(status=503)
+        await coordinator.async_refresh()
+    requests = len(emulator.requests)
+
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert len(emulator.requests) == requests
+    assert hass.states.get("sensor.altherma_gateway_cloud_circuit").state == STATE_OPEN
+    assert hass.states.get("water_heater.altherma").state == state
+    assert hass.states.get("water_heater.altherma").attributes[ATTR_STALE] is True
+
+    # The first request after the reset timeout closes the circuit, the entities drop the stale marker
+    with patch("custom_components.daikin_onecta.circuit_breaker.time.monotonic", return_value=time.monotonic() + MAX_RESET_TIMEOUT):
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert coordinator.last_update_success
+    assert hass.states.get("sensor.altherma_gateway_cloud_circuit").state == STATE_CLOSED
+    assert ATTR_STALE not in hass.states.get("water_heater.altherma").attributes
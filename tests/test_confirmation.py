@@ -0,0 +1,80 @@
+"""Tests for the confirmation of the writes to the Daikin cloud."""
+import json
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from .emulator import async_setup_with_emulator
+from .emulator import DaikinCloudEmulator
+from custom_components.daikin_onecta.confirmation import DEFAULT_CONFIRM_DELAY
+from custom_components.daikin_onecta.confirmation import FRESH_DECAY
+from custom_components.daikin_onecta.confirmation import STALE_BACKOFF
+from custom_components.daikin_onecta.confirmation import WriteConfirmation
+
+DEVICE_ID = "1ece521b-5401-4a42-acce-6f76fba246aa"
+ON_OFF_URL = f"/v1/gateway-devices/{DEVICE_ID}/management-points/climateControl/characteristics/onOffMode"
+TANK_TEMPERATURE_URL = f"/v1/gateway-devices/{DEVICE_ID}/management-points/domesticHotWaterTank/characteristics/temperatureControl"
+TANK_TEMPERATURE_BODY = json.dumps({"value": 52, "path": "/operationModes/heating/setpoints/domesticHotWaterTemperature"})
+
+
+def payload(on_off: str) -> list:
+    return [{"id": DEVICE_ID, "managementPoints": [{"embeddedId": "climateControl", "onOffMode": {"value": on_off}}]}]
+
+
+def test_write_confirmation() -> None:
+    """A stale read moves the confirmation later, a write which isn't confirmed in time is given up on."""
+    confirmation = WriteConfirmation({DEVICE_ID: "dx4"}.get)
+    with patch("custom_components.daikin_onecta.confirmation.time.monotonic", return_value=1000):
+        confirmation.add("PATCH", ON_OFF_URL, '{"value": "on"}')
+        assert confirmation.confirm_at(30) == 1000 + DEFAULT_CONFIRM_DELAY
+        assert confirmation.confirm_at(5) == 1005
+
+    with patch("custom_components.daikin_onecta.confirmation.time.monotonic", return_value=1000 + DEFAULT_CONFIRM_DELAY):
+        assert confirmation.reconcile(payload("off"), 30) == ({(DEVICE_ID, "climateControl", "onOffMode")}, set())
+    assert confirmation.window("dx4").delay == DEFAULT_CONFIRM_DELAY * STALE_BACKOFF
+
+    with patch("custom_components.daikin_onecta.confirmation.time.monotonic", return_value=1000 + 20):
+        assert confirmation.reconcile(payload("on"), 30) == (set(), {(DEVICE_ID, "climateControl", "onOffMode")})
+    assert confirmation.window("dx4").delay == DEFAULT_CONFIRM_DELAY * STALE_BACKOFF * FRESH_DECAY
+    assert confirmation.confirm_at(30) is None
+
+    with patch("custom_components.daikin_onecta.confirmation.time.monotonic", return_value=2000):
+        confirmation.add("PATCH", ON_OFF_URL, '{"value": "on"}')
+    with patch("custom_components.daikin_onecta.confirmation.time.monotonic", return_value=2030):
+        assert confirmation.reconcile(payload("off"), 30) == (set(), {(DEVICE_ID, "climateControl", "onOffMode")})
+    assert confirmation.values() == {
+        "pending_writes": 0,
+        "expired": 1,
+        "staleness_windows": {
+            "dx4": {"confirm_delay": 13.5, "confirmed": 1, "stale": 1, "median_confirmed_age": 20, "max_stale_age": DEFAULT_CONFIRM_DELAY},
+        },
+    }
+    # Other models keep the default window
+    assert confirmation.window("dx23").delay == DEFAULT_CONFIRM_DELAY
+
+
+async def test_poll_deferred_until_confirmation(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """A poll right after a write is skipped, the confirmation poll updates the entities."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+    coordinator = config_entry.runtime_data.coordinator
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+    requests = len(emulator.requests)
+    await coordinator.async_refresh()
+    assert len(emulator.requests) == requests
+
+    # Move the write back to the moment the cloud is expected to return the written value
+    coordinator.confirmation.pending[0].written_at -= coordinator.confirmation.window("Altherma").delay
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert len(emulator.requests) == requests + 1
+    assert coordinator.confirmation.window("Altherma").confirmed == 1
+    assert hass.states.get("water_heater.altherma").attributes["temperature"] == 52
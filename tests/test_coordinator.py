@@ -2,13 +2,17 @@
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from .conftest import load_fixture_json
+
 from custom_components.daikin_onecta.const import DOMAIN
 from custom_components.daikin_onecta.coordinator import OnectaDataUpdateCoordinator
 from custom_components.daikin_onecta.coordinator import OnectaRuntimeData
@@ -25,7 +29,16 @@ def mock_hass():
 def mock_config_entry() -> MockConfigEntry:
     """Mock a config entry."""
     entry = MockConfigEntry(domain=DOMAIN, title="daikin_onecta", unique_id="12345")
-    entry.runtime_data = OnectaRuntimeData(daikin_api=MagicMock(), coordinator=MagicMock(), devices={})
+    daikin_api = MagicMock()
+    daikin_api.rate_limits = {
+        "minute": 0,
+        "day": 0,
+        "remaining_minutes": 0,
+        "remaining_day": 0,
+        "retry_after": 0,
+        "ratelimit_reset": 0,
+    }
+    entry.runtime_data = OnectaRuntimeData(daikin_api=daikin_api, coordinator=MagicMock(), devices={})
     return entry
 
 
@@ -122,3 +135,75 @@ class TestOnectaDataUpdateCoordinator:
             expected = timedelta(seconds=3060)  # 3000 + 60
             result = coordinator.determine_update_interval(mock_hass)
             assert result == expected
+
+    def test_is_changed(self, coordinator):
+        """Entities are only notified about the paths they depend on."""
+        # Before the first update everything is considered changed
+        assert coordinator.is_changed("device", "climateControl", "sensoryData")
+
+        coordinator._changes = {"device": {("climateControl", "sensoryData")}}
+        assert coordinator.is_changed("device")
+        assert coordinator.is_changed("device", "climateControl")
+        assert coordinator.is_changed("device", "climateControl", "sensoryData")
+        assert not coordinator.is_changed("device", "climateControl", "onOffMode")
+        assert not coordinator.is_changed("device", "domesticHotWaterTank")
+        assert not coordinator.is_changed("other")
+
+        coordinator._changes = {"device": {(None, "isCloudConnectionUp")}}
+        assert coordinator.is_changed("device", "climateControl", "onOffMode")
+
+        coordinator._changes = {"device": {("domesticHotWaterTank", None)}}
+        assert coordinator.is_changed("device", "domesticHotWaterTank", "onOffMode")
+
+        # The cloud changes the timestamp on each poll, that doesn't wake any entity
+        json_data = load_fixture_json("dry")
+        coordinator.process_json_data(json_data)
+        for device_data in json_data:
+            device_data["timestamp"] = "2030-01-01T00:00:00.000Z"
+        coordinator._changes = coordinator.process_json_data(json_data)
+        device_id = json_data[0]["id"]
+        assert coordinator._changes == {}
+        assert not coordinator.is_changed(device_id)
+        assert not coordinator.is_changed(device_id, "climateControl", "onOffMode")
+
+    async def test_load_cache(self, coordinator, mock_config_entry):
+        """A recent cached payload creates the devices without a cloud request."""
+        json_data = load_fixture_json("altherma")
+        coordinator._store = MagicMock(async_load=AsyncMock(return_value={"timestamp": dt_util.utcnow().isoformat(), "json_data": json_data}))
+
+        assert await coordinator.async_load_cache()
+        assert list(mock_config_entry.runtime_data.devices) == [device_data["id"] for device_data in json_data]
+        mock_config_entry.runtime_data.daikin_api.getCloudDeviceDetails.assert_not_called()
+
+    async def test_load_cache_expired(self, coordinator, mock_config_entry):
+        """A cached payload older than the maximum age is ignored."""
+        timestamp = dt_util.utcnow() - timedelta(hours=25)
+        coordinator._store = MagicMock(async_load=AsyncMock(return_value={"timestamp": timestamp.isoformat(), "json_data": load_fixture_json("altherma")}))
+
+        assert not await coordinator.async_load_cache()
+        assert mock_config_entry.runtime_data.devices == {}
+
+    @patch("custom_components.daikin_onecta.coordinator.datetime")
+    def test_rate_limit_budget(self, mock_datetime, coordinator, mock_hass, mock_config_entry):
+        """The remaining daily calls minus the command reserve are spread until the reset."""
+        mock_now = datetime(2023, 1, 1, 10, 0, 0)
+        mock_datetime.now.return_value = mock_now
+        mock_datetime.strptime.side_effect = datetime.strptime
+
+        rate_limits = mock_config_entry.runtime_data.daikin_api.rate_limits
+        rate_limits.update({"day": 200, "remaining_day": 30})
+
+        with patch.object(coordinator.budget, "seconds_until_reset", return_value=36000):
+            # 30 remaining with 20 reserved leaves 10 polls in 10 hours
+            assert coordinator.budget.planned_polls == 10
+            assert coordinator.budget.command_reserve == 20
+            assert coordinator.determine_update_interval(mock_hass) == timedelta(hours=1)
+
+            # Plenty of calls left, the configured interval is used
+            rate_limits["remaining_day"] = 180
+            assert coordinator.determine_update_interval(mock_hass) == timedelta(minutes=10)
+
+            # Only the reserve is left, wait until the reset
+            rate_limits["remaining_day"] = 15
+            assert coordinator.budget.command_reserve == 15
+            assert coordinator.determine_update_interval(mock_hass) == timedelta(seconds=36060)
@@ -1,20 +1,25 @@
 """Tests for the Daikin Onecta API client."""
-import asyncio
+import time
+from datetime import timedelta
 from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 from aiohttp import ClientConnectionError
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.daikin_onecta.daikin_api import DaikinApi
+from custom_components.daikin_onecta.daikin_api import TOKEN_REFRESH_MARGIN
+from custom_components.daikin_onecta.daikin_api import TOKEN_REFRESH_RETRY
 
 
 @pytest.mark.parametrize(
     "error",
-    [ClientConnectionError("network unavailable"), asyncio.TimeoutError()],
+    [ClientConnectionError("network unavailable"), TimeoutError()],
 )
 async def test_get_device_details_propagates_network_errors(
     hass: HomeAssistant,
@@ -39,3 +44,38 @@ async def test_get_device_details_propagates_network_errors(
     ):
         api = DaikinApi(hass, config_entry, MagicMock())
         await api.getCloudDeviceDetails()
+
+
+async def test_token_refreshed_ahead_of_expiry(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """The access token is refreshed in the background before it expires."""
+    expires_at = time.time() + 3600
+    hass.config_entries.async_update_entry(config_entry, data={**config_entry.data, "token": {**config_entry.data["token"], "expires_at": expires_at}})
+    implementation = MagicMock()
+    implementation.async_refresh_token = AsyncMock(
+        side_effect=[
+            ClientConnectionError("idp unavailable"),
+            {**config_entry.data["token"], "access_token": "new-token", "expires_at": expires_at + 3600},
+        ]
+    )
+    api = DaikinApi(hass, config_entry, implementation)
+
+    with patch("custom_components.daikin_onecta.daikin_api.random.uniform", return_value=0):
+        stop = api.async_start_token_refresher()
+
+        freezer.tick(timedelta(seconds=3600 - TOKEN_REFRESH_MARGIN + 1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert api.metrics.token_refresh_failures == 1
+
+        freezer.tick(timedelta(seconds=TOKEN_REFRESH_RETRY + 1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    assert implementation.async_refresh_token.await_count == 2
+    assert config_entry.data["token"]["access_token"] == "new-token"
+    assert api.metrics.values()["token_refreshes"] == 1
+    stop()
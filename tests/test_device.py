@@ -0,0 +1,124 @@
+"""Tests for the Daikin Onecta device."""
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from .conftest import load_fixture_json
+from custom_components.daikin_onecta.device import DaikinOnectaDevice
+
+
+def test_management_point_index() -> None:
+    """Management points can be looked up by embeddedId and by type."""
+    device = DaikinOnectaDevice(load_fixture_json("altherma")[0], MagicMock())
+
+    for management_point in device.management_points:
+        assert device.management_point(management_point["embeddedId"]) is management_point
+
+    assert device.management_point_by_type("domesticHotWaterTank")["embeddedId"] == "domesticHotWaterTank"
+    assert device.management_point("unknown") is None
+    assert device.management_point_by_type("unknown") is None
+
+
+def test_management_point_index_follows_new_data() -> None:
+    """The index is rebuilt when the device receives new data."""
+    data = load_fixture_json("altherma")[0]
+    device = DaikinOnectaDevice(data, MagicMock())
+
+    new_data = load_fixture_json("altherma")[0]
+    new_data["managementPoints"] = [mp for mp in new_data["managementPoints"] if mp["managementPointType"] != "domesticHotWaterTank"]
+    device.setJsonData(new_data)
+
+    assert device.management_point_by_type("domesticHotWaterTank") is None
+    # The management points that are still present keep their identity
+    assert device.management_point_by_type("climateControl") is data["managementPoints"][1]
+
+
+def test_set_json_data_returns_changed_paths() -> None:
+    """Only the characteristics that differ are reported as changed."""
+    device = DaikinOnectaDevice(load_fixture_json("altherma")[0], MagicMock())
+
+    assert device.setJsonData(load_fixture_json("altherma")[0]) == set()
+
+    new_data = load_fixture_json("altherma")[0]
+    new_data["isCloudConnectionUp"]["value"] = False
+    tank = next(mp for mp in new_data["managementPoints"] if mp["embeddedId"] == "domesticHotWaterTank")
+    tank["sensoryData"]["value"]["tankTemperature"]["value"] = 12
+    new_data["managementPoints"] = [mp for mp in new_data["managementPoints"] if mp["embeddedId"] != "userInterface"]
+
+    assert device.setJsonData(new_data) == {
+        (None, "isCloudConnectionUp"),
+        ("domesticHotWaterTank", "sensoryData"),
+        ("userInterface", None),
+    }
+
+
+def test_set_json_data_merges_in_place() -> None:
+    """Unchanged subtrees keep their identity, only the changed leaves are replaced."""
+    data = load_fixture_json("altherma")[0]
+    device = DaikinOnectaDevice(data, MagicMock())
+    tank = device.management_point("domesticHotWaterTank")
+    sensory_data = tank["sensoryData"]["value"]
+    temperature_control = tank["temperatureControl"]
+    gateway = device.management_point("gateway")
+
+    new_data = load_fixture_json("altherma")[0]
+    new_tank = next(mp for mp in new_data["managementPoints"] if mp["embeddedId"] == "domesticHotWaterTank")
+    new_tank["sensoryData"]["value"]["tankTemperature"]["value"] = 12
+    new_data["managementPoints"].append({"embeddedId": "extra", "managementPointType": "extra"})
+
+    assert device.setJsonData(new_data) == {("domesticHotWaterTank", "sensoryData"), ("extra", None)}
+    assert device.daikin_data is data
+    assert device.management_point("domesticHotWaterTank") is tank
+    assert device.management_point("gateway") is gateway
+    assert tank["sensoryData"]["value"] is sensory_data
+    assert tank["temperatureControl"] is temperature_control
+    assert sensory_data["tankTemperature"]["value"] == 12
+    assert device.management_point("extra") is not None
+    assert device.daikin_data == new_data
+
+
+async def test_patch_coalesces_writes() -> None:
+    """Writes to the same characteristic within the window result in one PATCH with the last value."""
+    api = MagicMock()
+    api.patch_coalesce_window = 0.05
+    api.doBearerRequest = AsyncMock(return_value=True)
+    device = DaikinOnectaDevice(load_fixture_json("altherma")[0], api)
+
+    path = "/operationModes/heating/setpoints/domesticHotWaterTemperature"
+    results = await asyncio.gather(
+        device.patch(device.id, "domesticHotWaterTank", "temperatureControl", path, 50),
+        device.patch(device.id, "domesticHotWaterTank", "temperatureControl", path, 51),
+        device.patch(device.id, "domesticHotWaterTank", "temperatureControl", path, 52),
+        device.patch(device.id, "domesticHotWaterTank", "onOffMode", "", "on"),
+    )
+
+    assert results == [True, True, True, True]
+    assert api.doBearerRequest.call_count == 2
+    bodies = [call.args[2] for call in api.doBearerRequest.call_args_list]
+    assert f'{{"value": 52, "path": "{path}"}}' in bodies
+    assert '{"value": "on"}' in bodies
+
+
+def test_apply_write_and_protected_merge() -> None:
+    """An accepted write is applied to the device data and survives a stale payload, the payload isn't changed."""
+    data = load_fixture_json("altherma")[0]
+    device = DaikinOnectaDevice(data, MagicMock())
+    path = "/operationModes/heating/setpoints/domesticHotWaterTemperature"
+
+    def tank_temperature(device_data):
+        tank = next(mp for mp in device_data["managementPoints"] if mp["embeddedId"] == "domesticHotWaterTank")
+        return tank["temperatureControl"]["value"]["operationModes"]["heating"]["setpoints"]["domesticHotWaterTemperature"]["value"]
+
+    stale_data = load_fixture_json("altherma")[0]
+    device.setJsonData(stale_data)
+    device.apply_write("domesticHotWaterTank", "temperatureControl", path, 52)
+    assert tank_temperature(device.daikin_data) == 52
+    assert tank_temperature(stale_data) == 48
+
+    tank = next(mp for mp in stale_data["managementPoints"] if mp["embeddedId"] == "domesticHotWaterTank")
+    tank["sensoryData"]["value"]["tankTemperature"]["value"] = 12
+    assert device.setJsonData(stale_data, protected={("domesticHotWaterTank", "temperatureControl")}) == {("domesticHotWaterTank", "sensoryData")}
+    assert tank_temperature(device.daikin_data) == 52
+
+    assert device.setJsonData(stale_data) == {("domesticHotWaterTank", "temperatureControl")}
+    assert tank_temperature(device.daikin_data) == 48
@@ -0,0 +1,42 @@
+"""Tests for the Daikin Onecta entity discovery."""
+from unittest.mock import MagicMock
+
+from homeassistant.const import Platform
+
+from .conftest import load_fixture_json
+from custom_components.daikin_onecta.device import DaikinOnectaDevice
+from custom_components.daikin_onecta.discovery import discover_entities
+from custom_components.daikin_onecta.discovery import KIND_CLIMATE
+from custom_components.daikin_onecta.discovery import KIND_TANK
+
+
+def test_discover_entities() -> None:
+    """Each characteristic is classified once into the plan of its platform."""
+    device = DaikinOnectaDevice(load_fixture_json("altherma")[0], MagicMock())
+    plans = discover_entities(device)
+
+    # onOffMode and powerfulMode of the tank and climate control are handled by those entities
+    assert not [plan for plan in plans if plan.platform == Platform.SWITCH]
+    binary_sensors = {(plan.embedded_id, plan.value) for plan in plans if plan.platform == Platform.BINARY_SENSOR}
+    assert ("domesticHotWaterTank", "isPowerfulModeActive") in binary_sensors
+    assert not [plan for plan in plans if plan.platform == Platform.SENSOR and plan.value == "operationMode"]
+
+    climates = [plan for plan in plans if plan.kind == KIND_CLIMATE]
+    assert [plan.value for plan in climates] == ["roomTemperature", "leavingWaterTemperature", "leavingWaterOffset"]
+    assert {plan.embedded_id for plan in climates} == {"climateControlMainZone"}
+    assert [plan.embedded_id for plan in plans if plan.kind == KIND_TANK] == ["domesticHotWaterTank"]
+    assert len([plan for plan in plans if plan.platform == Platform.UPDATE]) == 4
+    assert len([plan for plan in plans if plan.platform == Platform.BUTTON]) == 1
+
+
+def test_discover_entities_switch() -> None:
+    """A settable on/off characteristic not handled by a climate or tank entity is a switch."""
+    data = load_fixture_json("altherma")[0]
+    for management_point in data["managementPoints"]:
+        if management_point["embeddedId"] == "domesticHotWaterTank":
+            management_point["managementPointType"] = "hotWater"
+    plans = discover_entities(DaikinOnectaDevice(data, MagicMock()))
+
+    switches = {plan.value for plan in plans if plan.platform == Platform.SWITCH}
+    assert switches == {"onOffMode", "powerfulMode"}
+    assert not [plan for plan in plans if plan.kind == KIND_TANK]
@@ -0,0 +1,319 @@
+"""Tests using the Daikin cloud emulator."""
+import copy
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from aiohttp import ClientConnectionError
+from homeassistant.components.climate.const import HVACMode
+from homeassistant.components.water_heater import ATTR_TEMPERATURE
+from homeassistant.components.water_heater import DOMAIN as WATER_HEATER_DOMAIN
+from homeassistant.components.water_heater import SERVICE_SET_TEMPERATURE
+from homeassistant.components.water_heater import STATE_OFF
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from .conftest import load_fixture_json
+from .emulator import async_setup_with_emulator
+from .emulator import DaikinCloudEmulator
+from custom_components.daikin_onecta.confirmation import DEFAULT_CONFIRM_DELAY
+from custom_components.daikin_onecta.const import DOMAIN
+from custom_components.daikin_onecta.coordinator import RETIRE_ABSENT_AFTER
+from custom_components.daikin_onecta.metrics import endpoint
+from custom_components.daikin_onecta.ratelimit import async_get_governor
+from custom_components.daikin_onecta.ratelimit import POLL_SPACING
+
+DEVICE_ID = "1ece521b-5401-4a42-acce-6f76fba246aa"
+TANK_TEMPERATURE_URL = f"/v1/gateway-devices/{DEVICE_ID}/management-points/domesticHotWaterTank/characteristics/temperatureControl"
+TANK_TEMPERATURE_BODY = json.dumps({"value": 52, "path": "/operationModes/heating/setpoints/domesticHotWaterTemperature"})
+
+
+def tank_temperature(devices: list) -> int:
+    for management_point in devices[0]["managementPoints"]:
+        if management_point["embeddedId"] == "domesticHotWaterTank":
+            return management_point["temperatureControl"]["value"]["operationModes"]["heating"]["setpoints"]["domesticHotWaterTemperature"][
+                "value"
+            ]
+
+
+async def test_emulator_applies_writes(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """A PATCH is applied to the emulator state and returned by the next GET."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+
+    assert daikin_api.rate_limits["day"] == 200
+    assert daikin_api.rate_limits["remaining_day"] == 199
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+    assert tank_temperature(await daikin_api.getCloudDeviceDetails()) == 52
+    assert daikin_api.rate_limits["remaining_day"] == 197
+    assert [(method, status) for method, _, status in emulator.requests] == [("GET", 200), ("PATCH", 204), ("GET", 200)]
+
+    # A characteristic which isn't settable is rejected
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL.replace("temperatureControl", "sensoryData"), '{"value": 1}') is False
+
+    # The body is counted in utf-8 encoded bytes
+    name_url = TANK_TEMPERATURE_URL.replace("temperatureControl", "name")
+    assert await daikin_api.doBearerRequest("PATCH", name_url, '{"value": "Küche"}') is True
+    assert daikin_api.metrics.endpoints[f"PATCH {endpoint(name_url)}"].bytes_sent == len('{"value": "Küche"}') + 1
+
+
+async def test_emulator_rate_limit(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """The emulator rejects requests when the minute limit is exhausted."""
+    emulator = DaikinCloudEmulator("altherma", minute_limit=2)
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+    assert daikin_api.rate_limits["remaining_minutes"] == 0
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is False
+    assert emulator.requests[-1][2] == 429
+    assert 0 < daikin_api.rate_limits["retry_after"] <= 60
+
+
+async def test_emulator_stale_read_and_errors(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """A GET right after a write returns the old state, injected errors are returned once."""
+    emulator = DaikinCloudEmulator("altherma", stale_window=60)
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+    assert tank_temperature(await daikin_api.getCloudDeviceDetails()) == 48
+    assert tank_temperature(emulator.devices) == 52
+
+    emulator.inject_error(status=500)
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is False
+
+    emulator.inject_error(exc=ClientConnectionError())
+    with pytest.raises(ClientConnectionError):
+        await daikin_api.getCloudDeviceDetails()
+
+
+async def test_stale_poll_keeps_written_value(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """A poll within the staleness window doesn't revert a write, other management points of the device still update."""
+    emulator = DaikinCloudEmulator("altherma", stale_window=60)
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+    coordinator = config_entry.runtime_data.coordinator
+    device = config_entry.runtime_data.devices[DEVICE_ID]
+
+    climate_control = emulator.management_point(DEVICE_ID, "climateControlMainZone")
+    climate_control["sensoryData"]["value"]["leavingWaterTemperature"]["value"] = 30
+    await hass.services.async_call(
+        WATER_HEATER_DOMAIN,
+        SERVICE_SET_TEMPERATURE,
+        {ATTR_ENTITY_ID: "water_heater.altherma", ATTR_TEMPERATURE: 52},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("water_heater.altherma").attributes[ATTR_TEMPERATURE] == 52
+
+    # The poll at the expected confirmation moment still returns the temperature from before the write
+    coordinator.confirmation.pending[0].written_at -= DEFAULT_CONFIRM_DELAY
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert tank_temperature(daikin_api.json_data) == 48
+    assert tank_temperature([device.daikin_data]) == 52
+    assert hass.states.get("sensor.altherma_climatecontrol_leaving_water_temperature").state == "30"
+    assert hass.states.get("water_heater.altherma").attributes[ATTR_TEMPERATURE] == 52
+    assert coordinator.confirmation.pending
+
+    # A write which isn't confirmed in time is given up on, the value of the cloud is used
+    coordinator.confirmation.pending[0].written_at -= coordinator.scan_ignore()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert tank_temperature([device.daikin_data]) == 48
+    assert hass.states.get("water_heater.altherma").attributes[ATTR_TEMPERATURE] == 48
+    assert not coordinator.confirmation.pending
+
+
+async def test_unchanged_payload_is_short_circuited(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """An identical payload isn't parsed and merged again, a write forces the next payload to be processed."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+    coordinator = config_entry.runtime_data.coordinator
+
+    with patch.object(coordinator, "process_json_data", wraps=coordinator.process_json_data) as process_json_data:
+        await coordinator.async_refresh()
+        assert daikin_api.payload_stats["unchanged"] == 1
+        process_json_data.assert_not_called()
+
+        tank_management_point = emulator.management_point(DEVICE_ID, "domesticHotWaterTank")
+        tank_management_point["onOffMode"]["value"] = "off"
+        await coordinator.async_refresh()
+        assert daikin_api.payload_stats["unchanged"] == 1
+        process_json_data.assert_called_once()
+
+    assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+    assert tank_temperature(await daikin_api.getCloudDeviceDetails()) == 52
+    assert daikin_api.payload_stats == {"responses": 4, "unchanged": 1, "not_modified": 0}
+
+
+async def test_devices_and_management_points_appear_and_disappear(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Entities are added and retired when devices and management points change, without a reload."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    coordinator = config_entry.runtime_data.coordinator
+    device_registry = dr.async_get(hass)
+    devices = len(dr.async_entries_for_config_entry(device_registry, config_entry.entry_id))
+    assert hass.states.get("climate.lounge_room_temperature") is None
+
+    added = load_fixture_json("dry")
+    emulator.devices.extend(added)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("climate.lounge_room_temperature").state == HVACMode.DRY
+    assert hass.states.get("water_heater.altherma") is not None
+    devices_with_added = len(dr.async_entries_for_config_entry(device_registry, config_entry.entry_id))
+
+    # A missing management point makes its entities unavailable, it can be a hiccup of the cloud
+    altherma = emulator.devices[0]
+    tank = emulator.management_point(DEVICE_ID, "domesticHotWaterTank")
+    altherma["managementPoints"] = [mp for mp in altherma["managementPoints"] if mp is not tank]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("water_heater.altherma").state == STATE_UNAVAILABLE
+    assert device_registry.async_get_device(identifiers={(DOMAIN, DEVICE_ID + "domesticHotWaterTank")}) is not None
+
+    altherma["managementPoints"].append(tank)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("water_heater.altherma").state != STATE_UNAVAILABLE
+
+    # Entities and devices missing for a long time are removed from the registries
+    altherma["managementPoints"].remove(tank)
+    del emulator.devices[-len(added) :]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("water_heater.altherma").state == STATE_UNAVAILABLE
+    assert hass.states.get("climate.lounge_room_temperature").state == STATE_UNAVAILABLE
+    assert len(dr.async_entries_for_config_entry(device_registry, config_entry.entry_id)) == devices_with_added
+
+    for plan in coordinator._absent_plans:
+        coordinator._absent_plans[plan] -= RETIRE_ABSENT_AFTER
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get("water_heater.altherma") is None
+    assert hass.states.get("climate.lounge_room_temperature") is None
+    assert device_registry.async_get_device(identifiers={(DOMAIN, DEVICE_ID + "domesticHotWaterTank")}) is None
+    assert len(dr.async_entries_for_config_entry(device_registry, config_entry.entry_id)) == devices - 1
+    assert hass.config_entries.async_get_entry(config_entry.entry_id).state is ConfigEntryState.LOADED
+
+
+async def test_low_priority_devices(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """The high priority device is polled with its own endpoint, low priority entities update less often."""
+    hass.config_entries.async_update_entry(config_entry, options={"low_priority_devices": [DEVICE_ID], "low_priority_interval": 60})
+    emulator = DaikinCloudEmulator("altherma_boost", "climate_fixedfanmode")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    coordinator = config_entry.runtime_data.coordinator
+    high_priority_id = emulator.devices[1]["id"]
+
+    await coordinator.async_refresh()
+    assert emulator.requests[-1][1] == f"/v1/gateway-devices/{high_priority_id}"
+
+    # The change of the low priority device is merged but not yet passed to its entities
+    emulator.management_point(DEVICE_ID, "domesticHotWaterTank")["onOffMode"]["value"] = "off"
+    coordinator._last_full_poll -= 3600
+    await coordinator.async_refresh()
+    assert emulator.requests[-1][1] == "/v1/gateway-devices"
+    assert hass.states.get("water_heater.altherma").state != STATE_OFF
+
+    coordinator._low_priority_updated[DEVICE_ID] -= 3600
+    await coordinator.async_refresh()
+    assert emulator.requests[-1][1] == f"/v1/gateway-devices/{high_priority_id}"
+    assert hass.states.get("water_heater.altherma").state == STATE_OFF
+
+    # A management point appearing in the poll of a single device adds its entities
+    water_heaters = len(hass.states.async_entity_ids("water_heater"))
+    tank = copy.deepcopy(emulator.management_point(DEVICE_ID, "domesticHotWaterTank"))
+    emulator.devices[1]["managementPoints"].append(tank)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert emulator.requests[-1][1] == f"/v1/gateway-devices/{high_priority_id}"
+    assert len(hass.states.async_entity_ids("water_heater")) == water_heaters + 1
+
+
+async def test_single_device_poll_invalidates_full_payload(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """After a single device poll changed a device, a full poll identical to the previous one is merged again."""
+    hass.config_entries.async_update_entry(config_entry, options={"low_priority_devices": [DEVICE_ID], "low_priority_interval": 60})
+    emulator = DaikinCloudEmulator("altherma_boost", "climate_fixedfanmode")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    coordinator = config_entry.runtime_data.coordinator
+    high_priority_id = emulator.devices[1]["id"]
+    device = config_entry.runtime_data.devices[high_priority_id]
+    on_off_mode = emulator.management_point(high_priority_id, "climateControl")["onOffMode"]
+    original = on_off_mode["value"]
+
+    on_off_mode["value"] = "on" if original == "off" else "off"
+    await coordinator.async_refresh()
+    assert emulator.requests[-1][1] == f"/v1/gateway-devices/{high_priority_id}"
+    assert device.management_point("climateControl")["onOffMode"]["value"] != original
+
+    # The cloud returns the response of the previous full poll again
+    on_off_mode["value"] = original
+    coordinator._last_full_poll -= 3600
+    await coordinator.async_refresh()
+    assert emulator.requests[-1][1] == "/v1/gateway-devices"
+    assert device.management_point("climateControl")["onOffMode"]["value"] == original
+
+
+async def test_options_update_keeps_polls_staggered(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """The update interval set by an options update doesn't poll in the same second as another account."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    coordinator = config_entry.runtime_data.coordinator
+
+    with (
+        patch("custom_components.daikin_onecta.ratelimit.time.monotonic", return_value=1000),
+        patch.object(coordinator, "determine_update_interval", return_value=timedelta(minutes=10)),
+    ):
+        async_get_governor(hass).stagger("other_account", 600)
+        hass.config_entries.async_update_entry(config_entry, options={"high_scan_interval": 10})
+        await hass.async_block_till_done()
+
+    assert coordinator.update_interval == timedelta(seconds=600 + POLL_SPACING)
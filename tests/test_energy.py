@@ -0,0 +1,47 @@
+"""Tests for the Daikin Onecta energy history."""
+from datetime import date
+from unittest.mock import MagicMock
+
+from .conftest import load_fixture_json
+from custom_components.daikin_onecta.device import DaikinOnectaDevice
+from custom_components.daikin_onecta.energy import EnergyHistory
+
+
+def test_energy_history_totals() -> None:
+    """The totals of the current day, week, month and year are computed from the arrays."""
+    history = EnergyHistory(
+        {
+            "electrical": {
+                "heating": {
+                    "d": [1] * 12 + [2, None, 3] + [None] * 9,
+                    "w": [1] * 7 + [4, 5, None, None, None, None, None],
+                    "m": [1] * 12 + [10, 20.5, None] + [None] * 9,
+                },
+            },
+            "unit": "kWh",
+        }
+    )
+
+    assert history.value("electrical", "heating", "d") == 5
+    assert history.value("electrical", "heating", "w") == 9
+    assert history.value("electrical", "heating", "m") == 30.5
+    assert history.value("electrical", "heating", "monthly", date(2026, 2, 1)) == 20.5
+    assert history.value("electrical", "heating", "monthly", date(2026, 3, 1)) == 0
+    assert history.value("electrical", "cooling", "d") is None
+    assert history.value("gas", "heating", "d") is None
+
+
+def test_energy_history_follows_device_data() -> None:
+    """The parsed history is shared until the characteristic changes."""
+    device = DaikinOnectaDevice(load_fixture_json("altherma")[0], MagicMock())
+    history = device.energy_history("domesticHotWaterTank", "consumption")
+    assert history.value("electrical", "heating", "m") == 515
+    assert device.energy_history("domesticHotWaterTank", "consumption") is history
+
+    new_data = load_fixture_json("altherma")[0]
+    tank = next(mp for mp in new_data["managementPoints"] if mp["embeddedId"] == "domesticHotWaterTank")
+    tank["consumptionData"]["value"]["electrical"]["heating"]["m"][17] = 10
+    device.setJsonData(new_data)
+
+    assert device.energy_history("domesticHotWaterTank", "consumption").value("electrical", "heating", "m") == 525
+    assert device.energy_history("climateControlMainZone", "consumption") is device.energy_history("climateControlMainZone", "consumption")
@@ -461,6 +461,18 @@ async def test_update_listener_notifies_entities() -> None:
     coordinator.async_update_listeners.assert_called_once_with()
 
 
+async def test_update_listener_ignores_data_updates() -> None:
+    """Test an update of the entry data, like a refreshed token, doesn't reset the coordinator."""
+    coordinator = MagicMock(options={"high_scan_interval": 10})
+    config_entry = MagicMock(options={"high_scan_interval": 10})
+    config_entry.runtime_data = MagicMock(coordinator=coordinator)
+
+    await update_listener(None, config_entry)
+
+    coordinator.update_settings.assert_not_called()
+    coordinator.async_update_listeners.assert_not_called()
+
+
 def test_homekit_fan_mode_alias_helpers() -> None:
     """Test HomeKit fan mode alias helper edge cases."""
     climate = DaikinClimate.__new__(DaikinClimate)
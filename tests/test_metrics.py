@@ -0,0 +1,38 @@
+"""Tests for the Daikin Onecta request metrics."""
+from custom_components.daikin_onecta.metrics import ApiMetrics
+from custom_components.daikin_onecta.metrics import endpoint
+
+
+def test_endpoint() -> None:
+    """Device and management point ids are removed from the endpoint."""
+    assert endpoint("/v1/gateway-devices") == "/v1/gateway-devices"
+    assert (
+        endpoint("/v1/gateway-devices/1ece521b/management-points/climateControl/characteristics/onOffMode")
+        == "/v1/gateway-devices/{device}/management-points/{management_point}/characteristics/onOffMode"
+    )
+
+
+def test_api_metrics() -> None:
+    """Requests are recorded per method and endpoint and summarized."""
+    metrics = ApiMetrics()
+    metrics.record_request("GET", "/v1/gateway-devices", 0.2, 200, 0, 1000)
+    metrics.record_request("GET", "/v1/gateway-devices", 0.4, 200, 0, 1000)
+    metrics.record_request("PATCH", "/v1/gateway-devices/1/management-points/2/characteristics/onOffMode", 12, "error", 20)
+    metrics.scheduler_wait.record(0.01)
+
+    assert metrics.values() == {
+        "requests": 3,
+        "request_errors": 1,
+        "retries": 0,
+        "average_latency": 4200.0,
+        "average_scheduler_wait": 10.0,
+        "average_token_refresh": None,
+        "token_refreshes": 0,
+        "token_refresh_failures": 0,
+    }
+    get = metrics.as_dict()["endpoints"]["GET /v1/gateway-devices"]
+    assert get["statuses"] == {"200": 2}
+    assert get["bytes_received"] == 2000
+    assert get["latency"]["buckets"]["le_0.25"] == 1
+    assert get["latency"]["buckets"]["le_0.5"] == 1
+    assert metrics.endpoints["PATCH /v1/gateway-devices/{device}/management-points/{management_point}/characteristics/onOffMode"].latency.buckets[-1] == 1
@@ -0,0 +1,40 @@
+"""Tests for the debug logging of the Daikin Onecta payloads."""
+import logging
+
+import pytest
+
+from custom_components.daikin_onecta.payload_log import payload_hash
+from custom_components.daikin_onecta.payload_log import PayloadLogger
+
+LOGGER = logging.getLogger("custom_components.daikin_onecta.test_payload_log")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"payload_log_bytes": 4, "payload_log_interval": 2}, {"payload_log_bytes": 4.0, "payload_log_interval": 2.0}],
+)
+def test_payload_log_truncates_and_samples(caplog: pytest.LogCaptureFixture, options: dict) -> None:
+    """Every response is summarized, only the sampled bodies are logged and truncated, also with the float options of the options flow."""
+    payload_log = PayloadLogger(LOGGER, lambda: options)
+    body = b'{"value": 1}'
+
+    with caplog.at_level(logging.DEBUG, logger=LOGGER.name):
+        assert payload_log.enabled
+        payload_log.response("GET", "/v1/gateway-devices", 200, body, {})
+        payload_log.response("GET", "/v1/gateway-devices", 200, body, {})
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages == [
+        f"Response GET /v1/gateway-devices status 200 size 12 hash {payload_hash(body)} limits {{}}",
+        f"Response GET /v1/gateway-devices status 200 size 12 hash {payload_hash(body)} limits {{}}",
+        'Response GET /v1/gateway-devices body: {"va... (8 bytes truncated)',
+    ]
+
+
+def test_payload_log_disabled() -> None:
+    """Nothing has to be built when debug logging is disabled."""
+    LOGGER.setLevel(logging.INFO)
+    try:
+        assert not PayloadLogger(LOGGER, dict).enabled
+    finally:
+        LOGGER.setLevel(logging.NOTSET)
@@ -0,0 +1,32 @@
+"""Tests for the rate limit governor shared by the Daikin accounts."""
+from unittest.mock import MagicMock
+
+from custom_components.daikin_onecta.ratelimit import POLL_SPACING
+from custom_components.daikin_onecta.ratelimit import RateLimitBudget
+from custom_components.daikin_onecta.ratelimit import RateLimitGovernor
+
+
+def budget(remaining_day: int) -> RateLimitBudget:
+    daikin_api = MagicMock()
+    daikin_api.rate_limits = {"day": 200, "remaining_day": remaining_day}
+    return RateLimitBudget(daikin_api, 20)
+
+
+def test_governor_staggers_polls() -> None:
+    """Accounts polling at the same moment are spread, the budget is reported per account and in total."""
+    governor = RateLimitGovernor()
+    unregister = governor.async_register("home", "Home", budget(120))
+    governor.async_register("office", "Office", budget(50))
+
+    assert governor.stagger("home", 600, now=1000) == 600
+    assert governor.stagger("office", 600, now=1000) == 600 + POLL_SPACING
+    assert governor.stagger("office", 900, now=1000) == 900
+    # A new poll of an account doesn't collide with its own previous plan
+    assert governor.stagger("home", 900 + POLL_SPACING / 2, now=1000) == 900 + POLL_SPACING
+
+    assert governor.values() == {"accounts": 2, "total_remaining_day": 170, "total_planned_polls": 130, "total_command_reserve": 40}
+    assert governor.account_values()["Office"] == {"remaining_day": 50, "max_day": 200, "planned_polls": 30, "command_reserve": 20}
+
+    unregister()
+    assert governor.values()["accounts"] == 1
+    assert governor.stagger("office", 600, now=1000) == 600
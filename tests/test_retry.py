@@ -0,0 +1,92 @@
+"""Tests for the retry policy of the Daikin Onecta commands."""
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import ClientConnectionError
+from aiohttp import ClientConnectorError
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from .emulator import async_setup_with_emulator
+from .emulator import DaikinCloudEmulator
+from .test_emulator import TANK_TEMPERATURE_BODY
+from .test_emulator import TANK_TEMPERATURE_URL
+from .test_emulator import tank_temperature
+from custom_components.daikin_onecta.retry import RetryPolicy
+
+
+def test_retry_policy() -> None:
+    """Only failures that are safe and worth to retry are retried."""
+    policy = RetryPolicy(lambda: {"retry_attempts": 2})
+    connector_error = ClientConnectorError(None, OSError("unreachable"))
+
+    with patch("custom_components.daikin_onecta.retry.random.uniform", side_effect=lambda low, high: high):
+        assert policy.delay("PATCH", 0, status=503) == 0.5
+        assert policy.delay("PUT", 1, error=ClientConnectionError()) == 1.0
+        assert policy.delay("POST", 0, error=connector_error) == 0.5
+
+    # No more attempts left
+    assert policy.delay("PATCH", 2, status=503) is None
+    # Polls are retried by the coordinator
+    assert policy.delay("GET", 0, status=503) is None
+    # A POST could have been processed by the cloud
+    assert policy.delay("POST", 0, error=ClientConnectionError()) is None
+    assert policy.delay("POST", 0, status=503) is None
+    # A 429 is only retried when the cloud accepts requests again soon
+    assert policy.delay("POST", 0, status=429, retry_after=2) == 2
+    assert policy.delay("PATCH", 0, status=429) is None
+    assert policy.delay("PATCH", 0, status=429, retry_after=60) is None
+    # Errors of the request itself aren't retried
+    assert policy.delay("PATCH", 0, status=400) is None
+    assert policy.delay("PATCH", 0, status=500) is None
+    assert RetryPolicy(lambda: {"retry_attempts": 0}).delay("PATCH", 0, status=503) is None
+
+
+async def test_command_retried_through_cloud_blip(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """A command succeeds when the cloud is briefly unavailable."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+
+    emulator.inject_error(status=503)
+    emulator.inject_error(exc=ClientConnectionError())
+    with patch("custom_components.daikin_onecta.retry.random.uniform", return_value=0):
+        assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+
+    assert [status for method, _, status in emulator.requests if method == "PATCH"] == [503, None, 204]
+    assert tank_temperature(emulator.devices) == 52
+    assert daikin_api.metrics.retries == 2
+
+
+async def test_retry_backoff_releases_write_slot(
+    hass: HomeAssistant,
+    config_entry: MockConfigEntry,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Other requests can run while a command waits to be retried."""
+    emulator = DaikinCloudEmulator("altherma")
+    await async_setup_with_emulator(hass, aioclient_mock, config_entry, emulator)
+    daikin_api = config_entry.runtime_data.daikin_api
+    writes_in_flight = []
+    sleep = asyncio.sleep
+
+    async def backoff(delay):
+        # asyncio.sleep is patched for everyone, only look at the back-off of the command
+        if delay == 0.001:
+            writes_in_flight.append(daikin_api._scheduler._writes_in_flight)
+        await sleep(0)
+
+    emulator.inject_error(status=503)
+    with (
+        patch("custom_components.daikin_onecta.retry.random.uniform", return_value=0.001),
+        patch("custom_components.daikin_onecta.daikin_api.asyncio.sleep", side_effect=backoff),
+    ):
+        assert await daikin_api.doBearerRequest("PATCH", TANK_TEMPERATURE_URL, TANK_TEMPERATURE_BODY) is True
+
+    assert writes_in_flight == [0]
+    assert [status for method, _, status in emulator.requests if method == "PATCH"] == [503, 204]
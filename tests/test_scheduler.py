@@ -0,0 +1,107 @@
+"""Tests for the Daikin Onecta request scheduler."""
+import asyncio
+from unittest.mock import patch
+
+from custom_components.daikin_onecta.scheduler import DaikinRequestScheduler
+
+RATE_LIMITS = {"minute": 0, "remaining_minutes": 0}
+
+
+async def test_writes_to_different_devices_run_concurrently() -> None:
+    """A write to one device doesn't wait for a write to another device."""
+    scheduler = DaikinRequestScheduler(dict(RATE_LIMITS))
+    release = asyncio.Event()
+    started = []
+
+    async def write(device_id):
+        async with scheduler.write(f"/v1/gateway-devices/{device_id}/management-points/climateControl/characteristics/onOffMode"):
+            started.append(device_id)
+            await release.wait()
+
+    tasks = [asyncio.create_task(write("a")), asyncio.create_task(write("b")), asyncio.create_task(write("a"))]
+    await asyncio.sleep(0.01)
+    # The second write to device a waits for the first one
+    assert started == ["a", "b"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["a", "b", "a"]
+    # The locks of devices without writes are dropped
+    assert scheduler._device_locks == {}
+
+
+async def test_read_waits_for_writes() -> None:
+    """A GET only starts when the in-flight writes have completed, writes don't wait for a GET."""
+    scheduler = DaikinRequestScheduler(dict(RATE_LIMITS))
+    release = asyncio.Event()
+    order = []
+
+    async def write():
+        async with scheduler.write("/v1/gateway-devices/a/management-points/climateControl/characteristics/onOffMode"):
+            order.append("write")
+            await release.wait()
+        order.append("write done")
+
+    async def read():
+        async with scheduler.read():
+            order.append("read")
+
+    write_task = asyncio.create_task(write())
+    await asyncio.sleep(0)
+    read_task = asyncio.create_task(read())
+    await asyncio.sleep(0.01)
+    assert order == ["write"]
+
+    release.set()
+    await asyncio.gather(write_task, read_task)
+    assert order == ["write", "write done", "read"]
+
+
+async def test_read_gets_priority_after_waiting() -> None:
+    """A GET which waited too long for the writes lets new writes wait until it ran."""
+    scheduler = DaikinRequestScheduler(dict(RATE_LIMITS))
+    release = asyncio.Event()
+    order = []
+
+    async def write(name):
+        async with scheduler.write(f"/v1/gateway-devices/{name}/management-points/climateControl/characteristics/onOffMode"):
+            order.append(name)
+            await release.wait()
+
+    async def read():
+        async with scheduler.read():
+            order.append("read")
+
+    with patch("custom_components.daikin_onecta.scheduler.MAX_READ_WAIT", 0.01):
+        first_write = asyncio.create_task(write("a"))
+        await asyncio.sleep(0)
+        read_task = asyncio.create_task(read())
+        await asyncio.sleep(0.05)
+        second_write = asyncio.create_task(write("b"))
+        await asyncio.sleep(0.01)
+        # The new write waits for the read which waits for the first write
+        assert order == ["a"]
+
+        release.set()
+        await asyncio.gather(first_write, read_task, second_write)
+    assert order == ["a", "read", "b"]
+
+
+async def test_writes_respect_minute_limit() -> None:
+    """No more writes are started concurrently than we have left in this minute."""
+    scheduler = DaikinRequestScheduler({"minute": 20, "remaining_minutes": 1})
+    release = asyncio.Event()
+    started = []
+
+    async def write(device_id):
+        async with scheduler.write(f"/v1/gateway-devices/{device_id}/management-points/climateControl/characteristics/onOffMode"):
+            started.append(device_id)
+            await release.wait()
+
+    tasks = [asyncio.create_task(write("a")), asyncio.create_task(write("b"))]
+    await asyncio.sleep(0.01)
+    assert started == ["a"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["a", "b"]
@@ -0,0 +1,31 @@
+"""Tests for the import of the Daikin Onecta energy statistics."""
+from datetime import datetime
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.daikin_onecta.statistics import energy_buckets
+
+
+async def test_energy_buckets(hass: HomeAssistant) -> None:
+    """Daily values are used before yesterday, two-hourly values for yesterday and the completed part of today."""
+    # The buckets start at local midnight
+    await hass.config.async_set_time_zone("UTC")
+    now = datetime(2026, 10, 14, 5, 30, tzinfo=dt_util.UTC)
+    buckets = energy_buckets(
+        {
+            "d": list(range(1, 25)),
+            "w": [10, None, 12, 13, 14, 15, 16, 17, 18, 19, None, None, None, None],
+            "m": [100] * 24,
+        },
+        now,
+    )
+
+    # Daily values from monday last week until the day before yesterday
+    monday = datetime(2026, 10, 5, tzinfo=dt_util.UTC)
+    assert buckets[:7] == [(monday + timedelta(days=day), value) for day, value in zip([0, 2, 3, 4, 5, 6, 7], [10, 12, 13, 14, 15, 16, 17])]
+
+    # Two-hourly values of yesterday and of today until 04:00-06:00 which is still in progress
+    yesterday = datetime(2026, 10, 13, tzinfo=dt_util.UTC)
+    assert buckets[7:] == [(yesterday + timedelta(hours=2 * index), index + 1) for index in range(14)]